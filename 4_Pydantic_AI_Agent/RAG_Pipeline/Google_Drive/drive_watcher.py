@@ -1,4 +1,4 @@
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timedelta, timezone
 from googleapiclient.discovery import build
 from googleapiclient.http import MediaIoBaseDownload
@@ -6,6 +6,7 @@ from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from google.auth.exceptions import RefreshError
+import asyncio
 import random
 import time
 import json
@@ -15,7 +16,7 @@ import io
 from pathlib import Path
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from common.text_processor import extract_text_from_file, chunk_text, create_embeddings
+from common.text_processor import extract_text_from_file, chunk_text, create_embeddings, needs_ocr, extract_texts_with_ocr_async
 from common.db_handler import process_file_for_rag, delete_document_by_file_id
 
 # If modifying these scopes, delete the file token.json.
@@ -264,12 +265,14 @@ class GoogleDriveWatcher:
             print(f"Error downloading file {file_id}: {e}")
             return None
     
-    def process_file(self, file: Dict[str, Any]) -> None:
+    def process_file(self, file: Dict[str, Any], file_content: Optional[bytes] = None, text: Optional[str] = None) -> None:
         """
         Process a file for the RAG pipeline.
         
         Args:
             file: The file metadata from Google Drive
+            file_content: Already downloaded file content (downloaded here if omitted)
+            text: Already extracted text (extracted here if omitted)
         """
         file_id = file['id']
         file_name = file['name']
@@ -292,13 +295,15 @@ class GoogleDriveWatcher:
             return
         
         # Download the file
-        file_content = self.download_file(file_id, mime_type)
+        if file_content is None:
+            file_content = self.download_file(file_id, mime_type)
         if not file_content:
             print(f"Failed to download file '{file_name}' (ID: {file_id})")
             return
         
         # Extract text from the file
-        text = extract_text_from_file(file_content, mime_type, file_name, self.config)
+        if text is None:
+            text = extract_text_from_file(file_content, mime_type, file_name, self.config)
         if not text:
             print(f"No text could be extracted from file '{file_name}' (ID: {file_id})")
             return
@@ -314,6 +319,57 @@ class GoogleDriveWatcher:
         else:
             print(f"Failed to process file '{file_name}' (ID: {file_id})")
     
+    async def _download_and_ocr(self, files: List[Dict[str, Any]]) -> Dict[str, Tuple[bytes, str]]:
+        """
+        Download files and OCR them, starting each file's OCR as soon as its download finishes.
+        
+        Args:
+            files: The file metadata from Google Drive
+            
+        Returns:
+            Mapping of file ID to (file_content, text) for every file that downloaded
+        """
+        downloaded = []
+        
+        async def documents():
+            for file in files:
+                # The Drive client is not thread-safe, so downloads stay sequential in a
+                # worker thread while earlier files are already being OCRed
+                file_content = await asyncio.to_thread(self.download_file, file['id'], file['mimeType'])
+                if file_content:
+                    downloaded.append((file, file_content))
+                    yield file_content, file['name'], file['mimeType']
+        
+        texts = await extract_texts_with_ocr_async(documents())
+        return {file['id']: (file_content, text) for (file, file_content), text in zip(downloaded, texts)}
+    
+    def process_files(self, files: List[Dict[str, Any]]) -> None:
+        """
+        Process a batch of changed files, running OCR for PDFs and images concurrently.
+        
+        Args:
+            files: The file metadata from Google Drive
+        """
+        supported_mime_types = self.config.get('supported_mime_types', [])
+        ocr_files = [
+            f for f in files
+            if not f.get('trashed', False)
+            and needs_ocr(f['mimeType'])
+            and any(f['mimeType'].startswith(t) for t in supported_mime_types)
+        ]
+        
+        # Download and OCR the OCR files up front so their round-trips overlap
+        prefetched = {}
+        if len(ocr_files) > 1:
+            prefetched = asyncio.run(self._download_and_ocr(ocr_files))
+        
+        for file in files:
+            print(file)
+            file_content, text = prefetched.get(file['id'], (None, None))
+            self.process_file(file, file_content, text)
+            # Update known_files with just the modifiedTime
+            self.known_files[file['id']] = file.get('modifiedTime')
+    
     def check_for_deleted_files(self) -> List[str]:
         """
         Check for files that have been deleted from Google Drive.
@@ -409,11 +465,7 @@ class GoogleDriveWatcher:
                 # Process changed files
                 if changed_files:
                     print(f"Found {len(changed_files)} changed files.")
-                    for file in changed_files:
-                        print(file)
-                        self.process_file(file)
-                        # Update known_files with just the modifiedTime
-                        self.known_files[file['id']] = file.get('modifiedTime')
+                    self.process_files(changed_files)
                 
                 # Process deleted files
                 if deleted_file_ids:
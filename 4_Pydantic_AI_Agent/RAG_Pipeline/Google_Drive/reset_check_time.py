@@ -2,21 +2,23 @@
 Reset the last_check_time in config.json to force a full rescan of all files.
 """
 import json
+import sys
 from pathlib import Path
 
 # Get the directory where the script is located
 script_dir = Path(__file__).resolve().parent
 config_path = script_dir / 'config.json'
 
+sys.path.append(str(script_dir.parent))
+from common.config_loader import load_config, save_config
+
 try:
-    with open(config_path, 'r') as f:
-        config = json.load(f)
+    config = load_config(config_path)
     
     # Reset to a very old date to force scanning all files
     config['last_check_time'] = '1970-01-01T00:00:00.000000Z'
     
-    with open(config_path, 'w') as f:
-        json.dump(config, f, indent=2)
+    save_config(config_path, config)
     
     print(f"✅ Successfully reset last_check_time to 1970-01-01T00:00:00.000000Z")
     print(f"   Updated config file: {config_path}")
@@ -447,6 +447,41 @@ class TestGoogleDriveWatcher:
         captured = capfd.readouterr()
         assert "No text could be extracted" in captured.out
     
+    @patch.object(GoogleDriveWatcher, 'download_file')
+    @patch('Google_Drive.drive_watcher.extract_texts_with_ocr_async')
+    @patch('Google_Drive.drive_watcher.extract_text_from_file')
+    @patch('Google_Drive.drive_watcher.process_file_for_rag')
+    def test_process_files_batches_ocr(self, mock_process_rag, mock_extract_text, mock_ocr_batch, mock_download, watcher):
+        """Test that OCR files in a batch are OCRed together and other files are processed as before"""
+        files = [
+            {'id': 'pdf1', 'name': 'a.pdf', 'mimeType': 'application/pdf', 'modifiedTime': 't1'},
+            {'id': 'txt1', 'name': 'b.txt', 'mimeType': 'text/plain', 'modifiedTime': 't2'},
+            {'id': 'pdf2', 'name': 'c.pdf', 'mimeType': 'application/pdf', 'modifiedTime': 't3'}
+        ]
+        mock_download.side_effect = lambda file_id, mime_type: f'{file_id} bytes'.encode()
+        ocr_documents = []
+        
+        async def ocr_batch(documents):
+            # Documents arrive from an async iterator as they finish downloading
+            async for document in documents:
+                ocr_documents.append(document)
+            return ['pdf1 text', 'pdf2 text']
+        
+        mock_ocr_batch.side_effect = ocr_batch
+        mock_extract_text.return_value = 'txt1 text'
+        
+        watcher.process_files(files)
+        
+        mock_ocr_batch.assert_called_once()
+        assert ocr_documents == [
+            (b'pdf1 bytes', 'a.pdf', 'application/pdf'),
+            (b'pdf2 bytes', 'c.pdf', 'application/pdf')
+        ]
+        mock_extract_text.assert_called_once_with(b'txt1 bytes', 'text/plain', 'b.txt', watcher.config)
+        assert [c.args[1] for c in mock_process_rag.call_args_list] == ['pdf1 text', 'txt1 text', 'pdf2 text']
+        assert mock_download.call_count == 3
+        assert watcher.known_files == {'pdf1': 't1', 'txt1': 't2', 'pdf2': 't3'}
+    
     @patch.object(GoogleDriveWatcher, 'authenticate')
     def test_check_for_deleted_files(self, mock_authenticate, watcher):
         """Test checking for deleted files"""
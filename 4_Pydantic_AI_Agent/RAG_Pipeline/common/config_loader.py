@@ -0,0 +1,51 @@
+"""
+Helpers for reading and writing the JSON configuration files used by the watchers.
+"""
+import os
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Any, Union
+
+import orjson
+
+
+@lru_cache(maxsize=4)
+def _load_config_cached(path: str, mtime_ns: int) -> Dict[str, Any]:
+    """Parse a config file; the mtime is part of the cache key so edits are picked up."""
+    return orjson.loads(Path(path).read_bytes())
+
+
+def load_config(path: Union[str, os.PathLike]) -> Dict[str, Any]:
+    """
+    Load a JSON config file, re-parsing it only when it changed on disk.
+    
+    Args:
+        path: Path to the config file
+    
+    Returns:
+        The parsed config (a shallow copy, so top-level keys can be updated safely)
+    """
+    return dict(_load_config_cached(str(path), os.stat(path).st_mtime_ns))
+
+
+def save_config(path: Union[str, os.PathLike], config: Dict[str, Any]) -> None:
+    """
+    Write a config file atomically, so a crash mid-write never leaves a truncated file.
+    
+    Args:
+        path: Path to the config file
+        config: Config to write
+    """
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(orjson.dumps(config, option=orjson.OPT_INDENT_2))
+        if path.exists():
+            # mkstemp creates the file as 0600; keep the original permissions
+            os.chmod(tmp_path, path.stat().st_mode & 0o777)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
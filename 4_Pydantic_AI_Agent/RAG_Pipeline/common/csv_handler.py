@@ -1,36 +1,60 @@
 """
 CSV file handling utilities.
 """
+import os
 import io
 import csv
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Union
 
 
-def extract_schema_from_csv(file_content: bytes) -> List[str]:
+def _open_csv_text(source: Union[bytes, str, os.PathLike]) -> io.TextIOWrapper:
+    """Open CSV bytes or a CSV path as a text stream that decodes lazily, a buffer at a time."""
+    raw = io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else open(source, 'rb')
+    return io.TextIOWrapper(raw, encoding='utf-8', errors='replace', newline='')
+
+
+def extract_schema_from_csv(source: Union[bytes, str, os.PathLike]) -> List[str]:
     """
     Extract column names from a CSV file.
+    Only the start of the file is decoded, however large it is.
     
     Args:
-        file_content: The binary content of the CSV file
+        source: The binary content of the CSV file, or a path to the CSV file on disk
         
     Returns:
         List[str]: List of column names
     """
     try:
-        # Decode the CSV content
-        text_content = file_content.decode('utf-8', errors='replace')
-        csv_reader = csv.reader(io.StringIO(text_content))
-        # Get the header row (first row)
-        header = next(csv_reader)
-        return header
+        with _open_csv_text(source) as text_stream:
+            # Get the header row (first row)
+            return next(csv.reader(text_stream), [])
     except Exception as e:
         print(f"Error extracting schema from CSV: {e}")
         return []
 
 
+def iter_rows_from_csv(source: Union[bytes, str, os.PathLike]) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily yield rows from a CSV file as dictionaries.
+    The content is decoded incrementally, so only the current row is held in memory.
+    
+    Args:
+        source: The binary content of the CSV file, or a path to the CSV file on disk
+        
+    Yields:
+        Dict[str, Any]: Row data as a dictionary
+    """
+    try:
+        with _open_csv_text(source) as text_stream:
+            yield from csv.DictReader(text_stream)
+    except Exception as e:
+        print(f"Error extracting rows from CSV: {e}")
+
+
 def extract_rows_from_csv(file_content: bytes) -> List[Dict[str, Any]]:
     """
     Extract rows from a CSV file as a list of dictionaries.
+    Prefer iter_rows_from_csv() for large files.
     
     Args:
         file_content: The binary content of the CSV file
@@ -38,11 +62,4 @@ def extract_rows_from_csv(file_content: bytes) -> List[Dict[str, Any]]:
     Returns:
         List[Dict[str, Any]]: List of row data as dictionaries
     """
-    try:
-        # Decode the CSV content
-        text_content = file_content.decode('utf-8', errors='replace')
-        csv_reader = csv.DictReader(io.StringIO(text_content))
-        return list(csv_reader)
-    except Exception as e:
-        print(f"Error extracting rows from CSV: {e}")
-        return []
+    return list(iter_rows_from_csv(file_content))
@@ -1,6 +1,7 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable
 import os
 import io
+import asyncio
 import json
 import traceback
 from datetime import datetime
@@ -9,7 +10,7 @@ from supabase import create_client, Client
 import base64
 from pathlib import Path
 
-from .text_processor import chunk_text, create_embeddings, is_tabular_file, extract_schema_from_csv, extract_rows_from_csv
+from .text_processor import chunk_text, iter_embeddings_async, is_tabular_file, extract_schema_from_csv, iter_rows_from_csv
 
 # Load environment variables from the project root .env file
 # Get the path to the project root (4_Pydantic_AI_Agent directory)
@@ -54,7 +55,8 @@ def delete_document_by_file_id(file_id: str) -> None:
         print(f"Error deleting documents: {e}")
 
 def insert_document_chunks(chunks: List[str], embeddings: List[List[float]], file_id: str, 
-                        file_url: str, file_title: str, mime_type: str, file_contents: bytes | None = None) -> None:
+                        file_url: str, file_title: str, mime_type: str, file_contents: bytes | None = None,
+                        start_index: int = 0) -> None:
     """
     Insert document chunks with their embeddings into the Supabase database.
     
@@ -66,6 +68,7 @@ def insert_document_chunks(chunks: List[str], embeddings: List[List[float]], fil
         file_title: The title of the file
         mime_type: The mime type of the file
         file_contents: Optional binary of the file to store as metadata
+        start_index: Chunk index of the first chunk (when inserting a batch of a longer document)
     """
     try:
         # Ensure we have the same number of chunks and embeddings
@@ -74,7 +77,7 @@ def insert_document_chunks(chunks: List[str], embeddings: List[List[float]], fil
         
         # Prepare the data for insertion
         data = []
-        for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
+        for i, (chunk, embedding) in enumerate(zip(chunks, embeddings), start_index):
             file_bytes_str = base64.b64encode(file_contents).decode('utf-8') if file_contents else None
             data.append({
                 "content": chunk,
@@ -95,6 +98,26 @@ def insert_document_chunks(chunks: List[str], embeddings: List[List[float]], fil
     except Exception as e:
         print(f"Error inserting/updating document chunks: {e}")
 
+async def embed_and_insert_chunks(chunks: List[str], file_id: str, file_url: str, file_title: str,
+                                  mime_type: str, file_contents: bytes | None = None) -> None:
+    """
+    Embed document chunks and insert them into the Supabase database one embedding batch at a time.
+    Each batch is inserted in a worker thread while the following batches are still being embedded.
+    
+    Args:
+        chunks: List of text chunks
+        file_id: The Google Drive file ID
+        file_url: The URL to access the file
+        file_title: The title of the file
+        mime_type: The mime type of the file
+        file_contents: Optional binary of the file to store as metadata
+    """
+    async for batch, embeddings in iter_embeddings_async(chunks):
+        await asyncio.to_thread(
+            insert_document_chunks, chunks[batch.start:batch.stop], embeddings, file_id, file_url,
+            file_title, mime_type, file_contents, start_index=batch.start
+        )
+
 def insert_or_update_document_metadata(file_id: str, file_title: str, file_url: str, schema: Optional[List[str]] = None) -> None:
     """
     Insert or update a record in the document_metadata table.
@@ -131,13 +154,13 @@ def insert_or_update_document_metadata(file_id: str, file_title: str, file_url:
     except Exception as e:
         print(f"Error inserting/updating document metadata: {e}")
 
-def insert_document_rows(file_id: str, rows: List[Dict[str, Any]]) -> None:
+def insert_document_rows(file_id: str, rows: Iterable[Dict[str, Any]]) -> None:
     """
     Insert rows from a tabular file into the document_rows table.
     
     Args:
         file_id: The Google Drive file ID (references document_metadata.id)
-        rows: List of row data as dictionaries
+        rows: Row data as dictionaries (a list or a lazy iterator)
     """
     try:
         # First, delete any existing rows for this file
@@ -145,12 +168,14 @@ def insert_document_rows(file_id: str, rows: List[Dict[str, Any]]) -> None:
         print(f"Deleted existing rows for file ID: {file_id}")
         
         # Insert new rows
+        inserted = 0
         for row in rows:
             supabase.table("document_rows").insert({
                 "dataset_id": file_id,
                 "row_data": row
             }).execute()
-        print(f"Inserted {len(rows)} rows for file ID: {file_id}")
+            inserted += 1
+        print(f"Inserted {inserted} rows for file ID: {file_id}")
     except Exception as e:
         print(f"Error inserting document rows: {e}")
 
@@ -188,10 +213,8 @@ def process_file_for_rag(file_content: bytes, text: str, file_id: str, file_url:
         
         # Then, if it's a tabular file, insert the rows
         if is_tabular:
-            # Extract and insert rows for tabular files
-            rows = extract_rows_from_csv(file_content)
-            if rows:
-                insert_document_rows(file_id, rows)
+            # Stream rows straight into the database instead of materializing them
+            insert_document_rows(file_id, iter_rows_from_csv(file_content))
 
         # Get text processing settings from config
         text_processing = config.get('text_processing', {})
@@ -204,16 +227,11 @@ def process_file_for_rag(file_content: bytes, text: str, file_id: str, file_url:
             print(f"No chunks were created for file '{file_name}' (Path: {file_path})")
             return
         
-        # Create embeddings for the chunks
-        embeddings = create_embeddings(chunks)  
-
         # For images, don't chunk the image, just store the title for RAG and include the binary in the metadata
-        if mime_type.startswith("image"):
-            insert_document_chunks(chunks, embeddings, file_id, file_url, file_title, mime_type, file_content)
-            return True
+        file_contents = file_content if mime_type.startswith("image") else None
         
-        # Insert the chunks with their embeddings
-        insert_document_chunks(chunks, embeddings, file_id, file_url, file_title, mime_type)
+        # Create embeddings for the chunks, inserting each batch while the next ones are embedded
+        asyncio.run(embed_and_insert_chunks(chunks, file_id, file_url, file_title, mime_type, file_contents))
 
         return True
     except Exception as e:
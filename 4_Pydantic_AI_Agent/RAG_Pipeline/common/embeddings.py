@@ -2,8 +2,9 @@
 Embedding generation utilities with batching support.
 """
 import os
-from typing import List
-from openai import OpenAI
+import asyncio
+from typing import AsyncIterator, List, Tuple
+from openai import AsyncOpenAI, RateLimitError
 from dotenv import load_dotenv
 from pathlib import Path
 
@@ -12,82 +13,164 @@ project_root = Path(__file__).resolve().parent.parent.parent
 dotenv_path = project_root / '.env'
 load_dotenv(dotenv_path, override=True)
 
-# Initialize OpenAI client
+# OpenAI client configuration
 api_key = os.getenv("EMBEDDING_API_KEY", "") or "ollama"
-openai_client = OpenAI(api_key=api_key, base_url=os.getenv("EMBEDDING_BASE_URL"))
 
+# Configuration for batching
+MAX_BATCH_SIZE = 100  # Maximum number of texts per batch
+MAX_TOKENS_PER_BATCH = 250000  # Leave some buffer below the 300k limit
+EMBEDDING_CONCURRENCY = int(os.getenv("EMBEDDING_CONCURRENCY", "8"))  # Batches in flight at once
+MAX_RATE_LIMIT_RETRIES = 5
+EMBEDDING_DIMENSION = 1536  # Default dimension for text-embedding-3-small
 
-def create_embeddings(texts: List[str]) -> List[List[float]]:
+
+def _build_batches(texts: List[str]) -> List[range]:
     """
-    Create embeddings for a list of text chunks using OpenAI.
-    Batches requests to avoid token limits.
+    Group texts into batches that respect the batch size and token limits.
     
     Args:
         texts: List of text chunks to embed
         
     Returns:
-        List of embedding vectors
+        Contiguous index ranges into texts, one per batch
     """
-    if not texts:
-        return []
-    
-    # Configuration for batching
-    MAX_BATCH_SIZE = 100  # Maximum number of texts per batch
-    MAX_TOKENS_PER_BATCH = 250000  # Leave some buffer below the 300k limit
-    
     # Rough estimation: 1 token ≈ 4 characters for English text
-    def estimate_tokens(text: str) -> int:
-        return len(text) // 4
+    token_estimates = [len(text) >> 2 for text in texts]
     
-    all_embeddings = []
-    current_batch = []
+    batches = []
+    batch_start = 0
     current_tokens = 0
     
-    for text in texts:
-        text_tokens = estimate_tokens(text)
+    for i, text_tokens in enumerate(token_estimates):
+        batch_len = i - batch_start
         
         # Check if adding this text would exceed limits
-        if (len(current_batch) >= MAX_BATCH_SIZE or 
-            (current_tokens + text_tokens > MAX_TOKENS_PER_BATCH and current_batch)):
-            
-            # Process current batch
+        if (batch_len >= MAX_BATCH_SIZE or
+            (current_tokens + text_tokens > MAX_TOKENS_PER_BATCH and batch_len)):
+            batches.append(range(batch_start, i))
+            batch_start = i
+            current_tokens = 0
+        
+        current_tokens += text_tokens
+    
+    if batch_start < len(texts):
+        batches.append(range(batch_start, len(texts)))
+    
+    return batches
+
+
+async def _embed_batch(client: AsyncOpenAI, texts: List[str], batch: range,
+                       semaphore: asyncio.Semaphore, all_embeddings: List[List[float]]) -> None:
+    """
+    Embed one batch into its slots of all_embeddings, retrying with exponential backoff when rate limited.
+    
+    Args:
+        client: Async OpenAI client to use
+        texts: All texts being embedded
+        batch: Index range of the texts in this batch
+        semaphore: Semaphore bounding the number of requests in flight
+        all_embeddings: Pre-sized result list, filled in by index (zero vectors if the request failed)
+    """
+    batch_texts = texts[batch.start:batch.stop]
+    
+    async with semaphore:
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
             try:
-                print(f"Creating embeddings for batch of {len(current_batch)} texts (~{current_tokens} tokens)...")
-                response = openai_client.embeddings.create(
+                print(f"Creating embeddings for batch of {len(batch_texts)} texts...")
+                response = await client.embeddings.create(
                     model=os.getenv("EMBEDDING_MODEL_CHOICE"),
-                    input=current_batch
+                    input=batch_texts
                 )
-                batch_embeddings = [item.embedding for item in response.data]
-                all_embeddings.extend(batch_embeddings)
-                
-                # Reset for next batch
-                current_batch = []
-                current_tokens = 0
+                for i, item in zip(batch, response.data):
+                    all_embeddings[i] = item.embedding
+                return
+            except RateLimitError as e:
+                if attempt == MAX_RATE_LIMIT_RETRIES:
+                    print(f"Error creating embeddings for batch: {e}")
+                    break
+                delay = 2 ** attempt
+                print(f"Rate limited while creating embeddings, retrying in {delay}s...")
+                await asyncio.sleep(delay)
             except Exception as e:
                 print(f"Error creating embeddings for batch: {e}")
-                # Return what we have so far plus zero vectors for failed items
-                zero_vector = [0] * 1536  # Default dimension for text-embedding-3-small
-                all_embeddings.extend([zero_vector] * len(current_batch))
-                current_batch = []
-                current_tokens = 0
+                break
+    
+    # Zero vectors for failed items so results stay aligned with the input
+    for i in batch:
+        all_embeddings[i] = [0] * EMBEDDING_DIMENSION
+
+
+async def iter_embeddings_async(texts: List[str],
+                                concurrency: int = EMBEDDING_CONCURRENCY) -> AsyncIterator[Tuple[range, List[List[float]]]]:
+    """
+    Create embeddings for a list of text chunks, yielding each batch in input order as soon as it is ready.
+    All batches are sent concurrently up front, so later batches are embedded while the caller handles earlier ones.
+    
+    Args:
+        texts: List of text chunks to embed
+        concurrency: Maximum number of batch requests in flight at once
         
-        current_batch.append(text)
-        current_tokens += text_tokens
+    Yields:
+        (index range into texts, embedding vectors for those texts) per batch
+    """
+    if not texts:
+        return
     
-    # Process remaining batch
-    if current_batch:
+    batches = _build_batches(texts)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    all_embeddings = [None] * len(texts)
+    
+    # A fresh client per call: async connection pools are bound to the running event loop
+    async with AsyncOpenAI(api_key=api_key, base_url=os.getenv("EMBEDDING_BASE_URL")) as client:
+        tasks = [
+            asyncio.create_task(_embed_batch(client, texts, batch, semaphore, all_embeddings))
+            for batch in batches
+        ]
         try:
-            print(f"Creating embeddings for final batch of {len(current_batch)} texts (~{current_tokens} tokens)...")
-            response = openai_client.embeddings.create(
-                model=os.getenv("EMBEDDING_MODEL_CHOICE"),
-                input=current_batch
-            )
-            batch_embeddings = [item.embedding for item in response.data]
-            all_embeddings.extend(batch_embeddings)
-        except Exception as e:
-            print(f"Error creating embeddings for final batch: {e}")
-            zero_vector = [0] * 1536
-            all_embeddings.extend([zero_vector] * len(current_batch))
+            for batch, task in zip(batches, tasks):
+                await task
+                yield batch, all_embeddings[batch.start:batch.stop]
+        finally:
+            # The caller may stop early; don't leave requests running on a closed client
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def create_embeddings_async(texts: List[str], concurrency: int = EMBEDDING_CONCURRENCY) -> List[List[float]]:
+    """
+    Create embeddings for a list of text chunks, sending batches concurrently.
+    
+    Args:
+        texts: List of text chunks to embed
+        concurrency: Maximum number of batch requests in flight at once
+        
+    Returns:
+        List of embedding vectors, in the same order as texts
+    """
+    if not texts:
+        return []
+    
+    all_embeddings = []
+    async for _, embeddings in iter_embeddings_async(texts, concurrency):
+        all_embeddings.extend(embeddings)
     
     print(f"Created {len(all_embeddings)} embeddings total")
     return all_embeddings
+
+
+def create_embeddings(texts: List[str]) -> List[List[float]]:
+    """
+    Create embeddings for a list of text chunks using OpenAI.
+    Batches requests to avoid token limits and sends the batches concurrently.
+    
+    Args:
+        texts: List of text chunks to embed
+    
+    Returns:
+        List of embedding vectors
+    """
+    if not texts:
+        return []
+    
+    return asyncio.run(create_embeddings_async(texts))
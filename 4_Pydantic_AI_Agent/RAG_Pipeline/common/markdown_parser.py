@@ -5,23 +5,38 @@ Handles detection and parsing of Markdown tables and headings.
 import re
 from typing import List, Dict, Any
 
+# Precompiled patterns (module-level so they are compiled once per process)
+_HEADING_SPLIT = re.compile(r'\n(?=(?:#{1,6}\s))')
 
-def is_table_line(line: str) -> bool:
-    """Check if a line is part of a Markdown pipe table."""
-    # Pipe table line: | cell | cell |
-    if re.match(r'^\s*\|.*\|\s*$', line):
-        return True
-    # Delimiter row: |:---|:---:|---:|
-    if re.match(r'^\s*\|?\s*:?-+:?\s*(\|\s*:?-+:?\s*)+\|?\s*$', line):
-        return True
-    return False
+# A run of consecutive Markdown pipe-table lines, matched over the whole text so the
+# line loop happens inside the regex engine. A table line, after optional leading
+# whitespace, is either a row that starts and ends with '|' (| cell | cell |) or a
+# delimiter row of dash cells with optional alignment colons (|:---|:---:|---:|,
+# outer pipes optional); trailing whitespace is allowed on both.
+_TABLE_RUN = re.compile(
+    r'(?:^[^\S\n]*'
+    r'(?:\|[^\n]*\|'                                                  # | cell | cell |
+    r'|\|?[^\S\n]*:?-+:?[^\S\n]*(?:\|[^\S\n]*:?-+:?[^\S\n]*)+\|?)'      # |:---|:---:|
+    r'[^\S\n]*(?:\n|\Z))+',
+    re.MULTILINE
+)
 
 
 def split_by_headings(text: str) -> List[str]:
     """Split Markdown text by headings, keeping heading with its section."""
-    # Split on lines starting with # (headings), keeping the heading
-    parts = re.split(r'\n(?=(?:#{1,6}\s))', text)
-    return [p.strip() for p in parts if p.strip()]
+    # Slice between the newlines that precede headings, keeping the heading
+    parts = []
+    start = 0
+    for match in _HEADING_SPLIT.finditer(text):
+        part = text[start:match.start()].strip()
+        if part:
+            parts.append(part)
+        start = match.end()
+    
+    part = text[start:].strip()
+    if part:
+        parts.append(part)
+    return parts
 
 
 def split_markdown_into_blocks(text: str) -> List[Dict[str, Any]]:
@@ -34,30 +49,19 @@ def split_markdown_into_blocks(text: str) -> List[Dict[str, Any]]:
     Returns:
         List of blocks with 'text' and 'is_table' properties
     """
-    lines = text.split('\n')
     blocks = []
-    buffer = []
-    in_table = False
+    pos = 0
     
-    def flush():
-        if buffer:
-            blocks.append({
-                'text': '\n'.join(buffer).strip(),
-                'is_table': in_table
-            })
-            buffer.clear()
+    for match in _TABLE_RUN.finditer(text):
+        # Everything between two table runs is a single text block
+        before = text[pos:match.start()].strip()
+        if before:
+            blocks.append({'text': before, 'is_table': False})
+        blocks.append({'text': match.group().strip(), 'is_table': True})
+        pos = match.end()
     
-    for line in lines:
-        if is_table_line(line):
-            if not in_table:
-                flush()
-                in_table = True
-            buffer.append(line)
-        else:
-            if in_table:
-                flush()
-                in_table = False
-            buffer.append(line)
+    tail = text[pos:].strip()
+    if tail:
+        blocks.append({'text': tail, 'is_table': False})
     
-    flush()
-    return [b for b in blocks if b['text']]
+    return blocks
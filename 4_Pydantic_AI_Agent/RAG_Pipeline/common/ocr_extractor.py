@@ -3,7 +3,17 @@ Document text extraction using Mistral OCR API.
 Supports PDFs and images (PNG, JPG, JPEG, SVG).
 """
 import os
+import asyncio
+import hashlib
+import tempfile
+import httpx
+import orjson
 import requests
+from contextlib import contextmanager, suppress
+from typing import Any, AsyncIterable, Dict, Iterable, List, Tuple, Optional, Union, BinaryIO, Iterator
+from requests.adapters import HTTPAdapter
+from requests_toolbelt.multipart.encoder import MultipartEncoder
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 from pathlib import Path
 
@@ -12,8 +22,192 @@ project_root = Path(__file__).resolve().parent.parent.parent
 dotenv_path = project_root / '.env'
 load_dotenv(dotenv_path, override=True)
 
+# Shared session so the upload, URL and OCR calls reuse pooled keep-alive connections
+# (urllib3 only retries idempotent methods, so uploads are never sent twice)
+_OCR_SESSION = requests.Session()
+_OCR_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=32,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+))
 
-def extract_text_with_ocr(file_content: bytes, file_name: str = "document", mime_type: str = "application/pdf") -> str:
+# OCR model requested for every document (part of the OCR cache key)
+OCR_MODEL = 'mistral-ocr-latest'
+
+# Async OCR configuration (documents processed concurrently by extract_texts_with_ocr_async)
+OCR_CONCURRENCY = int(os.getenv('OCR_CONCURRENCY', '4'))
+OCR_TIMEOUT_SECONDS = 300.0
+
+# Content-addressed cache of extracted text, so unchanged files are never re-OCRed
+# (keyed by the content and the OCR model, endpoint and request options)
+# (set OCR_CACHE_DIR to an empty string to disable)
+_OCR_CACHE_DIR = os.getenv('OCR_CACHE_DIR', '~/.cache/rag_ocr')
+_OCR_CACHE_DIR = Path(_OCR_CACHE_DIR).expanduser() if _OCR_CACHE_DIR else None
+
+
+# A document to OCR: raw bytes, a path on disk, or an open binary file
+OCRSource = Union[bytes, str, os.PathLike, BinaryIO]
+# (file_content, file_name, mime_type) for batch OCR
+OCRDocument = Tuple[bytes, str, str]
+_HASH_BLOCK_SIZE = 1 << 16
+
+
+def _content_key(source: OCRSource) -> str:
+    """Return the SHA-256 hex digest of the document, reading files in blocks."""
+    if isinstance(source, (bytes, bytearray)):
+        return hashlib.sha256(source).hexdigest()
+    
+    digest = hashlib.sha256()
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as fh:
+            for block in iter(lambda: fh.read(_HASH_BLOCK_SIZE), b''):
+                digest.update(block)
+    else:
+        start = source.tell()
+        for block in iter(lambda: source.read(_HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+        source.seek(start)
+    return digest.hexdigest()
+
+
+def _ocr_cache_key(source: OCRSource, base_url: str, include_images: bool) -> str:
+    """Return the OCR cache key: the document's content hash plus the OCR settings that shape its text."""
+    settings = f"{OCR_MODEL}\n{base_url}\ninclude_image_base64={include_images}\n"
+    return hashlib.sha256((settings + _content_key(source)).encode()).hexdigest()
+
+
+@contextmanager
+def _open_source(source: OCRSource) -> Iterator[Union[bytes, BinaryIO]]:
+    """Yield an upload body for the document, opening (and closing) paths on disk."""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as fh:
+            yield fh
+    else:
+        yield source
+
+
+def _ocr_cache_path(key: str) -> Optional[Path]:
+    """Return the cache file for a content key, or None if caching is disabled."""
+    if _OCR_CACHE_DIR is None:
+        return None
+    return _OCR_CACHE_DIR / key[:2] / f"{key}.txt"
+
+
+def _read_ocr_cache(key: str) -> Optional[str]:
+    """Return previously extracted text for this content key, if cached."""
+    cache_path = _ocr_cache_path(key)
+    if cache_path is None or not cache_path.is_file():
+        return None
+    try:
+        return cache_path.read_text(encoding='utf-8')
+    except OSError as e:
+        print(f"Warning: could not read OCR cache {cache_path}: {e}")
+        return None
+
+
+def _write_ocr_cache(key: str, extracted_text: str) -> None:
+    """Atomically store extracted text for this content key (tmp file + os.replace)."""
+    cache_path = _ocr_cache_path(key)
+    if cache_path is None:
+        return
+    tmp_name = None
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=cache_path.parent, delete=False) as tmp:
+            tmp_name = tmp.name
+            tmp.write(extracted_text)
+        os.replace(tmp_name, cache_path)
+    except OSError as e:
+        print(f"Warning: could not write OCR cache {cache_path}: {e}")
+        if tmp_name is not None:
+            # Don't leave a partial temp file behind in the cache directory
+            with suppress(OSError):
+                os.unlink(tmp_name)
+
+
+def _extract_pages(pages) -> str:
+    """Join the text of every page in a 'pages' array."""
+    if not isinstance(pages, list):
+        return ''
+    page_texts = []
+    for page in pages:
+        if isinstance(page, dict):
+            page_text = page.get('text', page.get('content', ''))
+            if page_text:
+                page_texts.append(page_text)
+    return "\n\n".join(page_texts)
+
+
+def _extract_result(result) -> str:
+    """Extract text from a 'result' field (a string or a dict with text/content)."""
+    if isinstance(result, str):
+        return result
+    if isinstance(result, dict):
+        return result.get('text', result.get('content', ''))
+    return ''
+
+
+def _extract_choices(choices) -> str:
+    """Extract the message content of the first choice (ChatGPT-style response)."""
+    if isinstance(choices, list) and len(choices) > 0 and isinstance(choices[0], dict):
+        return choices[0].get('message', {}).get('content', '')
+    return ''
+
+
+def _identity(value):
+    return value
+
+
+# Response fields to try, in priority order; the first one yielding text wins
+_OCR_EXTRACTORS = (
+    ('text', _identity),
+    ('content', _identity),
+    ('pages', _extract_pages),
+    ('result', _extract_result),
+    ('markdown', _identity),
+    ('data', _identity),
+    ('choices', _extract_choices),
+)
+
+
+def _parse_ocr_response(ocr_data) -> Tuple[str, bool]:
+    """
+    Extract the document text from a Mistral OCR response.
+    
+    Args:
+        ocr_data: Decoded JSON body of the OCR response
+        
+    Returns:
+        Tuple of (extracted text, whether it came from a known field); the text is the
+        stringified response if no known field is present
+    """
+    if isinstance(ocr_data, dict):
+        for key, extract in _OCR_EXTRACTORS:
+            if key in ocr_data:
+                extracted_text = extract(ocr_data[key])
+                if extracted_text:
+                    return extracted_text, True
+    
+    # Final fallback: convert the entire response to string
+    print(f"Warning: Could not find text in expected fields. Response keys: {ocr_data.keys() if isinstance(ocr_data, dict) else 'not a dict'}")
+    return str(ocr_data), False
+
+
+def _ocr_payload(document_url: str, include_images: bool) -> Dict[str, Any]:
+    """Build the Mistral OCR request body for a signed document URL."""
+    return {
+        'model': OCR_MODEL,
+        'document': {
+            'type': 'document_url',
+            'document_url': document_url
+        },
+        # Base64 page images dominate the response size and the pipeline only uses the text
+        'include_image_base64': include_images
+    }
+
+
+def extract_text_with_ocr(source: OCRSource, file_name: str = "document", mime_type: str = "application/pdf",
+                          include_images: bool = False) -> str:
     """
     Extract text from a PDF or image file using Mistral OCR API.
     
@@ -26,10 +220,14 @@ def extract_text_with_ocr(file_content: bytes, file_name: str = "document", mime
     - PDFs: application/pdf
     - Images: image/png, image/jpg, image/jpeg, image/svg
     
+    Paths and open files are streamed to the upload endpoint instead of being
+    read into memory first.
+    
     Args:
-        file_content: Binary content of the file
+        source: Binary content of the file, a path to it, or an open binary file
         file_name: Name of the file (default: "document")
         mime_type: MIME type of the file (default: "application/pdf")
+        include_images: Request base64 page images along with the text (default: False)
         
     Returns:
         Extracted text from the document using Mistral OCR
@@ -38,6 +236,12 @@ def extract_text_with_ocr(file_content: bytes, file_name: str = "document", mime
     mistral_api_key = os.getenv('LLM_OCR_API_KEY')
     mistral_base_url = os.getenv('LLM_OCR_URL', 'https://api.mistral.ai/v1')
     
+    cache_key = _ocr_cache_key(source, mistral_base_url, include_images)
+    cached_text = _read_ocr_cache(cache_key)
+    if cached_text is not None:
+        print(f"Using cached OCR text for '{file_name}' ({len(cached_text)} characters)")
+        return cached_text
+    
     if not mistral_api_key:
         print("Warning: LLM_OCR_API_KEY not set, falling back to filename")
         return file_name
@@ -45,19 +249,18 @@ def extract_text_with_ocr(file_content: bytes, file_name: str = "document", mime
     try:
         # Step 1: Upload file to Mistral
         upload_url = f"{mistral_base_url.replace('/ocr', '')}/files"
-        headers = {
-            'Authorization': f'Bearer {mistral_api_key}'
-        }
-        
-        files = {
-            'file': (file_name, file_content, mime_type)
-        }
-        data = {
-            'purpose': 'ocr'
-        }
+        # Sent per request: the session is shared, so its default headers are left alone
+        auth_headers = {'Authorization': f'Bearer {mistral_api_key}'}
         
         print(f"Uploading {mime_type} file to Mistral API...")
-        upload_response = requests.post(upload_url, headers=headers, files=files, data=data)
+        with _open_source(source) as upload_body:
+            # MultipartEncoder streams the body instead of building it in memory
+            encoder = MultipartEncoder(fields={
+                'purpose': 'ocr',
+                'file': (file_name, upload_body, mime_type)
+            })
+            upload_response = _OCR_SESSION.post(upload_url, data=encoder,
+                                                headers={**auth_headers, 'Content-Type': encoder.content_type})
         upload_response.raise_for_status()
         upload_data = upload_response.json()
         file_id = upload_data.get('id')
@@ -72,7 +275,7 @@ def extract_text_with_ocr(file_content: bytes, file_name: str = "document", mime
         url_params = {'expiry': '24'}  # 24 hours expiry
         
         print(f"Getting file URL...")
-        url_response = requests.get(url_endpoint, headers=headers, params=url_params)
+        url_response = _OCR_SESSION.get(url_endpoint, params=url_params, headers=auth_headers)
         url_response.raise_for_status()
         url_data = url_response.json()
         document_url = url_data.get('url')
@@ -84,70 +287,19 @@ def extract_text_with_ocr(file_content: bytes, file_name: str = "document", mime
         
         # Step 3: Process with OCR
         ocr_url = mistral_base_url if mistral_base_url.endswith('/ocr') else f"{mistral_base_url}/ocr"
-        ocr_payload = {
-            'model': 'mistral-ocr-latest',
-            'document': {
-                'type': 'document_url',
-                'document_url': document_url
-            },
-            'include_image_base64': True
-        }
+        ocr_payload = _ocr_payload(document_url, include_images)
         
         print(f"Processing document with Mistral OCR...")
-        ocr_response = requests.post(ocr_url, headers=headers, json=ocr_payload)
+        ocr_response = _OCR_SESSION.post(ocr_url, json=ocr_payload, headers=auth_headers)
         ocr_response.raise_for_status()
-        ocr_data = ocr_response.json()
-        
-        # Extract text from OCR response
-        extracted_text = ""
-        
-        # Try to extract text from various possible response structures
-        if isinstance(ocr_data, dict):
-            # Check for 'text' field
-            if 'text' in ocr_data:
-                extracted_text = ocr_data['text']
-            # Check for 'content' field
-            elif 'content' in ocr_data:
-                extracted_text = ocr_data['content']
-            # Check for 'pages' array
-            elif 'pages' in ocr_data and isinstance(ocr_data['pages'], list):
-                page_texts = []
-                for page in ocr_data['pages']:
-                    if isinstance(page, dict):
-                        page_text = page.get('text', page.get('content', ''))
-                        if page_text:
-                            page_texts.append(page_text)
-                extracted_text = "\n\n".join(page_texts)
-            # Check for 'result' field
-            elif 'result' in ocr_data:
-                result = ocr_data['result']
-                if isinstance(result, str):
-                    extracted_text = result
-                elif isinstance(result, dict):
-                    extracted_text = result.get('text', result.get('content', ''))
-            # Check for markdown or data field
-            elif 'markdown' in ocr_data:
-                extracted_text = ocr_data['markdown']
-            elif 'data' in ocr_data:
-                extracted_text = ocr_data['data']
-        
-        # If still no text, try to convert the entire response to string
-        if not extracted_text:
-            print(f"Warning: Could not find text in expected fields. Response keys: {ocr_data.keys() if isinstance(ocr_data, dict) else 'not a dict'}")
-            # Try extracting from choices (ChatGPT-style response)
-            if isinstance(ocr_data, dict) and 'choices' in ocr_data:
-                choices = ocr_data['choices']
-                if isinstance(choices, list) and len(choices) > 0:
-                    first_choice = choices[0]
-                    if isinstance(first_choice, dict):
-                        message = first_choice.get('message', {})
-                        extracted_text = message.get('content', '')
-            
-            # Final fallback
-            if not extracted_text:
-                extracted_text = str(ocr_data)
+        ocr_data = orjson.loads(ocr_response.content)
+        
+        extracted_text, recognised = _parse_ocr_response(ocr_data)
         
         print(f"OCR completed successfully, extracted {len(extracted_text)} characters")
+        if recognised:
+            # A stringified response is not cached, so a later run can still find the text
+            _write_ocr_cache(cache_key, extracted_text)
         return extracted_text
         
     except requests.exceptions.RequestException as e:
@@ -163,6 +315,135 @@ def extract_text_with_ocr(file_content: bytes, file_name: str = "document", mime
         return file_name
 
 
+async def _upload(client: httpx.AsyncClient, files_url: str, file_content: bytes, file_name: str, mime_type: str) -> str:
+    """Upload a file to Mistral and return its file ID."""
+    response = await client.post(files_url, files={'file': (file_name, file_content, mime_type)}, data={'purpose': 'ocr'})
+    response.raise_for_status()
+    file_id = response.json().get('id')
+    if not file_id:
+        raise Exception("No file ID returned from upload")
+    return file_id
+
+
+async def _get_url(client: httpx.AsyncClient, files_url: str, file_id: str) -> str:
+    """Get a signed URL for an uploaded file."""
+    response = await client.get(f"{files_url}/{file_id}/url", params={'expiry': '24'})
+    response.raise_for_status()
+    document_url = response.json().get('url')
+    if not document_url:
+        raise Exception("No document URL returned")
+    return document_url
+
+
+async def _ocr(client: httpx.AsyncClient, ocr_url: str, document_url: str, include_images: bool = False):
+    """Run Mistral OCR on a document URL and return the decoded response."""
+    response = await client.post(ocr_url, json=_ocr_payload(document_url, include_images))
+    response.raise_for_status()
+    return orjson.loads(response.content)
+
+
+def _new_async_client(mistral_api_key: str) -> httpx.AsyncClient:
+    """Create an HTTP/2 client with pooled keep-alive connections for Mistral calls."""
+    return httpx.AsyncClient(
+        http2=True,
+        headers={'Authorization': f'Bearer {mistral_api_key}'},
+        limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+        timeout=OCR_TIMEOUT_SECONDS
+    )
+
+
+async def extract_text_with_ocr_async(file_content: bytes, file_name: str = "document", mime_type: str = "application/pdf",
+                                      client: Optional[httpx.AsyncClient] = None, include_images: bool = False) -> str:
+    """
+    Async version of extract_text_with_ocr() for processing many documents concurrently.
+    
+    Args:
+        file_content: Binary content of the file
+        file_name: Name of the file (default: "document")
+        mime_type: MIME type of the file (default: "application/pdf")
+        client: Shared client to reuse across documents (a new one is created if omitted)
+        include_images: Request base64 page images along with the text (default: False)
+        
+    Returns:
+        Extracted text from the document, or the file name if extraction failed
+    """
+    mistral_api_key = os.getenv('LLM_OCR_API_KEY')
+    mistral_base_url = os.getenv('LLM_OCR_URL', 'https://api.mistral.ai/v1')
+    
+    cache_key = _ocr_cache_key(file_content, mistral_base_url, include_images)
+    cached_text = _read_ocr_cache(cache_key)
+    if cached_text is not None:
+        print(f"Using cached OCR text for '{file_name}' ({len(cached_text)} characters)")
+        return cached_text
+    
+    if not mistral_api_key:
+        print("Warning: LLM_OCR_API_KEY not set, falling back to filename")
+        return file_name
+    
+    if client is None:
+        async with _new_async_client(mistral_api_key) as new_client:
+            return await extract_text_with_ocr_async(file_content, file_name, mime_type, new_client, include_images)
+    
+    files_url = f"{mistral_base_url.replace('/ocr', '')}/files"
+    ocr_url = mistral_base_url if mistral_base_url.endswith('/ocr') else f"{mistral_base_url}/ocr"
+    
+    try:
+        print(f"Uploading {mime_type} file '{file_name}' to Mistral API...")
+        file_id = await _upload(client, files_url, file_content, file_name, mime_type)
+        document_url = await _get_url(client, files_url, file_id)
+        print(f"Processing '{file_name}' with Mistral OCR...")
+        extracted_text, recognised = _parse_ocr_response(await _ocr(client, ocr_url, document_url, include_images))
+        print(f"OCR completed successfully, extracted {len(extracted_text)} characters")
+        if recognised:
+            # A stringified response is not cached, so a later run can still find the text
+            _write_ocr_cache(cache_key, extracted_text)
+        return extracted_text
+    
+    except httpx.HTTPStatusError as e:
+        print(f"Error during Mistral OCR API request: {e}")
+        print(f"Response status: {e.response.status_code}")
+        print(f"Response body: {e.response.text[:500]}")
+        return file_name
+    except Exception as e:
+        print(f"Unexpected error during document extraction with Mistral OCR: {e}")
+        return file_name
+
+
+async def extract_texts_with_ocr_async(documents: Union[Iterable[OCRDocument], AsyncIterable[OCRDocument]],
+                                       concurrency: int = OCR_CONCURRENCY) -> List[str]:
+    """
+    Run OCR on several documents concurrently over one shared connection pool.
+    
+    Documents can also come from an async iterator (e.g. one that downloads them),
+    in which case each document starts OCR as soon as it is yielded.
+    
+    Args:
+        documents: (file_content, file_name, mime_type) tuples, or an async iterator of them
+        concurrency: Maximum number of documents in flight at once
+        
+    Returns:
+        Extracted texts, in the same order as documents
+    """
+    mistral_api_key = os.getenv('LLM_OCR_API_KEY')
+    if not mistral_api_key:
+        if isinstance(documents, AsyncIterable):
+            return [await extract_text_with_ocr_async(*document) async for document in documents]
+        return [await extract_text_with_ocr_async(*document) for document in documents]
+    
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    
+    async with _new_async_client(mistral_api_key) as client:
+        async def run(document: OCRDocument) -> str:
+            async with semaphore:
+                return await extract_text_with_ocr_async(*document, client=client)
+        
+        if isinstance(documents, AsyncIterable):
+            tasks = [asyncio.create_task(run(document)) async for document in documents]
+        else:
+            tasks = [run(document) for document in documents]
+        return list(await asyncio.gather(*tasks))
+
+
 # Backward compatibility wrapper for PDFs
 def extract_text_from_pdf(file_content: bytes, file_name: str = "document.pdf") -> str:
     """
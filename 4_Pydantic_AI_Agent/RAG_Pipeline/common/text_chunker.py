@@ -22,6 +22,12 @@ MIN_CHUNK_SIZE = 200
 MERGE_PAD = int(MAX_CHUNK_SIZE * 1.05)
 ENABLE_HEADING_SPLIT = True
 
+# Precompiled patterns (module-level so they are compiled once per process)
+# Greedy prefix makes a single match land on the LAST sentence ending in the window
+_LAST_SENT_END = re.compile(r'.*[.!?]\s+', re.DOTALL)
+# Heading or pipe-table row, in one scan that stops at the first hit
+_MARKDOWNISH = re.compile(r'(?:^|\n)#{1,6}\s+\S|\n\|[^|\n]+\|')
+
 
 def llm_breakpoint_sync(first_window: str, max_chars: int) -> int:
     """
@@ -37,16 +43,15 @@ def llm_breakpoint_sync(first_window: str, max_chars: int) -> int:
     # Find the last sentence ending before max_chars
     window = first_window[:max_chars]
     
-    # Look for sentence endings
-    sentence_endings = [m.end() for m in re.finditer(r'[.!?]\s+', window)]
-    
-    if sentence_endings:
-        return sentence_endings[-1]
+    # Look for the last sentence ending
+    last_sentence = _LAST_SENT_END.match(window)
+    if last_sentence:
+        return last_sentence.end()
     
-    # If no sentence ending, look for paragraph break
-    paragraph_breaks = [m.end() for m in re.finditer(r'\n\n', window)]
-    if paragraph_breaks:
-        return paragraph_breaks[-1]
+    # If no sentence ending, look for the last paragraph break
+    paragraph_break = window.rfind('\n\n')
+    if paragraph_break != -1:
+        return paragraph_break + 2
     
     # Final fallback: return max_chars
     return max_chars
@@ -71,19 +76,20 @@ def chunk_text(text: str, chunk_size: int = 1000, overlap: int = 0, use_advanced
         
     Returns:
         List of text chunks
+        
+    Raises:
+        ValueError: If simple chunking is used and overlap is not smaller than chunk_size
     """
     if not text:
         return []
     
     # For backwards compatibility, offer simple chunking
     if not use_advanced:
-        text = text.replace('\r', '')
-        chunks = []
-        for i in range(0, len(text), chunk_size - overlap):
-            chunk = text[i:i + chunk_size]
-            if chunk:
-                chunks.append(chunk)
-        return chunks
+        if '\r' in text:
+            text = text.replace('\r', '')
+        if overlap >= chunk_size:
+            raise ValueError(f"overlap ({overlap}) must be smaller than chunk_size ({chunk_size})")
+        return [text[i:i + chunk_size] for i in range(0, len(text), chunk_size - overlap)]
     
     # Advanced chunking pipeline
     max_size = chunk_size or MAX_CHUNK_SIZE
@@ -95,9 +101,7 @@ def chunk_text(text: str, chunk_size: int = 1000, overlap: int = 0, use_advanced
     cleaned = clean_text(sanitized)
     
     # 2. Detect if markdown-ish (has headings or tables)
-    has_heading = bool(re.search(r'(^|\n)#{1,6}\s+\S', cleaned))
-    has_table = bool(re.search(r'\n\|[^|\n]+\|', cleaned)) and bool(re.search(r'\|.*\|', cleaned))
-    is_markdownish = has_heading or has_table
+    is_markdownish = bool(_MARKDOWNISH.search(cleaned))
     
     # 3. Split into blocks
     blocks = [{'text': cleaned, 'is_table': False}]
@@ -124,7 +128,8 @@ def chunk_text(text: str, chunk_size: int = 1000, overlap: int = 0, use_advanced
     chunks = []
     
     for blk in blocks:
-        content = blk['text'].strip()
+        # Blocks are already stripped by clean_text / the markdown splitters
+        content = blk['text']
         if not content:
             continue
         
@@ -154,30 +159,40 @@ def chunk_text(text: str, chunk_size: int = 1000, overlap: int = 0, use_advanced
                 remaining = remaining[bp:].strip()
     
     # 5. Merge small chunks with neighbors (allow small overflow, but NEVER merge tables)
-    i = 0
-    while i < len(chunks):
-        cur = chunks[i]
+    # Single forward pass: `merged` is a stack of finished chunks, so a backward
+    # merge pops its top instead of shifting the list
+    merged = []
+    next_idx = 0
+    cur = None
+    while True:
+        if cur is None:
+            if next_idx == len(chunks):
+                break
+            cur = chunks[next_idx]
+            next_idx += 1
+        
         cur_size = len(cur['content'])
         
         if cur_size < min_size and not cur.get('is_table'):
             # Try forward merge
-            if i + 1 < len(chunks) and not chunks[i + 1].get('is_table'):
-                next_size = len(chunks[i + 1]['content'])
+            if next_idx < len(chunks) and not chunks[next_idx].get('is_table'):
+                next_size = len(chunks[next_idx]['content'])
                 if cur_size + next_size <= merge_pad:
-                    cur['content'] += '\n\n' + chunks[i + 1]['content']
-                    chunks.pop(i + 1)
+                    cur['content'] += '\n\n' + chunks[next_idx]['content']
+                    next_idx += 1
                     continue
             
-            # Try backward merge
-            if i > 0 and not chunks[i - 1].get('is_table'):
-                prev_size = len(chunks[i - 1]['content'])
+            # Try backward merge (the merged chunk is then re-evaluated)
+            if merged and not merged[-1].get('is_table'):
+                prev_size = len(merged[-1]['content'])
                 if prev_size + cur_size <= merge_pad:
-                    chunks[i - 1]['content'] += '\n\n' + cur['content']
-                    chunks.pop(i)
-                    i -= 1
+                    prev = merged.pop()
+                    prev['content'] += '\n\n' + cur['content']
+                    cur = prev
                     continue
         
-        i += 1
+        merged.append(cur)
+        cur = None
     
     # 6. Extract just the content strings
-    return [chunk['content'] for chunk in chunks]
+    return [chunk['content'] for chunk in merged]
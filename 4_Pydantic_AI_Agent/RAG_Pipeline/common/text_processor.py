@@ -6,22 +6,42 @@ from typing import List, Dict, Any
 
 # Import from specialized modules
 from .text_chunker import chunk_text
-from .ocr_extractor import extract_text_from_pdf, extract_text_with_ocr
-from .csv_handler import extract_schema_from_csv, extract_rows_from_csv
-from .embeddings import create_embeddings
+from .ocr_extractor import extract_text_from_pdf, extract_text_with_ocr, extract_texts_with_ocr_async
+from .csv_handler import extract_schema_from_csv, extract_rows_from_csv, iter_rows_from_csv
+from .embeddings import create_embeddings, iter_embeddings_async
 
 # Re-export all functions for backward compatibility
 __all__ = [
     'chunk_text',
     'extract_text_from_pdf',
     'extract_text_with_ocr',
+    'extract_texts_with_ocr_async',
     'extract_text_from_file',
     'create_embeddings',
+    'iter_embeddings_async',
     'is_tabular_file',
+    'needs_ocr',
     'extract_schema_from_csv',
     'extract_rows_from_csv',
+    'iter_rows_from_csv',
 ]
 
+# Image types that are sent to Mistral OCR (PDFs always are)
+OCR_IMAGE_MIME_TYPES = ['image/png', 'image/jpg', 'image/jpeg', 'image/svg', 'image/svg+xml']
+
+
+def needs_ocr(mime_type: str) -> bool:
+    """
+    Check if a file's text is extracted with Mistral OCR (PDFs and supported images).
+    
+    Args:
+        mime_type: The MIME type of the file
+        
+    Returns:
+        bool: True if extract_text_from_file() would use OCR for this file
+    """
+    return 'application/pdf' in mime_type or mime_type in OCR_IMAGE_MIME_TYPES
+
 
 def extract_text_from_file(file_content: bytes, mime_type: str, file_name: str, config: Dict[str, Any] = None) -> str:
     """
@@ -43,7 +63,7 @@ def extract_text_from_file(file_content: bytes, mime_type: str, file_name: str,
     # Use Mistral OCR for PDFs and images
     if 'application/pdf' in mime_type:
         return extract_text_from_pdf(file_content, file_name)
-    elif mime_type.startswith('image/') and mime_type in ['image/png', 'image/jpg', 'image/jpeg', 'image/svg', 'image/svg+xml']:
+    elif mime_type in OCR_IMAGE_MIME_TYPES:
         # Use OCR for images
         print(f"Processing image {file_name} with Mistral OCR")
         return extract_text_with_ocr(file_content, file_name, mime_type)
@@ -4,6 +4,19 @@ Handles LaTeX escapes, formatting normalization, and whitespace cleanup.
 """
 import re
 
+# Precompiled patterns (module-level so they are compiled once per process)
+_LATEX_UNESCAPE = re.compile(r'\\([%_#&$])')
+_MATH_DOLLAR = re.compile(r'\$\s*([^$]*?)\s*\$')
+_MATH_PAREN = re.compile(r'\\\(\s*([\s\S]*?)\s*\\\)')
+_MATH_BRACKET = re.compile(r'\\\[\s*([\s\S]*?)\s*\\\]')
+_BS_PUNCT = re.compile(r'\\([\'\"(){}\[\]?:;,.!%\-])')
+_PCT_SPACE = re.compile(r'(\d)\s+%')
+_PCT_NL = re.compile(r'(\d)\s*\n+\s*%')
+_SPACE_BEFORE_PUNCT = re.compile(r'\s+([,;:.!?)])')
+_SPACE_AFTER_OPEN = re.compile(r'([(\[])\s+')
+_SPACES = re.compile(r'[ \t]+')
+_EXTRA_NEWLINES = re.compile(r'\n{3,}')
+
 
 def sanitize_text(text: str) -> str:
     """
@@ -23,28 +36,24 @@ def sanitize_text(text: str) -> str:
     if text.count('\\n') >= 3:
         text = text.replace('\\n', '\n')
     
-    # Unescape common LaTeX escapes
-    text = text.replace('\\%', '%')
-    text = text.replace('\\_', '_')
-    text = text.replace('\\#', '#')
-    text = text.replace('\\&', '&')
-    text = text.replace('\\$', '$')
+    # Unescape common LaTeX escapes (\% \_ \# \& \$) in a single pass
+    text = _LATEX_UNESCAPE.sub(r'\1', text)
     
     # Strip math wrappers, keep inner text
-    text = re.sub(r'\$\s*([^$]*?)\s*\$', r'\1', text)           # $ ... $
-    text = re.sub(r'\\\(\s*([\s\S]*?)\s*\\\)', r'\1', text)     # \( ... \)
-    text = re.sub(r'\\\[\s*([\s\S]*?)\s*\\\]', r'\1', text)     # \[ ... \]
+    text = _MATH_DOLLAR.sub(r'\1', text)     # $ ... $
+    text = _MATH_PAREN.sub(r'\1', text)      # \( ... \)
+    text = _MATH_BRACKET.sub(r'\1', text)    # \[ ... \]
     
     # Collapse stray backslashes before punctuation (e.g., \" → ")
-    text = re.sub(r'\\([\'\"(){}\[\]?:;,.!%\-])', r'\1', text)
+    text = _BS_PUNCT.sub(r'\1', text)
     
     # Normalize spaces/newlines around percentages (7 % → 7%, 20\n\n% → 20%)
-    text = re.sub(r'(\d)\s+%', r'\1%', text)
-    text = re.sub(r'(\d)\s*\n+\s*%', r'\1%', text)
+    text = _PCT_SPACE.sub(r'\1%', text)
+    text = _PCT_NL.sub(r'\1%', text)
     
     # Normalize spaces around punctuation
-    text = re.sub(r'\s+([,;:.!?)])', r'\1', text)
-    text = re.sub(r'([(\[])\s+', r'\1', text)
+    text = _SPACE_BEFORE_PUNCT.sub(r'\1', text)
+    text = _SPACE_AFTER_OPEN.sub(r'\1', text)
     
     return text
 
@@ -59,10 +68,6 @@ def clean_text(text: str) -> str:
     Returns:
         Cleaned text
     """
-    # Collapse runs of spaces/tabs
-    text = re.sub(r'[ \t]+', ' ', text)
-    
-    # Cap blank lines at two
-    text = re.sub(r'\n{3,}', '\n\n', text)
-    
-    return text.strip()
+    # Collapse runs of spaces/tabs and cap blank lines at two
+    text = _SPACES.sub(' ', text)
+    return _EXTRA_NEWLINES.sub('\n\n', text).strip()
@@ -0,0 +1,36 @@
+import os
+import sys
+import json
+import pytest
+
+# Add the parent directory to sys.path to import the modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from common.config_loader import load_config, save_config
+
+class TestConfigLoader:
+    def test_reparses_only_when_file_changes(self, tmp_path):
+        """Test that unchanged configs come from the cache and edits are picked up"""
+        config_path = tmp_path / "config.json"
+        config_path.write_text(json.dumps({"last_check_time": "a"}))
+        
+        first = load_config(config_path)
+        first["last_check_time"] = "mutated"
+        assert load_config(config_path) == {"last_check_time": "a"}
+        
+        save_config(config_path, {"last_check_time": "b"})
+        os.utime(config_path, ns=(0, os.stat(config_path).st_mtime_ns + 1))
+        assert load_config(config_path) == {"last_check_time": "b"}
+    
+    def test_save_is_atomic_and_indented(self, tmp_path):
+        """Test that saving leaves no temp files behind and writes readable JSON"""
+        config_path = tmp_path / "config.json"
+        save_config(config_path, {"text_processing": {"default_chunk_size": 400}})
+        
+        assert json.loads(config_path.read_text()) == {"text_processing": {"default_chunk_size": 400}}
+        assert '\n  "text_processing"' in config_path.read_text()
+        assert [p.name for p in tmp_path.iterdir()] == ["config.json"]
+    
+    def test_missing_file_raises(self, tmp_path):
+        """Test that a missing config raises FileNotFoundError for callers to handle"""
+        with pytest.raises(FileNotFoundError):
+            load_config(tmp_path / "missing.json")
@@ -274,6 +274,15 @@ class TestInsertDocumentRows:
         captured = capfd.readouterr()
         assert "Error inserting document rows: DB error" in captured.out
 
+def embedding_batches(*batches):
+    """Side effect for a patched iter_embeddings_async that yields the given embedding batches in order"""
+    async def iter_embeddings(texts):
+        start = 0
+        for embeddings in batches:
+            yield range(start, start + len(embeddings)), embeddings
+            start += len(embeddings)
+    return iter_embeddings
+
 class TestProcessFileForRag:
     @pytest.fixture
     def setup_mocks(self):
@@ -284,9 +293,9 @@ class TestProcessFileForRag:
              patch('common.db_handler.insert_document_chunks') as mock_insert_chunks, \
              patch('common.db_handler.is_tabular_file') as mock_is_tabular, \
              patch('common.db_handler.extract_schema_from_csv') as mock_extract_schema, \
-             patch('common.db_handler.extract_rows_from_csv') as mock_extract_rows, \
+             patch('common.db_handler.iter_rows_from_csv') as mock_extract_rows, \
              patch('common.db_handler.chunk_text') as mock_chunk_text, \
-             patch('common.db_handler.create_embeddings') as mock_create_embeddings:
+             patch('common.db_handler.iter_embeddings_async') as mock_iter_embeddings:
             
             yield {
                 'delete_document': mock_delete_document,
@@ -297,7 +306,7 @@ class TestProcessFileForRag:
                 'extract_schema': mock_extract_schema,
                 'extract_rows': mock_extract_rows,
                 'chunk_text': mock_chunk_text,
-                'create_embeddings': mock_create_embeddings
+                'iter_embeddings': mock_iter_embeddings
             }
     
     def test_non_tabular_file(self, setup_mocks):
@@ -307,7 +316,7 @@ class TestProcessFileForRag:
         # Setup mocks
         mocks['is_tabular'].return_value = False
         mocks['chunk_text'].return_value = ["Chunk 1", "Chunk 2"]
-        mocks['create_embeddings'].return_value = [[0.1, 0.2], [0.3, 0.4]]
+        mocks['iter_embeddings'].side_effect = embedding_batches([[0.1, 0.2], [0.3, 0.4]])
         
         # Test data
         file_content = b'file content'
@@ -330,10 +339,10 @@ class TestProcessFileForRag:
         mocks['extract_rows'].assert_not_called()
         mocks['insert_rows'].assert_not_called()
         mocks['chunk_text'].assert_called_once_with(content, chunk_size=400, overlap=0)
-        mocks['create_embeddings'].assert_called_once_with(["Chunk 1", "Chunk 2"])
+        mocks['iter_embeddings'].assert_called_once_with(["Chunk 1", "Chunk 2"])
         mocks['insert_chunks'].assert_called_once_with(
             ["Chunk 1", "Chunk 2"], [[0.1, 0.2], [0.3, 0.4]], 
-            file_id, file_url, file_title, mime_type
+            file_id, file_url, file_title, mime_type, None, start_index=0
         )
     
     def test_tabular_file(self, setup_mocks):
@@ -345,7 +354,7 @@ class TestProcessFileForRag:
         mocks['extract_schema'].return_value = ["col1", "col2"]
         mocks['extract_rows'].return_value = [{"col1": "val1", "col2": "val2"}]
         mocks['chunk_text'].return_value = ["Chunk 1", "Chunk 2"]
-        mocks['create_embeddings'].return_value = [[0.1, 0.2], [0.3, 0.4]]
+        mocks['iter_embeddings'].side_effect = embedding_batches([[0.1, 0.2], [0.3, 0.4]])
         
         # Test data
         file_content = b'col1,col2\nval1,val2'
@@ -369,8 +378,25 @@ class TestProcessFileForRag:
         mocks['extract_rows'].assert_called_once_with(file_content)
         mocks['insert_rows'].assert_called_once_with(file_id, [{"col1": "val1", "col2": "val2"}])
         mocks['chunk_text'].assert_called_once_with(content, chunk_size=400, overlap=0)
-        mocks['create_embeddings'].assert_called_once_with(["Chunk 1", "Chunk 2"])
+        mocks['iter_embeddings'].assert_called_once_with(["Chunk 1", "Chunk 2"])
         mocks['insert_chunks'].assert_called_once_with(
             ["Chunk 1", "Chunk 2"], [[0.1, 0.2], [0.3, 0.4]], 
-            file_id, file_url, file_title, mime_type
+            file_id, file_url, file_title, mime_type, None, start_index=0
         )
+    
+    def test_embedding_batches_inserted_in_order(self, setup_mocks):
+        """Test that each embedding batch is inserted on its own, with chunk indexes continuing across batches"""
+        mocks = setup_mocks
+        mocks['is_tabular'].return_value = False
+        mocks['chunk_text'].return_value = ["Chunk 1", "Chunk 2", "Chunk 3"]
+        mocks['iter_embeddings'].side_effect = embedding_batches([[0.1], [0.2]], [[0.3]])
+        
+        process_file_for_rag(b'file content', "Text content", "file123", "https://example.com/file123",
+                             "Test File", "text/plain", config={})
+        
+        assert mocks['insert_chunks'].call_args_list == [
+            call(["Chunk 1", "Chunk 2"], [[0.1], [0.2]], "file123", "https://example.com/file123",
+                 "Test File", "text/plain", None, start_index=0),
+            call(["Chunk 3"], [[0.3]], "file123", "https://example.com/file123",
+                 "Test File", "text/plain", None, start_index=2),
+        ]
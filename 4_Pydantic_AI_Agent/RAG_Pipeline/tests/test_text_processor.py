@@ -1,5 +1,5 @@
 import pytest
-from unittest.mock import patch, MagicMock, mock_open
+from unittest.mock import patch, MagicMock, AsyncMock, mock_open
 import io
 import csv
 import os
@@ -30,7 +30,8 @@ with patch.dict(os.environ, {
             create_embeddings, 
             is_tabular_file, 
             extract_schema_from_csv, 
-            extract_rows_from_csv
+            extract_rows_from_csv,
+            iter_rows_from_csv
         )
 
 class TestChunkText:
@@ -70,6 +71,22 @@ class TestChunkText:
         assert result[2] == "A" * 400
         # Last chunk might be shorter
         assert len(result[3]) <= 400
+    
+    def test_simple_mode_overlap_not_smaller_than_chunk(self):
+        """Test that simple chunking rejects an overlap >= chunk_size"""
+        with pytest.raises(ValueError):
+            chunk_text("A\r\nB" * 3, chunk_size=2, overlap=5, use_advanced=False)
+        with pytest.raises(ValueError):
+            chunk_text("A\r\nB" * 3, chunk_size=2, overlap=2, use_advanced=False)
+    
+    def test_markdown_table_kept_atomic(self):
+        """Test that a pipe table is emitted as its own chunk, separate from prose"""
+        table = "| Name | Age |\n|:---|---:|\n| John | 30 |"
+        prose = "Intro paragraph. " * 20
+        text = f"# Title\n\n{prose}\n{table}\n\nClosing paragraph. " + "More text. " * 20
+        result = chunk_text(text, chunk_size=400)
+        assert table in result
+        assert all('|' not in chunk for chunk in result if chunk != table)
 
 class TestExtractTextFromPdf:
     @patch('tempfile.NamedTemporaryFile')
@@ -146,31 +163,71 @@ class TestCreateEmbeddings:
     
     @pytest.fixture
     def openai_client_mock(self):
-        return MagicMock()
+        client = MagicMock()
+        client.embeddings.create = AsyncMock()
+        with patch('common.embeddings.AsyncOpenAI') as mock_async_openai:
+            mock_async_openai.return_value.__aenter__.return_value = client
+            yield client
     
     def test_with_text(self, openai_client_mock):
         """Test creating embeddings"""
-        # Patch the openai_client in text_processor
-        with patch('common.text_processor.openai_client', openai_client_mock):
-            # Setup mock response
-            mock_response = MagicMock()
-            mock_item1 = MagicMock()
-            mock_item1.embedding = [0.1, 0.2, 0.3]
-            mock_item2 = MagicMock()
-            mock_item2.embedding = [0.4, 0.5, 0.6]
-            mock_response.data = [mock_item1, mock_item2]
-            
-            openai_client_mock.embeddings.create.return_value = mock_response
-        
-            # Call the function
-            result = create_embeddings(["Text 1", "Text 2"])
-            
-            # Assertions
-            openai_client_mock.embeddings.create.assert_called_once_with(
-                model=None,  # This matches the actual call when EMBEDDING_MODEL_CHOICE is not set
-                input=["Text 1", "Text 2"]
-            )
-            assert result == [[0.1, 0.2, 0.3], [0.4, 0.5, 0.6]]
+        # Setup mock response
+        mock_response = MagicMock()
+        mock_item1 = MagicMock()
+        mock_item1.embedding = [0.1, 0.2, 0.3]
+        mock_item2 = MagicMock()
+        mock_item2.embedding = [0.4, 0.5, 0.6]
+        mock_response.data = [mock_item1, mock_item2]
+        
+        openai_client_mock.embeddings.create.return_value = mock_response
+    
+        # Call the function
+        result = create_embeddings(["Text 1", "Text 2"])
+        
+        # Assertions
+        openai_client_mock.embeddings.create.assert_awaited_once_with(
+            model=None,  # This matches the actual call when EMBEDDING_MODEL_CHOICE is not set
+            input=["Text 1", "Text 2"]
+        )
+        assert result == [[0.1, 0.2, 0.3], [0.4, 0.5, 0.6]]
+    
+    def test_batches_keep_input_order(self, openai_client_mock):
+        """Test that concurrently sent batches are flattened back in input order"""
+        async def fake_create(model, input):
+            response = MagicMock()
+            response.data = [MagicMock(embedding=[float(text)]) for text in input]
+            return response
+        
+        openai_client_mock.embeddings.create.side_effect = fake_create
+        texts = [str(i) for i in range(250)]
+        
+        result = create_embeddings(texts)
+        
+        assert openai_client_mock.embeddings.create.await_count == 3
+        assert result == [[float(i)] for i in range(250)]
+    
+    def test_batches_yielded_while_later_batches_run(self, openai_client_mock):
+        """Test that the first batch is yielded before a slower later batch has finished"""
+        import asyncio
+        from common.embeddings import iter_embeddings_async
+        release = asyncio.Event()
+        
+        async def fake_create(model, input):
+            # Only the second batch waits, until the first one has been handed to the caller
+            if input[0] != "0":
+                await release.wait()
+            return MagicMock(data=[MagicMock(embedding=[float(text)]) for text in input])
+        
+        openai_client_mock.embeddings.create.side_effect = fake_create
+        
+        async def collect():
+            ranges = []
+            async for batch, embeddings in iter_embeddings_async([str(i) for i in range(150)]):
+                ranges.append(batch)
+                release.set()
+            return ranges
+        
+        assert asyncio.run(collect()) == [range(0, 100), range(100, 150)]
 
 class TestIsTabularFile:
     @pytest.mark.parametrize("mime_type,expected", [
@@ -201,6 +258,10 @@ class TestExtractSchemaFromCsv:
         
         assert result == ['Name', 'Age', 'Email']
     
+    def test_empty_csv(self):
+        """Test that an empty CSV has no columns"""
+        assert extract_schema_from_csv(b'') == []
+    
     @patch('csv.reader')
     def test_invalid_csv(self, mock_csv_reader, capfd):
         """Test extracting schema from invalid CSV"""
@@ -239,3 +300,116 @@ class TestExtractRowsFromCsv:
         # Check that error was printed
         captured = capfd.readouterr()
         assert "Error extracting rows from CSV" in captured.out
+    
+    def test_iter_rows_is_lazy(self, tmp_path):
+        """Test streaming rows from CSV bytes and from a file path"""
+        csv_content = b'Name,Age\nJohn,30\nJane,25'
+        
+        rows = iter_rows_from_csv(csv_content)
+        assert next(rows) == {'Name': 'John', 'Age': '30'}
+        assert list(rows) == [{'Name': 'Jane', 'Age': '25'}]
+        
+        csv_path = tmp_path / 'people.csv'
+        csv_path.write_bytes(csv_content)
+        assert len(list(iter_rows_from_csv(csv_path))) == 2
+
+class TestOcrCache:
+    def test_repeat_content_skips_ocr_calls(self, tmp_path, monkeypatch):
+        """Test that OCR results are cached by content hash and reused"""
+        from common import ocr_extractor
+        monkeypatch.setattr(ocr_extractor, '_OCR_CACHE_DIR', tmp_path)
+        monkeypatch.setenv('LLM_OCR_API_KEY', 'test-ocr-key')
+        
+        session = MagicMock()
+        session.post.side_effect = [
+            MagicMock(json=MagicMock(return_value={'id': 'file-1'})),
+            MagicMock(content=b'{"pages": [{"markdown": "", "text": "OCR text"}]}')
+        ]
+        session.get.return_value = MagicMock(json=MagicMock(return_value={'url': 'https://signed'}))
+        monkeypatch.setattr(ocr_extractor, '_OCR_SESSION', session)
+        
+        first = ocr_extractor.extract_text_with_ocr(b'pdf bytes', 'doc.pdf')
+        second = ocr_extractor.extract_text_with_ocr(b'pdf bytes', 'doc.pdf')
+        
+        assert first == second == 'OCR text'
+        assert session.post.call_count == 2  # upload + OCR, first call only
+        assert session.post.call_args_list[1].kwargs['json']['include_image_base64'] is False
+        assert len(list(tmp_path.rglob('*.txt'))) == 1
+        # The API key goes on each request, not on the shared session
+        for request in session.post.call_args_list + session.get.call_args_list:
+            assert request.kwargs['headers']['Authorization'] == 'Bearer test-ocr-key'
+        session.headers.update.assert_not_called()
+    
+    def test_path_source_is_streamed(self, tmp_path, monkeypatch):
+        """Test that a path is uploaded as a streamed multipart body and hashed for the cache"""
+        from common import ocr_extractor
+        from requests_toolbelt.multipart.encoder import MultipartEncoder
+        monkeypatch.setattr(ocr_extractor, '_OCR_CACHE_DIR', tmp_path / 'cache')
+        monkeypatch.setenv('LLM_OCR_API_KEY', 'test-ocr-key')
+        pdf_path = tmp_path / 'doc.pdf'
+        pdf_path.write_bytes(b'pdf bytes')
+        
+        session = MagicMock()
+        session.post.side_effect = [
+            MagicMock(json=MagicMock(return_value={'id': 'file-1'})),
+            MagicMock(content=b'{"text": "OCR text"}')
+        ]
+        session.get.return_value = MagicMock(json=MagicMock(return_value={'url': 'https://signed'}))
+        monkeypatch.setattr(ocr_extractor, '_OCR_SESSION', session)
+        
+        assert ocr_extractor.extract_text_with_ocr(pdf_path, 'doc.pdf') == 'OCR text'
+        
+        upload_kwargs = session.post.call_args_list[0].kwargs
+        assert isinstance(upload_kwargs['data'], MultipartEncoder)
+        assert upload_kwargs['headers']['Content-Type'].startswith('multipart/form-data')
+        # Same content as bytes hits the cache entry written for the path
+        assert ocr_extractor.extract_text_with_ocr(b'pdf bytes', 'doc.pdf') == 'OCR text'
+    
+    def test_cache_key_includes_ocr_settings(self, tmp_path, monkeypatch):
+        """Test that the same content with other OCR options or another endpoint is OCRed again"""
+        from common import ocr_extractor
+        monkeypatch.setattr(ocr_extractor, '_OCR_CACHE_DIR', tmp_path)
+        monkeypatch.setenv('LLM_OCR_API_KEY', 'test-ocr-key')
+        
+        session = MagicMock()
+        session.post.side_effect = [
+            MagicMock(json=MagicMock(return_value={'id': 'file-1'})),
+            MagicMock(content=b'{"text": "OCR text"}')
+        ] * 3
+        session.get.return_value = MagicMock(json=MagicMock(return_value={'url': 'https://signed'}))
+        monkeypatch.setattr(ocr_extractor, '_OCR_SESSION', session)
+        
+        ocr_extractor.extract_text_with_ocr(b'pdf bytes', 'doc.pdf')
+        ocr_extractor.extract_text_with_ocr(b'pdf bytes', 'doc.pdf', include_images=True)
+        monkeypatch.setenv('LLM_OCR_URL', 'https://ocr.example.com/v1')
+        ocr_extractor.extract_text_with_ocr(b'pdf bytes', 'doc.pdf')
+        
+        assert session.post.call_count == 6
+        assert len(list(tmp_path.rglob('*.txt'))) == 3
+    
+    def test_unrecognised_response_is_not_cached(self, tmp_path, monkeypatch):
+        """Test that the stringified fallback for an unknown response format is returned but not cached"""
+        from common import ocr_extractor
+        monkeypatch.setattr(ocr_extractor, '_OCR_CACHE_DIR', tmp_path)
+        monkeypatch.setenv('LLM_OCR_API_KEY', 'test-ocr-key')
+        
+        session = MagicMock()
+        session.post.side_effect = [
+            MagicMock(json=MagicMock(return_value={'id': 'file-1'})),
+            MagicMock(content=b'{"status": "queued"}')
+        ]
+        session.get.return_value = MagicMock(json=MagicMock(return_value={'url': 'https://signed'}))
+        monkeypatch.setattr(ocr_extractor, '_OCR_SESSION', session)
+        
+        assert ocr_extractor.extract_text_with_ocr(b'pdf bytes', 'doc.pdf') == "{'status': 'queued'}"
+        assert list(tmp_path.rglob('*')) == []
+    
+    def test_failed_cache_write_leaves_no_temp_file(self, tmp_path, monkeypatch):
+        """Test that a cache write that fails after creating the temp file removes it"""
+        from common import ocr_extractor
+        monkeypatch.setattr(ocr_extractor, '_OCR_CACHE_DIR', tmp_path)
+        
+        with patch.object(ocr_extractor.os, 'replace', side_effect=OSError("disk full")):
+            ocr_extractor._write_ocr_cache('ab' * 32, 'OCR text')
+        
+        assert [path for path in tmp_path.rglob('*') if path.is_file()] == []
@@ -16,7 +16,7 @@ import io
 from pathlib import Path
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from common.text_processor import extract_text_from_file, chunk_text, create_embeddings
+from common.text_processor import extract_text_from_file, iter_pages_from_file, chunk_text, create_embeddings
 from common.db_handler import process_file_for_rag, delete_document_by_file_id
 from common.state_manager import get_state_manager, load_state_from_config, save_state_to_config
 
@@ -375,11 +375,13 @@ class GoogleDriveWatcher:
             print(f"Failed to download file '{file_name}' (ID: {file_id})")
             return
         
-        # Extract text from the file
-        text = extract_text_from_file(file_content, mime_type, file_name, self.config)
-        if not text:
-            print(f"No text could be extracted from file '{file_name}' (ID: {file_id})")
-            return
+        # Extract text from the file (PDFs read with pypdf are chunked page by page as they are extracted)
+        text = iter_pages_from_file(file_content, mime_type)
+        if text is None:
+            text = extract_text_from_file(file_content, mime_type, file_name, self.config)
+            if not text:
+                print(f"No text could be extracted from file '{file_name}' (ID: {file_id})")
+                return
         
         # Process the file for RAG
         success = process_file_for_rag(file_content, text, file_id, web_view_link, file_name, mime_type, self.config)
@@ -0,0 +1,108 @@
+"""
+Local ONNX breakpoint model for chunking.
+
+A small token-classification model (e.g. a distilled BERT/ModernBERT chunker) scores every
+token as the last one of a chunk. It runs on CPU through ONNX Runtime, so picking a
+breakpoint takes milliseconds instead of a chat-completion round trip.
+
+To shrink a float export to int8 weights before deploying it:
+
+    from common.chunker_onnx import quantize_model
+    quantize_model("chunker.onnx", "chunker-int8.onnx")
+"""
+import os
+from typing import Any, Optional
+
+import numpy as np
+
+# Longest input (in tokens) fed to the model; the rest of a window is ignored
+MAX_TOKENS = 512
+
+
+class OnnxBreakpointModel:
+    """Token-classification chunker that picks the most likely chunk boundary in a window."""
+    
+    def __init__(self, session: Any, tokenizer: Any):
+        """
+        Initialize the model.
+        
+        Args:
+            session: onnxruntime.InferenceSession of the exported model
+            tokenizer: tokenizers.Tokenizer matching the model (offsets are used to map tokens back to text)
+        """
+        self.session = session
+        self.tokenizer = tokenizer
+        self._input_names = [model_input.name for model_input in session.get_inputs()]
+    
+    @classmethod
+    def from_files(cls, model_path: str, tokenizer_path: Optional[str] = None) -> "OnnxBreakpointModel":
+        """
+        Load the model and its tokenizer from disk.
+        
+        Args:
+            model_path: Path to the .onnx model
+            tokenizer_path: Path to tokenizer.json (defaults to the one next to the model)
+        
+        Returns:
+            The loaded model
+        """
+        # Optional dependencies: only needed when the ONNX chunking backend is configured
+        import onnxruntime
+        from tokenizers import Tokenizer
+        
+        tokenizer_path = tokenizer_path or os.path.join(os.path.dirname(os.path.abspath(model_path)), 'tokenizer.json')
+        tokenizer = Tokenizer.from_file(tokenizer_path)
+        tokenizer.enable_truncation(MAX_TOKENS)
+        
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        session = onnxruntime.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        return cls(session, tokenizer)
+    
+    def breakpoint(self, window: str, max_chars: int) -> Optional[int]:
+        """
+        Find the most likely chunk boundary in a window.
+        
+        Args:
+            window: Text window to analyze
+            max_chars: Maximum character position for the break
+        
+        Returns:
+            Character position where the next chunk starts, or None if there is no candidate before max_chars
+        """
+        encoding = self.tokenizer.encode(window)
+        inputs = {
+            'input_ids': encoding.ids,
+            'attention_mask': encoding.attention_mask,
+            'token_type_ids': encoding.type_ids,
+        }
+        feed = {name: np.asarray([inputs[name]], dtype=np.int64) for name in self._input_names}
+        logits = np.asarray(self.session.run(None, feed)[0])[0]
+        # (tokens, labels) -> score of the "boundary" label, which is the last one
+        scores = logits[:, -1] if logits.ndim == 2 else logits
+        
+        # A boundary after token i means the next chunk starts at the next real token.
+        # Special tokens such as [CLS]/[SEP] have empty offsets, and a boundary is only
+        # allowed where whitespace separates the tokens so words are never split.
+        tokens = [(i, start, end) for i, (start, end) in enumerate(encoding.offsets) if end > start]
+        best_score, best_position = None, None
+        for (i, _, end), (_, next_start, _) in zip(tokens, tokens[1:]):
+            if next_start > max_chars:
+                break
+            if next_start > end and (best_score is None or scores[i] > best_score):
+                best_score, best_position = scores[i], next_start
+        return best_position
+
+
+def quantize_model(model_path: str, output_path: str) -> None:
+    """
+    Quantize a float ONNX export to int8 weights (dynamic quantization) for faster CPU inference.
+    
+    Args:
+        model_path: Path to the float .onnx model
+        output_path: Where to write the int8 model
+    """
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    
+    quantize_dynamic(model_path, output_path, weight_type=QuantType.QInt8)
+    print(f"Wrote int8 chunking model to {output_path}")
@@ -1,33 +1,27 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable, Union
+from itertools import islice
 import os
 import io
 import json
 import traceback
 from datetime import datetime
-from dotenv import load_dotenv
 from supabase import create_client, Client
 import base64
-from pathlib import Path
 
-from .text_processor import chunk_text, create_embeddings, is_tabular_file, extract_schema_from_csv, extract_rows_from_csv
+from .env import load_environment
+from .text_processor import chunk_text, iter_chunks_from_pages, create_embeddings, is_tabular_file, extract_schema_and_rows
 
-# Check if we're in production
-is_production = os.getenv("ENVIRONMENT") == "production"
-
-if not is_production:
-    # Development: prioritize .env file
-    project_root = Path(__file__).resolve().parent.parent
-    dotenv_path = project_root / '.env'
-    load_dotenv(dotenv_path, override=True)
-else:
-    # Production: use cloud platform env vars only
-    load_dotenv()
+# Load environment variables (once per process)
+load_environment()
 
 # Initialize Supabase client
 supabase_url = os.getenv("SUPABASE_URL")
 supabase_key = os.getenv("SUPABASE_SERVICE_KEY")
 supabase: Client = create_client(supabase_url, supabase_key)
 
+# Rows sent per insert request when storing tabular files
+ROW_INSERT_BATCH_SIZE = 128
+
 def delete_document_by_file_id(file_id: str) -> None:
     """
     Delete all records related to a specific file ID (documents, document_rows, and document_metadata).
@@ -135,37 +129,40 @@ def insert_or_update_document_metadata(file_id: str, file_title: str, file_url:
     except Exception as e:
         print(f"Error inserting/updating document metadata: {e}")
 
-def insert_document_rows(file_id: str, rows: List[Dict[str, Any]]) -> None:
+def insert_document_rows(file_id: str, rows: Iterable[Dict[str, Any]]) -> None:
     """
     Insert rows from a tabular file into the document_rows table.
+    Rows are consumed lazily and inserted ROW_INSERT_BATCH_SIZE at a time.
     
     Args:
         file_id: The Google Drive file ID (references document_metadata.id)
-        rows: List of row data as dictionaries
+        rows: Row data as dictionaries (a list or a lazy iterator)
     """
     try:
         # First, delete any existing rows for this file
         supabase.table("document_rows").delete().eq("dataset_id", file_id).execute()
         print(f"Deleted existing rows for file ID: {file_id}")
         
-        # Insert new rows
-        for row in rows:
-            supabase.table("document_rows").insert({
-                "dataset_id": file_id,
-                "row_data": row
-            }).execute()
-        print(f"Inserted {len(rows)} rows for file ID: {file_id}")
+        # Insert new rows, one request per batch
+        inserted = 0
+        rows = iter(rows)
+        while batch := list(islice(rows, ROW_INSERT_BATCH_SIZE)):
+            supabase.table("document_rows").insert([
+                {"dataset_id": file_id, "row_data": row} for row in batch
+            ]).execute()
+            inserted += len(batch)
+        print(f"Inserted {inserted} rows for file ID: {file_id}")
     except Exception as e:
         print(f"Error inserting document rows: {e}")
 
-def process_file_for_rag(file_content: bytes, text: str, file_id: str, file_url: str, 
+def process_file_for_rag(file_content: bytes, text: Union[str, Iterable[str]], file_id: str, file_url: str, 
                         file_title: str, mime_type: str = None, config: Dict[str, Any] = None) -> None:
     """
     Process a file for the RAG pipeline - delete existing records and insert new ones.
     
     Args:
         file_content: The binary content of the file
-        text: The text content extracted from the file
+        text: The text content extracted from the file, or its pages (e.g. from iter_pdf_pages) to chunk them as they are extracted
         file_id: The Google Drive file ID
         file_url: The URL to access the file
         file_title: The title of the file
@@ -184,18 +181,16 @@ def process_file_for_rag(file_content: bytes, text: str, file_id: str, file_url:
             is_tabular = is_tabular_file(mime_type, config)
             
         if is_tabular:
-            # Extract schema (column names) from CSV
-            schema = extract_schema_from_csv(file_content)
+            # Extract schema (column names) from CSV; the rows are read lazily from the same stream
+            schema, rows = extract_schema_and_rows(file_content)
         
         # First, insert or update document metadata (needed for foreign key constraint)
         insert_or_update_document_metadata(file_id, file_title, file_url, schema)
         
         # Then, if it's a tabular file, insert the rows
         if is_tabular:
-            # Extract and insert rows for tabular files
-            rows = extract_rows_from_csv(file_content)
-            if rows:
-                insert_document_rows(file_id, rows)
+            # Stream rows from the CSV straight into the database
+            insert_document_rows(file_id, rows)
 
         # Get text processing settings from config
         text_processing = config.get('text_processing', {})
@@ -203,8 +198,11 @@ def process_file_for_rag(file_content: bytes, text: str, file_id: str, file_url:
         chunk_size = text_processing.get('default_chunk_size', 1000)
         chunk_overlap = text_processing.get('default_chunk_overlap', 0)
 
-        # Chunk the text
-        chunks = chunk_text(text, chunk_size=chunk_size, overlap=chunk_overlap)
+        # Chunk the text (pages are chunked as they arrive instead of being joined first)
+        if isinstance(text, str):
+            chunks = chunk_text(text, chunk_size=chunk_size, overlap=chunk_overlap)
+        else:
+            chunks = list(iter_chunks_from_pages(text, chunk_size=chunk_size, overlap=chunk_overlap))
         if not chunks:
             print(f"No chunks were created for file '{file_title}' (Path: {file_id})")
             return
@@ -4,20 +4,11 @@ Embedding generation utilities with batching support.
 import os
 from typing import List
 from openai import OpenAI
-from dotenv import load_dotenv
-from pathlib import Path
 
-# Check if we're in production
-is_production = os.getenv("ENVIRONMENT") == "production"
+from .env import load_environment
 
-if not is_production:
-    # Development: prioritize .env file
-    project_root = Path(__file__).resolve().parent.parent
-    dotenv_path = project_root / '.env'
-    load_dotenv(dotenv_path, override=True)
-else:
-    # Production: use cloud platform env vars only
-    load_dotenv()
+# Load environment variables (once per process)
+load_environment()
 
 # Initialize OpenAI client
 api_key = os.getenv("EMBEDDING_API_KEY", "") or "ollama"
@@ -0,0 +1,35 @@
+"""
+Environment loading shared by the common modules.
+"""
+import os
+from pathlib import Path
+from dotenv import load_dotenv
+
+# Set once the .env file has been loaded, so importing several modules only loads it once
+_env_loaded = False
+
+
+def load_environment() -> None:
+    """
+    Load environment variables once per process.
+    
+    In development the .env file in the pipeline directory takes priority; in production
+    (ENVIRONMENT=production) only the cloud platform's env vars are used.
+    """
+    global _env_loaded
+    
+    if _env_loaded:
+        return
+    _env_loaded = True
+    
+    # Check if we're in production
+    is_production = os.getenv("ENVIRONMENT") == "production"
+    
+    if not is_production:
+        # Development: prioritize .env file
+        project_root = Path(__file__).resolve().parent.parent
+        dotenv_path = project_root / '.env'
+        load_dotenv(dotenv_path, override=True)
+    else:
+        # Production: use cloud platform env vars only
+        load_dotenv()
@@ -4,21 +4,11 @@ Supports PDFs and images (PNG, JPG, JPEG, SVG).
 """
 import os
 import requests
-from dotenv import load_dotenv
-from pathlib import Path
 
-# Load environment variables
-# Check if we're in production
-is_production = os.getenv("ENVIRONMENT") == "production"
+from .env import load_environment
 
-if not is_production:
-    # Development: prioritize .env file
-    project_root = Path(__file__).resolve().parent.parent
-    dotenv_path = project_root / '.env'
-    load_dotenv(dotenv_path, override=True)
-else:
-    # Production: use cloud platform env vars only
-    load_dotenv()
+# Load environment variables (once per process)
+load_environment()
 
 
 def extract_text_with_ocr(file_content: bytes, file_name: str = "document", mime_type: str = "application/pdf") -> str:
@@ -0,0 +1,167 @@
+"""
+Semantic cache for chunk breakpoints.
+
+Near-duplicate prose windows (boilerplate, repeated templates, quoted text) reuse an
+earlier breakpoint instead of asking the LLM again. Windows are embedded with a
+sentence-transformers model and indexed with random-projection LSH.
+"""
+import os
+import pickle
+import tempfile
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Only the start of a window is embedded; that is enough to recognise a near-duplicate
+EMBED_CHARS = 2048
+
+
+class SemanticBreakpointCache:
+    """
+    Breakpoints of earlier windows, looked up by embedding similarity.
+    
+    Each entry stores the breakpoint as a fraction of its window length, so a hit is
+    replayed scaled to the new window. Several LSH tables of a few sign bits each keep
+    the chance of finding a true near-duplicate high without scanning every entry.
+    """
+    
+    def __init__(self, model: Any, threshold: float = 0.9, max_entries: int = 4096,
+                 n_tables: int = 8, n_bits: int = 12, path: Optional[str] = None):
+        """
+        Initialize the cache.
+        
+        Args:
+            model: sentence-transformers model used to embed windows
+            threshold: Minimum cosine similarity for a hit
+            max_entries: Maximum number of stored windows (oldest are evicted first)
+            n_tables: Number of LSH tables
+            n_bits: Sign bits per LSH table
+            path: Optional pickle file to warm-start from and save to
+        """
+        self.model = model
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.path = path
+        
+        dim = model.get_sentence_embedding_dimension()
+        self._planes = np.random.default_rng(0).standard_normal((n_tables, n_bits, dim)).astype(np.float32)
+        self._bit_weights = 1 << np.arange(n_bits)
+        self._tables: List[Dict[int, List[int]]] = [{} for _ in range(n_tables)]
+        # entry id -> (unit vector, breakpoint / window length)
+        self._entries: "OrderedDict[int, Tuple[np.ndarray, float]]" = OrderedDict()
+        self._next_id = 0
+        
+        if path and os.path.exists(path):
+            self._load(path)
+    
+    def _embed(self, window: str) -> np.ndarray:
+        return np.asarray(self.model.encode(window[:EMBED_CHARS], normalize_embeddings=True), dtype=np.float32)
+    
+    def _signatures(self, vector: np.ndarray) -> List[int]:
+        bits = (self._planes @ vector) > 0
+        return (bits @ self._bit_weights).tolist()
+    
+    def lookup(self, window: str, max_chars: int) -> Optional[int]:
+        """
+        Find the breakpoint of a stored near-duplicate of this window.
+        
+        Args:
+            window: Text window to analyze
+            max_chars: Maximum character position for the break
+        
+        Returns:
+            The replayed breakpoint, or None if no stored window is similar enough
+        """
+        if not self._entries:
+            return None
+        
+        vector = self._embed(window)
+        best_id, best_similarity = None, self.threshold
+        for table, signature in zip(self._tables, self._signatures(vector)):
+            for entry_id in table.get(signature, ()):
+                entry = self._entries.get(entry_id)
+                if entry is None:
+                    continue
+                similarity = float(entry[0] @ vector)
+                if similarity >= best_similarity:
+                    best_id, best_similarity = entry_id, similarity
+        
+        if best_id is None:
+            return None
+        
+        self._entries.move_to_end(best_id)
+        breakpoint = min(max(1, round(self._entries[best_id][1] * len(window))), max_chars)
+        # Snap back to the preceding word boundary so the split never lands mid-word
+        boundary = max(window.rfind(' ', 0, breakpoint), window.rfind('\n', 0, breakpoint)) + 1
+        return boundary if boundary > 0 else breakpoint
+    
+    def add(self, window: str, breakpoint: int) -> None:
+        """
+        Store the breakpoint chosen for a window.
+        
+        Args:
+            window: Text window that was analyzed
+            breakpoint: Character position of the break in that window
+        """
+        if not window:
+            return
+        
+        vector = self._embed(window)
+        entry_id = self._next_id
+        self._next_id += 1
+        self._entries[entry_id] = (vector, breakpoint / len(window))
+        for table, signature in zip(self._tables, self._signatures(vector)):
+            table.setdefault(signature, []).append(entry_id)
+        
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._prune_tables()
+    
+    def _prune_tables(self) -> None:
+        """Drop evicted entry ids from the LSH tables once they grow the index by more than a quarter."""
+        indexed = sum(len(ids) for table in self._tables for ids in table.values())
+        if indexed <= len(self._tables) * len(self._entries) * 1.25:
+            return
+        for table in self._tables:
+            for signature in list(table):
+                ids = [entry_id for entry_id in table[signature] if entry_id in self._entries]
+                if ids:
+                    table[signature] = ids
+                else:
+                    del table[signature]
+    
+    def save(self) -> None:
+        """Write the cache to its pickle file (atomically), if a path was given."""
+        if not self.path:
+            return
+        
+        state = {'planes': self._planes, 'entries': list(self._entries.values())}
+        directory = os.path.dirname(os.path.abspath(self.path))
+        try:
+            with tempfile.NamedTemporaryFile('wb', dir=directory, delete=False) as tmp:
+                pickle.dump(state, tmp)
+            os.replace(tmp.name, self.path)
+        except OSError as e:
+            print(f"Warning: could not save semantic breakpoint cache {self.path}: {e}")
+    
+    def _load(self, path: str) -> None:
+        try:
+            with open(path, 'rb') as f:
+                state = pickle.load(f)
+        except Exception as e:
+            print(f"Warning: could not load semantic breakpoint cache {path}: {e}")
+            return
+        
+        if state['planes'].shape != self._planes.shape:
+            print(f"Ignoring semantic breakpoint cache {path}: it was built with a different model")
+            return
+        
+        self._planes = state['planes']
+        for vector, ratio in state['entries'][-self.max_entries:]:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (vector, ratio)
+            for table, signature in zip(self._tables, self._signatures(vector)):
+                table.setdefault(signature, []).append(entry_id)
+        print(f"Loaded {len(self._entries)} semantic breakpoint cache entries from {path}")
@@ -4,25 +4,23 @@ Matches the n8n JavaScript implementation with LLM-guided breakpoints.
 """
 import os
 import re
-from typing import List, Dict, Any, Optional
-from openai import OpenAI
-from dotenv import load_dotenv
-from pathlib import Path
+import json
+import atexit
+import asyncio
+import hashlib
+from collections import OrderedDict
+from typing import TYPE_CHECKING, List, Dict, Any, Iterable, Iterator, Optional, Tuple
 
+from .env import load_environment
 from .text_sanitizer import sanitize_text, clean_text
 from .markdown_parser import split_by_headings, split_markdown_into_blocks
 
-# Check if we're in production
-is_production = os.getenv("ENVIRONMENT") == "production"
+if TYPE_CHECKING:
+    # openai is imported when a client is first created, not when the chunker is imported
+    from openai import AsyncOpenAI
 
-if not is_production:
-    # Development: prioritize .env file
-    project_root = Path(__file__).resolve().parent.parent
-    dotenv_path = project_root / '.env'
-    load_dotenv(dotenv_path, override=True)
-else:
-    # Production: use cloud platform env vars only
-    load_dotenv()
+# Load environment variables (once per process)
+load_environment()
 
 # Chunking configuration (matching n8n defaults)
 MAX_CHUNK_SIZE = 1000
@@ -30,54 +28,429 @@ MIN_CHUNK_SIZE = 400
 MERGE_PAD = int(MAX_CHUNK_SIZE * 1.05)
 ENABLE_HEADING_SPLIT = True
 
-# Initialize LLM client for chunking (if configured)
-_llm_client: Optional[OpenAI] = None
+# Breakpoints already chosen for a window, keyed on (hash of the window, max_chars),
+# so repeated or duplicated prose does not trigger another model call
+BREAKPOINT_CACHE_SIZE = 4096
+_breakpoint_cache: "OrderedDict[Tuple[bytes, int], int]" = OrderedDict()
 
-def get_llm_client() -> Optional[OpenAI]:
-    """Get or initialize the LLM client for chunking."""
-    global _llm_client
+# Blocks already prepared for a document (sanitized, markdown-split), keyed on a hash of
+# the raw text, so re-ingesting an unchanged document skips straight to splitting
+BLOCK_CACHE_SIZE = int(os.getenv('CHUNKING_BLOCK_CACHE_SIZE', '64'))
+_block_cache: "OrderedDict[bytes, Tuple[Dict[str, Any], ...]]" = OrderedDict()
+
+# Output budget for a single-word breakpoint answer; output tokens dominate call latency
+BREAKPOINT_MAX_TOKENS = 6
+
+# Maximum number of breakpoint decisions sent to the LLM in one request
+BREAKPOINT_BATCH_SIZE = 8
+# Maximum number of breakpoint requests in flight at once (across blocks)
+BREAKPOINT_CONCURRENCY = 10
+
+# Precompiled patterns (module-level so they are compiled once per process)
+_HEADING_RE = re.compile(r'(?:^|\n)#{1,6}\s+\S')
+_TABLE_LINE_RE = re.compile(r'\n\|[^|\n]+\|')
+_SENT_END_RE = re.compile(r'[.!?]\s+')
+_PARA_RE = re.compile(r'\n\n')
+# Punctuation run plus at most one space after an LLM break word
+_TRAIL_PUNCT_RE = re.compile(r'[.!?,;:]* ?')
+
+# Chunking settings from the environment, read once by reload_config() so the
+# breakpoint hot path never touches os.environ
+CHUNKING_LLM_MODEL = 'gpt-4o-mini'
+_llm_base_url: Optional[str] = None
+_llm_api_key: Optional[str] = None
+_remote_required = False
+_local_model_name: Optional[str] = None
+_chunking_backend = ''
+_onnx_model_path: Optional[str] = None
+_onnx_tokenizer_path: Optional[str] = None
+_semantic_cache_model_name: Optional[str] = None
+_semantic_cache_path: Optional[str] = None
+
+# HTTP settings for the chunking LLM clients: one pooled HTTP/2 connection set is reused
+# across breakpoint calls instead of negotiating new connections
+LLM_HTTP_MAX_CONNECTIONS = 64
+LLM_HTTP_MAX_KEEPALIVE = 32
+LLM_HTTP_TIMEOUT = 30.0
+LLM_HTTP_CONNECT_TIMEOUT = 5.0
+LLM_MAX_RETRIES = 2
+
+# Async LLM client for chunking, shared by the documents chunked on one event loop;
+# tied to the event loop it was created in
+_async_llm_client = None
+_async_llm_client_loop: Optional[asyncio.AbstractEventLoop] = None
+# Event loop that synchronous callers run remote chunking on; kept open between documents so
+# the async LLM client and its connections are reused instead of rebuilt per document
+_chunking_loop: Optional[asyncio.AbstractEventLoop] = None
+
+# Local sentence-transformers model for chunking (if configured); False once loading failed
+_local_model = None
+
+# Local ONNX breakpoint model (if CHUNKING_BACKEND=onnx); False once loading failed
+DEFAULT_ONNX_MODEL_PATH = 'modbert-chunker-int8.onnx'
+_onnx_model = None
+
+# Semantic cache for near-duplicate windows (if configured); False once loading failed
+SEMANTIC_CACHE_THRESHOLD = 0.9
+_semantic_cache = None
+
+
+def reload_config() -> None:
+    """
+    Read the chunking settings from the environment and reset the clients and models built from them.
+    Called once at import; call it again after changing the environment (e.g. in tests).
+    """
+    global CHUNKING_LLM_MODEL, _llm_base_url, _llm_api_key, _remote_required
+    global _local_model_name, _chunking_backend, _onnx_model_path, _onnx_tokenizer_path
+    global _semantic_cache_model_name, _semantic_cache_path
+    global _async_llm_client, _async_llm_client_loop, _local_model, _onnx_model, _semantic_cache
+    
+    CHUNKING_LLM_MODEL = os.getenv('CHUNKING_LLM_MODEL', 'gpt-4o-mini')
+    # Reuse the main LLM credentials unless chunking has its own
+    _llm_base_url = os.getenv('CHUNKING_LLM_BASE_URL') or os.getenv('LLM_BASE_URL')
+    _llm_api_key = os.getenv('CHUNKING_LLM_API_KEY') or os.getenv('LLM_API_KEY')
+    _remote_required = os.getenv('CHUNKING_LLM_REMOTE_REQUIRED') == '1'
+    _local_model_name = os.getenv('CHUNKING_LOCAL_MODEL')
+    _chunking_backend = os.getenv('CHUNKING_BACKEND', '').lower()
+    _onnx_model_path = os.getenv('CHUNKING_ONNX_MODEL', DEFAULT_ONNX_MODEL_PATH)
+    _onnx_tokenizer_path = os.getenv('CHUNKING_ONNX_TOKENIZER')
+    _semantic_cache_model_name = os.getenv('CHUNKING_SEMANTIC_CACHE_MODEL')
+    _semantic_cache_path = os.getenv('CHUNKING_SEMANTIC_CACHE_PATH')
+    
+    # Clients and models are created lazily: they are expensive and often not needed
+    _async_llm_client = None
+    _async_llm_client_loop = None
+    _local_model = None
+    _onnx_model = None
+    _semantic_cache = None
+
+
+reload_config()
+
+
+def _http_client_options() -> Dict[str, Any]:
+    """Connection pool, timeout and HTTP/2 settings of the async LLM client."""
+    import httpx
+    return {
+        'http2': True,
+        'limits': httpx.Limits(max_connections=LLM_HTTP_MAX_CONNECTIONS,
+                               max_keepalive_connections=LLM_HTTP_MAX_KEEPALIVE),
+        'timeout': httpx.Timeout(LLM_HTTP_TIMEOUT, connect=LLM_HTTP_CONNECT_TIMEOUT),
+    }
+
+
+def new_async_llm_client() -> Optional["AsyncOpenAI"]:
+    """
+    Create an async LLM client for chunking from the configured base URL and API key.
+    Not cached here: use get_async_llm_client() for the client shared on the running event loop.
+    """
+    if not _llm_base_url or not _llm_api_key:
+        return None
+    
+    try:
+        from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+        return AsyncOpenAI(
+            base_url=_llm_base_url,
+            api_key=_llm_api_key,
+            max_retries=LLM_MAX_RETRIES,
+            http_client=DefaultAsyncHttpxClient(**_http_client_options())
+        )
+    except Exception as e:
+        print(f"Warning: Failed to initialize async LLM client for chunking: {e}")
+        return None
+
+
+def get_local_model():
+    """Get or load the local sentence-embedding model for chunking, if CHUNKING_LOCAL_MODEL is set."""
+    global _local_model
+    
+    if _local_model is not None:
+        return _local_model or None
     
-    if _llm_client is not None:
-        return _llm_client
+    model_name = _local_model_name
+    if not model_name:
+        return None
+    
+    try:
+        # Optional dependency: only needed when a local chunking model is configured
+        from sentence_transformers import SentenceTransformer
+        _local_model = SentenceTransformer(model_name)
+    except Exception as e:
+        print(f"Warning: Failed to load local chunking model '{model_name}': {e}")
+        _local_model = False
+    return _local_model or None
+
+
+def get_onnx_model():
+    """Get or load the local ONNX breakpoint model, if CHUNKING_BACKEND is 'onnx'."""
+    global _onnx_model
     
-    # Check if LLM chunking is configured (reuse main LLM credentials)
-    base_url = os.getenv('CHUNKING_LLM_BASE_URL') or os.getenv('LLM_BASE_URL')
-    api_key = os.getenv('CHUNKING_LLM_API_KEY') or os.getenv('LLM_API_KEY')
+    if _onnx_model is not None:
+        return _onnx_model or None
     
-    if not base_url or not api_key:
+    if _chunking_backend != 'onnx':
         return None
     
     try:
-        _llm_client = OpenAI(
-            base_url=base_url,
-            api_key=api_key
+        # Optional dependencies: only needed when the ONNX backend is configured
+        from .chunker_onnx import OnnxBreakpointModel
+        _onnx_model = OnnxBreakpointModel.from_files(_onnx_model_path, _onnx_tokenizer_path)
+    except Exception as e:
+        print(f"Warning: Failed to load ONNX chunking model '{_onnx_model_path}': {e}")
+        _onnx_model = False
+    return _onnx_model or None
+
+
+def get_semantic_cache():
+    """
+    Get or create the semantic breakpoint cache, if CHUNKING_SEMANTIC_CACHE_MODEL is set.
+    Set CHUNKING_SEMANTIC_CACHE_PATH to keep the cache across restarts.
+    """
+    global _semantic_cache
+    
+    if _semantic_cache is not None:
+        return _semantic_cache or None
+    
+    model_name = _semantic_cache_model_name
+    if not model_name:
+        return None
+    
+    try:
+        # Optional dependencies: only needed when the semantic cache is configured
+        from .semantic_cache import SemanticBreakpointCache
+        if model_name == _local_model_name and get_local_model() is not None:
+            model = get_local_model()
+        else:
+            from sentence_transformers import SentenceTransformer
+            model = SentenceTransformer(model_name)
+        _semantic_cache = SemanticBreakpointCache(
+            model,
+            threshold=SEMANTIC_CACHE_THRESHOLD,
+            max_entries=BREAKPOINT_CACHE_SIZE,
+            path=_semantic_cache_path
         )
-        return _llm_client
+        atexit.register(_semantic_cache.save)
     except Exception as e:
-        print(f"Warning: Failed to initialize LLM client for chunking: {e}")
+        print(f"Warning: Failed to set up semantic breakpoint cache with '{model_name}': {e}")
+        _semantic_cache = False
+    return _semantic_cache or None
+
+
+def _semantic_cache_lookup(first_window: str, max_chars: int) -> Optional[int]:
+    """Breakpoint replayed from a near-duplicate window, if the semantic cache has one."""
+    cache = get_semantic_cache()
+    if cache is None:
         return None
+    
+    try:
+        breakpoint = cache.lookup(first_window, max_chars)
+    except Exception as e:
+        print(f"Semantic breakpoint cache lookup failed: {e}")
+        return None
+    
+    if breakpoint is not None:
+        print(f"Semantic cache hit: breakpoint at position {breakpoint}")
+    return breakpoint
+
 
+def _semantic_cache_add(first_window: str, breakpoint: int) -> None:
+    """Remember an LLM-chosen breakpoint for near-duplicate windows."""
+    cache = get_semantic_cache()
+    if cache is None:
+        return
+    
+    try:
+        cache.add(first_window, breakpoint)
+    except Exception as e:
+        print(f"Semantic breakpoint cache update failed: {e}")
+
+
+def _fill_from_semantic_cache(windows: List[str], pending: List[int], breakpoints: List[Optional[int]],
+                              keys: List[Tuple[bytes, int]], max_chars: int) -> List[int]:
+    """Answer pending windows from the semantic cache; returns the ones still pending."""
+    still_pending = []
+    for i in pending:
+        breakpoint = _semantic_cache_lookup(windows[i], max_chars)
+        if breakpoint is None:
+            still_pending.append(i)
+        else:
+            breakpoints[i] = breakpoint
+            _cache_breakpoint(keys[i], breakpoint)
+    return still_pending
 
-def llm_breakpoint_sync(first_window: str, max_chars: int) -> int:
+
+def local_semantic_breakpoint(first_window: str, max_chars: int) -> Optional[int]:
     """
-    LLM-guided breakpoint detection (matches n8n implementation).
-    Uses LLM to find natural topic transitions, falls back to sentence boundaries.
+    Local breakpoint detection: split at the sentence boundary where the meaning shifts most.
+    Adjacent sentences are embedded in one batch and the boundary with the lowest cosine
+    similarity before max_chars wins.
     
     Args:
         first_window: Text window to analyze
         max_chars: Maximum character position for the break
         
     Returns:
-        Character position for the break
+        Character position for the break, or None if no local model or sentence boundary is available
     """
-    # Try LLM-guided breakpoint if configured
-    client = get_llm_client()
-    model = os.getenv('CHUNKING_LLM_MODEL', 'gpt-4o-mini')
+    model = get_local_model()
+    if model is None:
+        return None
     
-    if client and model:
-        try:
-            # LLM prompt matching the n8n implementation
-            prompt = f"""You are analyzing a document to find the best transition point to split it into meaningful sections.
+    boundaries = [m.end() for m in _SENT_END_RE.finditer(first_window, 0, max_chars)]
+    if not boundaries:
+        return None
+    
+    starts = [0] + boundaries
+    ends = boundaries + [len(first_window)]
+    sentences = [first_window[start:end] for start, end in zip(starts, ends)]
+    
+    try:
+        vectors = model.encode(sentences, normalize_embeddings=True)
+        similarities = (vectors[:-1] * vectors[1:]).sum(axis=1)
+        breakpoint = boundaries[int(similarities.argmin())]
+    except Exception as e:
+        print(f"Local breakpoint detection failed, falling back to sentence boundary: {e}")
+        return None
+    
+    print(f"Local semantic breakpoint at position {breakpoint}")
+    return breakpoint
+
+
+def onnx_breakpoint(first_window: str, max_chars: int) -> Optional[int]:
+    """
+    Local breakpoint detection with the ONNX token-classification model.
+    
+    Args:
+        first_window: Text window to analyze
+        max_chars: Maximum character position for the break
+        
+    Returns:
+        Character position for the break, or None if the model is not available or found no boundary
+    """
+    model = get_onnx_model()
+    if model is None:
+        return None
+    
+    try:
+        breakpoint = model.breakpoint(first_window, max_chars)
+    except Exception as e:
+        print(f"ONNX breakpoint detection failed, falling back to sentence boundary: {e}")
+        return None
+    
+    if breakpoint is not None:
+        print(f"ONNX breakpoint at position {breakpoint}")
+    return breakpoint
+
+
+def _local_breakpoint(first_window: str, max_chars: int) -> Optional[int]:
+    """Breakpoint from the configured local backend (ONNX model first, then sentence embeddings)."""
+    if get_onnx_model() is not None:
+        return onnx_breakpoint(first_window, max_chars)
+    return local_semantic_breakpoint(first_window, max_chars)
+
+
+def _local_backend_active() -> bool:
+    """Whether a local breakpoint model is loaded (and replaces the remote LLM)."""
+    return get_onnx_model() is not None or get_local_model() is not None
+
+
+def _break_word_position(first_window: str, break_word: str, max_chars: int) -> Optional[int]:
+    """Position just after the last occurrence of the LLM's break word before max_chars, if any."""
+    if not break_word:
+        return None
+    
+    # Find the last occurrence of this word before max_chars
+    idx = first_window.rfind(break_word, 0, max_chars)
+    if idx == -1:
+        return None
+    
+    # Move to the end of the word
+    breakpoint = idx + len(break_word)
+    
+    # Skip trailing punctuation and one space
+    breakpoint = _TRAIL_PUNCT_RE.match(first_window, breakpoint).end()
+    
+    return min(breakpoint, max_chars)
+
+
+def get_async_llm_client() -> Optional["AsyncOpenAI"]:
+    """
+    Get the async LLM client for chunking shared on the running event loop, creating it on first use.
+    
+    A new client is created when called from a different event loop (e.g. a new asyncio.run()
+    per document), since pooled connections cannot move between loops.
+    
+    Returns:
+        The shared async client, or None if it is not configured
+    """
+    global _async_llm_client, _async_llm_client_loop
+    
+    loop = asyncio.get_running_loop()
+    if _async_llm_client_loop is not loop:
+        _async_llm_client = new_async_llm_client()
+        _async_llm_client_loop = loop
+    return _async_llm_client
+
+
+async def close_async_llm_client() -> None:
+    """Close the shared async LLM client of the running event loop (call before the loop shuts down)."""
+    global _async_llm_client, _async_llm_client_loop
+    
+    if _async_llm_client_loop is not asyncio.get_running_loop():
+        return
+    if _async_llm_client is not None:
+        await _async_llm_client.close()
+    _async_llm_client = None
+    _async_llm_client_loop = None
+
+
+def _run_on_chunking_loop(coro):
+    """
+    Run a coroutine to completion on the long-lived chunking event loop (synchronous callers only).
+    
+    Raises:
+        RuntimeError: If called while an event loop is running in this thread
+    """
+    global _chunking_loop
+    
+    if _chunking_loop is None or _chunking_loop.is_closed():
+        _chunking_loop = asyncio.new_event_loop()
+        atexit.register(_close_chunking_loop)
+    return _chunking_loop.run_until_complete(coro)
+
+
+def _close_chunking_loop() -> None:
+    """Close the async LLM client of the chunking event loop, then the loop itself."""
+    global _chunking_loop
+    
+    if _chunking_loop is not None and not _chunking_loop.is_closed():
+        _chunking_loop.run_until_complete(close_async_llm_client())
+        _chunking_loop.close()
+    _chunking_loop = None
+
+
+def _remote_llm_active() -> bool:
+    """Whether breakpoints for uncached windows come from the remote LLM."""
+    if not _remote_required and _local_backend_active():
+        return False
+    # Checked from the settings: building a client just to see whether one is configured would
+    # set up a connection pool that is never used
+    return bool(_llm_base_url and _llm_api_key and CHUNKING_LLM_MODEL)
+
+
+def _breakpoint_cache_key(first_window: str, max_chars: int) -> Tuple[bytes, int]:
+    return (hashlib.blake2b(first_window.encode('utf-8'), digest_size=16).digest(), max_chars)
+
+
+def _cache_breakpoint(cache_key: Tuple[bytes, int], breakpoint: int) -> None:
+    _breakpoint_cache[cache_key] = breakpoint
+    if len(_breakpoint_cache) > BREAKPOINT_CACHE_SIZE:
+        _breakpoint_cache.popitem(last=False)
+
+
+def _breakpoint_prompt(first_window: str, max_chars: int) -> str:
+    """LLM prompt for one breakpoint decision (matches the n8n implementation)."""
+    return f"""You are analyzing a document to find the best transition point to split it into meaningful sections.
 
 Your goal: Keep related content together and split where topics naturally transition.
 
@@ -96,47 +469,180 @@ Look for:
 Output the LAST WORD that appears right before your chosen split point.
 Just the single word itself, nothing else."""
 
-            response = client.chat.completions.create(
-                model=model,
+
+def _batch_breakpoint_prompt(windows: List[str], pending: List[int], max_chars: int) -> str:
+    """LLM prompt for several breakpoint decisions, answered as {"breaks": [{"index", "word"}]} JSON."""
+    sections = "\n\n".join(f"Section {i}:\n<<<\n{windows[i]}\n>>>" for i in pending)
+    return f"""You are analyzing sections of a document to find the best transition point in each one, to split it into meaningful sections.
+
+Your goal: Keep related content together and split where topics naturally transition.
+
+Read each section carefully and identify where one topic/section ends and another begins:
+
+{sections}
+
+For each section, find the best transition point that occurs BEFORE character position {max_chars} of that section.
+
+Look for:
+- Section headings or topic changes
+- Paragraph boundaries where the subject shifts
+- Complete conclusions before new ideas start
+- Natural breaks between different aspects of the content
+
+For each section, output the LAST WORD that appears right before your chosen split point.
+Respond with JSON only: {{"breaks": [{{"index": <section number>, "word": "<last word>"}}]}}"""
+
+
+def _apply_batch_breaks(content: str, windows: List[str], pending: List[int], breakpoints: List[Optional[int]],
+                        keys: List[Tuple[bytes, int]], max_chars: int) -> None:
+    """Fill in (and cache) the breakpoints from a batched LLM answer."""
+    for entry in json.loads(content).get('breaks', []):
+        i = entry.get('index')
+        if i not in pending or breakpoints[i] is not None:
+            continue
+        breakpoint = _break_word_position(windows[i], str(entry.get('word', '')).strip(), max_chars)
+        if breakpoint:
+            breakpoints[i] = breakpoint
+            _cache_breakpoint(keys[i], breakpoint)
+            _semantic_cache_add(windows[i], breakpoint)
+    print(f"LLM-guided breakpoints for {len(pending)} windows in one request")
+
+
+def offline_breakpoint(first_window: str, max_chars: int) -> int:
+    """
+    Breakpoint detection for long prose when the remote LLM is not used, with a cache of earlier decisions.
+    Uses the local model (ONNX or sentence embeddings) when configured (unless
+    CHUNKING_LLM_REMOTE_REQUIRED=1), earlier LLM decisions for near-duplicate windows, and falls
+    back to sentence boundaries.
+    
+    Args:
+        first_window: Text window to analyze
+        max_chars: Maximum character position for the break
+        
+    Returns:
+        Character position for the break
+    """
+    cache_key = _breakpoint_cache_key(first_window, max_chars)
+    cached = _breakpoint_cache.get(cache_key)
+    if cached is not None:
+        _breakpoint_cache.move_to_end(cache_key)
+        return cached
+    
+    breakpoint = None
+    if not _remote_required:
+        breakpoint = _local_breakpoint(first_window, max_chars)
+    if breakpoint is None and (_remote_required or not _local_backend_active()):
+        breakpoint = _semantic_cache_lookup(first_window, max_chars)
+    
+    if breakpoint is None:
+        # Sentence fallback is cheap and deterministic, so it is not cached
+        return sentence_breakpoint(first_window, max_chars)
+    
+    _cache_breakpoint(cache_key, breakpoint)
+    return breakpoint
+
+
+async def remote_llm_breakpoint_async(client: "AsyncOpenAI", first_window: str, max_chars: int) -> Optional[int]:
+    """
+    LLM-guided breakpoint detection (matches n8n implementation).
+    Asks the chunking LLM for the last word before a natural topic transition.
+    
+    Args:
+        client: Async LLM client to use
+        first_window: Text window to analyze
+        max_chars: Maximum character position for the break
+        
+    Returns:
+        Character position for the break, or None if the LLM gave no usable answer
+    """
+    try:
+        response = await client.chat.completions.create(
+            model=CHUNKING_LLM_MODEL,
+            messages=[
+                {"role": "user", "content": _breakpoint_prompt(first_window, max_chars)}
+            ],
+            temperature=0,
+            max_tokens=BREAKPOINT_MAX_TOKENS,
+            stop=["\n"]
+        )
+        
+        break_word = response.choices[0].message.content.strip()
+        breakpoint = _break_word_position(first_window, break_word, max_chars)
+        if breakpoint is not None:
+            print(f"LLM-guided breakpoint at position {breakpoint} (word: '{break_word}')")
+            return breakpoint
+    
+    except Exception as e:
+        print(f"LLM breakpoint detection failed, falling back to sentence boundary: {e}")
+    
+    return None
+
+
+async def llm_breakpoints_batch_async(client: "AsyncOpenAI", windows: List[str], max_chars: int) -> List[int]:
+    """
+    Breakpoints for several windows, with all uncached remote LLM decisions made in one request.
+    Windows the LLM gives no usable answer for fall back to sentence boundaries.
+    
+    Args:
+        client: Async LLM client to use
+        windows: Text windows to analyze
+        max_chars: Maximum character position for the break in each window
+        
+    Returns:
+        Character position for the break in each window
+    """
+    keys = [_breakpoint_cache_key(window, max_chars) for window in windows]
+    breakpoints: List[Optional[int]] = [_breakpoint_cache.get(key) for key in keys]
+    pending = [i for i, breakpoint in enumerate(breakpoints) if breakpoint is None]
+    pending = _fill_from_semantic_cache(windows, pending, breakpoints, keys, max_chars)
+    
+    if len(pending) == 1:
+        i = pending[0]
+        breakpoints[i] = await remote_llm_breakpoint_async(client, windows[i], max_chars)
+        if breakpoints[i] is not None:
+            _cache_breakpoint(keys[i], breakpoints[i])
+            _semantic_cache_add(windows[i], breakpoints[i])
+    elif pending:
+        try:
+            response = await client.chat.completions.create(
+                model=CHUNKING_LLM_MODEL,
                 messages=[
-                    {"role": "user", "content": prompt}
+                    {"role": "user", "content": _batch_breakpoint_prompt(windows, pending, max_chars)}
                 ],
-                temperature=0.3,
-                max_tokens=50
+                response_format={"type": "json_object"},
+                temperature=0,
+                max_tokens=50 * len(pending)
             )
-            
-            break_word = response.choices[0].message.content.strip()
-            
-            if break_word:
-                # Find the last occurrence of this word before max_chars
-                idx = first_window.rfind(break_word, 0, max_chars)
-                if idx != -1:
-                    # Move to the end of the word
-                    breakpoint = idx + len(break_word)
-                    
-                    # Skip trailing punctuation and one space
-                    while breakpoint < len(first_window) and first_window[breakpoint] in '.!?,;: ':
-                        breakpoint += 1
-                        if breakpoint > 0 and first_window[breakpoint - 1] == ' ':
-                            break
-                    
-                    breakpoint = min(breakpoint, max_chars)
-                    print(f"LLM-guided breakpoint at position {breakpoint} (word: '{break_word}')")
-                    return breakpoint
-        
+            _apply_batch_breaks(response.choices[0].message.content, windows, pending, breakpoints, keys, max_chars)
         except Exception as e:
-            print(f"LLM breakpoint detection failed, falling back to sentence boundary: {e}")
+            print(f"Batched LLM breakpoint detection failed, falling back to sentence boundaries: {e}")
     
-    # Fallback: Find the last sentence ending before max_chars
+    return [
+        breakpoint if breakpoint is not None else sentence_breakpoint(window, max_chars)
+        for window, breakpoint in zip(windows, breakpoints)
+    ]
+
+
+def sentence_breakpoint(first_window: str, max_chars: int) -> int:
+    """
+    Find the last sentence ending (or paragraph break) before max_chars.
+    
+    Args:
+        first_window: Text window to analyze
+        max_chars: Maximum character position for the break
+        
+    Returns:
+        Character position for the break
+    """
     window = first_window[:max_chars]
     
     # Look for sentence endings
-    sentence_endings = [m.end() for m in re.finditer(r'[.!?]\s+', window)]
+    sentence_endings = [m.end() for m in _SENT_END_RE.finditer(window)]
     if sentence_endings:
         return sentence_endings[-1]
     
     # If no sentence ending, look for paragraph break
-    paragraph_breaks = [m.end() for m in re.finditer(r'\n\n', window)]
+    paragraph_breaks = [m.end() for m in _PARA_RE.finditer(window)]
     if paragraph_breaks:
         return paragraph_breaks[-1]
     
@@ -144,53 +650,106 @@ Just the single word itself, nothing else."""
     return max_chars
 
 
-def chunk_text(text: str, chunk_size: int = 1000, overlap: int = 0, use_advanced: bool = True) -> List[str]:
+def _split_long_block(content: str, max_size: int) -> List[str]:
     """
-    Advanced text chunking with Markdown awareness, table preservation, and semantic splitting.
+    Split a prose block longer than max_size at local/sentence breakpoints, one window at a time.
     
-    This function implements a sophisticated chunking strategy:
-    - Sanitizes LaTeX/escape noise
-    - Preserves Markdown structure (especially pipe tables)
-    - Treats tables as atomic blocks (never splits inside)
-    - Uses intelligent breakpoints for long prose
-    - Merges small chunks with neighbors (but never merges tables)
-    - Supports overlap between chunks for context preservation
+    Args:
+        content: The block text
+        max_size: Maximum characters per piece
+        
+    Returns:
+        The pieces of the block, in order
+    """
+    pieces = []
+    remaining = content
+    while remaining:
+        if len(remaining) <= max_size:
+            pieces.append(remaining.strip())
+            break
+        
+        bp = offline_breakpoint(remaining[:max_size], max_size)
+        piece = remaining[:bp].strip()
+        
+        if piece:
+            pieces.append(piece)
+        
+        remaining = remaining[bp:].strip()
+    
+    return pieces
+
+
+async def _split_long_block_async(content: str, max_size: int, client: "AsyncOpenAI",
+                                  semaphore: asyncio.Semaphore) -> List[str]:
+    """
+    Split a prose block longer than max_size at LLM-guided breakpoints.
     
     Args:
-        text: The text to chunk
-        chunk_size: Target maximum characters per chunk (default: 1000)
-        overlap: Number of characters to overlap between chunks (default: 0)
-        use_advanced: Whether to use advanced chunking (default: True)
+        content: The block text
+        max_size: Maximum characters per piece
+        client: Async LLM client
+        semaphore: Semaphore bounding the number of LLM requests in flight
         
     Returns:
-        List of text chunks
+        The pieces of the block, in order
     """
-    if not text:
-        return []
+    pieces = []
+    remaining = content
+    while remaining:
+        if len(remaining) <= max_size:
+            pieces.append(remaining.strip())
+            break
+        
+        # Plan the next cuts at fixed max_size strides and ask for all of them at once
+        n_windows = min(BREAKPOINT_BATCH_SIZE, (len(remaining) - 1) // max_size)
+        windows = [remaining[k * max_size:(k + 1) * max_size] for k in range(n_windows)]
+        async with semaphore:
+            breakpoints = await llm_breakpoints_batch_async(client, windows, max_size)
+        
+        start = 0
+        for k, bp in enumerate(breakpoints):
+            cut = k * max_size + bp
+            while cut - start > max_size:
+                # The stretch up to the planned cut is too long for one chunk:
+                # split it locally at a sentence boundary first
+                local_cut = start + sentence_breakpoint(remaining[start:start + max_size], max_size)
+                piece = remaining[start:local_cut].strip()
+                if piece:
+                    pieces.append(piece)
+                start = local_cut
+            if cut <= start:
+                continue
+            piece = remaining[start:cut].strip()
+            if piece:
+                pieces.append(piece)
+            start = cut
+        
+        remaining = remaining[start:].strip()
     
-    # For backwards compatibility, offer simple chunking
-    if not use_advanced:
-        text = text.replace('\r', '')
-        chunks = []
-        for i in range(0, len(text), chunk_size - overlap):
-            chunk = text[i:i + chunk_size]
-            if chunk:
-                chunks.append(chunk)
-        return chunks
-    
-    # Advanced chunking pipeline
-    max_size = chunk_size or MAX_CHUNK_SIZE
-    min_size = min(MIN_CHUNK_SIZE, max_size // 2)
-    merge_pad = int(max_size * 1.05)
+    return pieces
+
+
+def _split_into_blocks(text: str) -> List[Dict[str, Any]]:
+    """
+    Sanitize text and split it into prose and table blocks (steps 1-3 of chunk_text_async).
     
+    Args:
+        text: The raw text to chunk
+        
+    Returns:
+        List of blocks with 'text' and 'is_table' keys
+    """
     # 1. Sanitize and clean
     sanitized = sanitize_text(text)
     cleaned = clean_text(sanitized)
     
     # 2. Detect if markdown-ish (has headings or tables)
-    has_heading = bool(re.search(r'(^|\n)#{1,6}\s+\S', cleaned))
-    has_table = bool(re.search(r'\n\|[^|\n]+\|', cleaned)) and bool(re.search(r'\|.*\|', cleaned))
-    is_markdownish = has_heading or has_table
+    # (a "\n|cell|" match already contains a "|...|" pair, so no separate pipe scan is needed;
+    # the substring checks skip the regex scans for text without any '#' or '|')
+    is_markdownish = bool(
+        ('#' in cleaned and _HEADING_RE.search(cleaned))
+        or ('|' in cleaned and _TABLE_LINE_RE.search(cleaned))
+    )
     
     # 3. Split into blocks
     blocks = [{'text': cleaned, 'is_table': False}]
@@ -213,65 +772,329 @@ def chunk_text(text: str, chunk_size: int = 1000, overlap: int = 0, use_advanced
         
         blocks = md_blocks
     
-    # 4. Build chunks from blocks
-    chunks = []
+    return blocks
+
+
+def _prepare_blocks(text: str) -> List[Dict[str, Any]]:
+    """
+    Blocks for a document, reusing the result for text that was chunked before.
+    The returned block dicts are shared with the cache and must not be modified.
+    """
+    if BLOCK_CACHE_SIZE <= 0:
+        return _split_into_blocks(text)
     
-    for blk in blocks:
-        content = blk['text'].strip()
-        if not content:
+    key = hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+    blocks = _block_cache.get(key)
+    if blocks is not None:
+        _block_cache.move_to_end(key)
+        return list(blocks)
+    
+    blocks = _split_into_blocks(text)
+    _block_cache[key] = tuple(blocks)
+    if len(_block_cache) > BLOCK_CACHE_SIZE:
+        _block_cache.popitem(last=False)
+    return blocks
+
+
+def iter_simple_chunks(text: str, chunk_size: int = 1000, overlap: int = 0) -> Iterator[str]:
+    """
+    Simple fixed-size chunking, yielding one chunk at a time so callers can stream them.
+    
+    Args:
+        text: The text to chunk
+        chunk_size: Characters per chunk (default: 1000)
+        overlap: Number of characters to overlap between chunks (default: 0)
+        
+    Yields:
+        Text chunks
+        
+    Raises:
+        ValueError: If overlap is not smaller than chunk_size
+    """
+    if overlap >= chunk_size:
+        raise ValueError(f"overlap ({overlap}) must be smaller than chunk_size ({chunk_size})")
+    if '\r' in text:
+        text = text.replace('\r', '')
+    for i in range(0, len(text), chunk_size - overlap):
+        chunk = text[i:i + chunk_size]
+        if chunk:
+            yield chunk
+
+
+def chunk_text(text: str, chunk_size: int = 1000, overlap: int = 0, use_advanced: bool = True) -> List[str]:
+    """
+    Advanced text chunking with Markdown awareness, table preservation, and semantic splitting.
+    Synchronous version of chunk_text_async(). Without a remote LLM it runs no event loop at all;
+    with one, LLM calls run on a long-lived chunking loop that is reused across documents, so
+    inside a running event loop it raises RuntimeError (await chunk_text_async() there instead).
+    
+    Args:
+        text: The text to chunk
+        chunk_size: Target maximum characters per chunk (default: 1000)
+        overlap: Number of characters to overlap between chunks (default: 0)
+        use_advanced: Whether to use advanced chunking (default: True)
+        
+    Returns:
+        List of text chunks
+        
+    Raises:
+        ValueError: If simple chunking is used and overlap is not smaller than chunk_size
+    """
+    if not text:
+        return []
+    
+    # Simple chunking needs no event loop
+    if not use_advanced:
+        return list(iter_simple_chunks(text, chunk_size, overlap))
+    
+    # Local breakpoints need no event loop either
+    if not _remote_llm_active():
+        return _apply_overlap(_build_chunks(text, chunk_size), overlap)
+    
+    return _run_on_chunking_loop(chunk_text_async(text, chunk_size, overlap))
+
+
+def iter_chunks_from_pages(pages: Iterable[str], chunk_size: int = 1000, overlap: int = 0) -> Iterator[str]:
+    """
+    Advanced chunking over a stream of pages, so a long document never has to be held as one string.
+    
+    Pages are collected until about two chunks' worth of text is buffered; the buffer is then
+    chunked and every chunk but the last is emitted. The last chunk may continue on the next
+    page, so its text is carried over into the next buffer.
+    
+    Args:
+        pages: Page texts in document order (empty pages are skipped)
+        chunk_size: Target maximum characters per chunk (default: 1000)
+        overlap: Number of characters to overlap between chunks (default: 0)
+        
+    Yields:
+        Text chunks
+    """
+    max_size = chunk_size or MAX_CHUNK_SIZE
+    buffer = ''
+    previous = None
+    
+    def emit(ready: List[Dict[str, Any]]) -> List[str]:
+        # Overlap is taken from the last chunk of the previous batch as well
+        if previous is None:
+            return _apply_overlap(ready, overlap)
+        return _apply_overlap([previous] + ready, overlap)[1:]
+    
+    def build(text: str) -> List[Dict[str, Any]]:
+        # Buffers are never seen again, so they are kept out of the block cache; remote
+        # breakpoints run on the long-lived chunking loop, sharing its LLM client and connections
+        if not _remote_llm_active():
+            return _build_chunks(text, chunk_size, use_block_cache=False)
+        return _run_on_chunking_loop(_build_chunks_async(text, chunk_size, use_block_cache=False))
+    
+    for page in pages:
+        if not page:
+            continue
+        buffer = f"{buffer}\n\n{page}" if buffer else page
+        if len(buffer) < 2 * max_size:
             continue
         
-        # Keep tables atomic (never split inside)
-        if blk.get('is_table'):
-            chunks.append({'content': content, 'is_table': True})
+        chunks = build(buffer)
+        if len(chunks) < 2:
             continue
         
-        # Non-table text block
-        if len(content) <= max_size:
-            chunks.append({'content': content, 'is_table': False})
-        else:
-            # For long prose blocks, split using sentence boundaries
-            remaining = content
-            while remaining:
-                if len(remaining) <= max_size:
-                    chunks.append({'content': remaining.strip(), 'is_table': False})
-                    break
-                
-                window = remaining[:max_size]
-                bp = llm_breakpoint_sync(window, max_size)
-                piece = remaining[:bp].strip()
-                
-                if piece:
-                    chunks.append({'content': piece, 'is_table': False})
-                
-                remaining = remaining[bp:].strip()
+        yield from emit(chunks[:-1])
+        previous = chunks[-2]
+        buffer = chunks[-1]['content']
+    
+    if buffer:
+        yield from emit(build(buffer))
+
+
+async def chunk_text_async(text: str, chunk_size: int = 1000, overlap: int = 0, use_advanced: bool = True) -> List[str]:
+    """
+    Advanced text chunking with Markdown awareness, table preservation, and semantic splitting.
+    
+    This function implements a sophisticated chunking strategy:
+    - Sanitizes LaTeX/escape noise
+    - Preserves Markdown structure (especially pipe tables)
+    - Treats tables as atomic blocks (never splits inside)
+    - Uses intelligent breakpoints for long prose
+    - Merges small chunks with neighbors (but never merges tables)
+    - Supports overlap between chunks for context preservation
+    
+    Args:
+        text: The text to chunk
+        chunk_size: Target maximum characters per chunk (default: 1000)
+        overlap: Number of characters to overlap between chunks (default: 0)
+        use_advanced: Whether to use advanced chunking (default: True)
+        
+    Returns:
+        List of text chunks
+        
+    Raises:
+        ValueError: If simple chunking is used and overlap is not smaller than chunk_size
+    """
+    if not text:
+        return []
+    
+    # For backwards compatibility, offer simple chunking
+    if not use_advanced:
+        return list(iter_simple_chunks(text, chunk_size, overlap))
+    
+    chunks = await _build_chunks_async(text, chunk_size)
+    return _apply_overlap(chunks, overlap)
+
+
+def _build_chunks(text: str, chunk_size: int, use_block_cache: bool = True) -> List[Dict[str, Any]]:
+    """
+    Steps 1-5 of the advanced chunking pipeline, with breakpoints decided locally (no event loop).
+    
+    Args:
+        text: The text to chunk
+        chunk_size: Target maximum characters per chunk
+        use_block_cache: Whether to reuse (and remember) the block split for this text
+        
+    Returns:
+        List of chunks with 'content' and 'is_table' keys
+    """
+    max_size = chunk_size or MAX_CHUNK_SIZE
+    
+    # 1-3. Sanitize, detect Markdown and split into blocks (cached per document)
+    blocks = _prepare_blocks(text) if use_block_cache else _split_into_blocks(text)
+    
+    # 4. Build chunks from blocks
+    chunks = []
+    for blk in blocks:
+        ready = _short_block_chunks(blk, max_size)
+        if ready is None:
+            ready = [{'content': piece, 'is_table': False} for piece in _split_long_block(blk['text'].strip(), max_size)]
+        chunks.extend(ready)
+    
+    return _merge_small_chunks(chunks, max_size)
+
+
+async def _build_chunks_async(text: str, chunk_size: int, use_block_cache: bool = True) -> List[Dict[str, Any]]:
+    """
+    Steps 1-5 of the advanced chunking pipeline, with breakpoints from the remote LLM when it is active.
+    
+    Args:
+        text: The text to chunk
+        chunk_size: Target maximum characters per chunk
+        use_block_cache: Whether to reuse (and remember) the block split for this text
+        
+    Returns:
+        List of chunks with 'content' and 'is_table' keys
+    """
+    client = get_async_llm_client() if _remote_llm_active() else None
+    if client is None:
+        return _build_chunks(text, chunk_size, use_block_cache)
+    
+    max_size = chunk_size or MAX_CHUNK_SIZE
+    
+    # 1-3. Sanitize, detect Markdown and split into blocks (cached per document)
+    blocks = _prepare_blocks(text) if use_block_cache else _split_into_blocks(text)
+    
+    # 4. Build chunks from blocks (long prose blocks are split concurrently)
+    semaphore = asyncio.Semaphore(BREAKPOINT_CONCURRENCY)
+    
+    async def build_block_chunks(blk: Dict[str, Any]) -> List[Dict[str, Any]]:
+        ready = _short_block_chunks(blk, max_size)
+        if ready is not None:
+            return ready
+        pieces = await _split_long_block_async(blk['text'].strip(), max_size, client, semaphore)
+        return [{'content': piece, 'is_table': False} for piece in pieces]
+    
+    block_chunks = await asyncio.gather(*(build_block_chunks(blk) for blk in blocks))
+    return _merge_small_chunks([chunk for group in block_chunks for chunk in group], max_size)
+
+
+def _short_block_chunks(blk: Dict[str, Any], max_size: int) -> Optional[List[Dict[str, Any]]]:
+    """
+    Chunks of a block that needs no breakpoints: nothing for an empty block, one chunk for a table
+    (kept atomic, never split inside) or a short text block.
+    
+    Args:
+        blk: Block with 'text' and 'is_table' keys
+        max_size: Maximum characters per chunk
+        
+    Returns:
+        The block's chunks, or None for a prose block longer than max_size
+    """
+    content = blk['text'].strip()
+    if not content:
+        return []
+    if blk.get('is_table'):
+        return [{'content': content, 'is_table': True}]
+    if len(content) <= max_size:
+        return [{'content': content, 'is_table': False}]
+    return None
+
+
+def _merge_small_chunks(chunks: List[Dict[str, Any]], max_size: int) -> List[Dict[str, Any]]:
+    """
+    Step 5 of the advanced chunking pipeline: merge chunks shorter than the minimum size with a neighbor.
+    
+    Args:
+        chunks: Chunks with 'content' and 'is_table' keys, in document order
+        max_size: Target maximum characters per chunk
+        
+    Returns:
+        The merged chunks
+    """
+    min_size = min(MIN_CHUNK_SIZE, max_size // 2)
+    merge_pad = int(max_size * 1.05)
     
     # 5. Merge small chunks with neighbors (allow small overflow, but NEVER merge tables)
-    i = 0
-    while i < len(chunks):
-        cur = chunks[i]
-        cur_size = len(cur['content'])
+    # Single forward pass: `merged` is a stack of finished chunks, so a backward
+    # merge pops its top instead of shifting the list. Merged groups collect their
+    # parts and are joined once at the end, so long merge runs stay linear.
+    merged = []
+    next_idx = 0
+    cur = None
+    while True:
+        if cur is None:
+            if next_idx == len(chunks):
+                break
+            chunk = chunks[next_idx]
+            cur = {'parts': [chunk['content']], 'size': len(chunk['content']), 'is_table': chunk.get('is_table')}
+            next_idx += 1
+        
+        cur_size = cur['size']
         
-        if cur_size < min_size and not cur.get('is_table'):
+        if cur_size < min_size and not cur['is_table']:
             # Try forward merge
-            if i + 1 < len(chunks) and not chunks[i + 1].get('is_table'):
-                next_size = len(chunks[i + 1]['content'])
-                if cur_size + next_size <= merge_pad:
-                    cur['content'] += '\n\n' + chunks[i + 1]['content']
-                    chunks.pop(i + 1)
+            if next_idx < len(chunks) and not chunks[next_idx].get('is_table'):
+                next_content = chunks[next_idx]['content']
+                if cur_size + len(next_content) <= merge_pad:
+                    cur['parts'].append(next_content)
+                    cur['size'] += 2 + len(next_content)
+                    next_idx += 1
                     continue
             
-            # Try backward merge
-            if i > 0 and not chunks[i - 1].get('is_table'):
-                prev_size = len(chunks[i - 1]['content'])
+            # Try backward merge (the merged chunk is then re-evaluated)
+            if merged and not merged[-1]['is_table']:
+                prev_size = merged[-1]['size']
                 if prev_size + cur_size <= merge_pad:
-                    chunks[i - 1]['content'] += '\n\n' + cur['content']
-                    chunks.pop(i)
-                    i -= 1
+                    prev = merged.pop()
+                    prev['parts'].extend(cur['parts'])
+                    prev['size'] += 2 + cur_size
+                    cur = prev
                     continue
         
-        i += 1
+        merged.append(cur)
+        cur = None
+    
+    return [{'content': '\n\n'.join(group['parts']), 'is_table': group['is_table']} for group in merged]
+
+
+def _apply_overlap(chunks: List[Dict[str, Any]], overlap: int) -> List[str]:
+    """
+    Steps 6-7 of the advanced chunking pipeline: prefix each non-table chunk with the end of the
+    previous non-table chunk, and return the chunk strings.
     
+    Args:
+        chunks: Chunks with 'content' and 'is_table' keys
+        overlap: Number of characters to overlap between chunks
+        
+    Returns:
+        List of text chunks
+    """
     # 6. Apply overlap if specified (for non-table chunks)
     if overlap > 0:
         result_chunks = []
@@ -5,41 +5,85 @@ This is the main entry point that imports and re-exports all functionality.
 import os
 import io
 import csv
-import tempfile
-from typing import List, Dict, Any
-import pypdf
-from dotenv import load_dotenv
-from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 
 # Import from specialized modules
-from .text_chunker import chunk_text
+from .env import load_environment
+from .text_chunker import chunk_text, iter_simple_chunks, iter_chunks_from_pages
 from .ocr_extractor import extract_text_from_pdf as extract_text_from_pdf_ocr, extract_text_with_ocr
 from .embeddings import create_embeddings
 
-# Check if we're in production
-is_production = os.getenv("ENVIRONMENT") == "production"
-
-if not is_production:
-    # Development: prioritize .env file
-    project_root = Path(__file__).resolve().parent.parent
-    dotenv_path = project_root / '.env'
-    load_dotenv(dotenv_path, override=True)
-else:
-    # Production: use cloud platform env vars only
-    load_dotenv()
+# Load environment variables (once per process)
+load_environment()
 
 # Re-export all functions for backward compatibility
 __all__ = [
     'chunk_text',
+    'iter_simple_chunks',
+    'iter_chunks_from_pages',
     'extract_text_from_pdf',
+    'iter_pdf_pages',
     'extract_text_with_ocr',
     'extract_text_from_file',
+    'iter_pages_from_file',
     'create_embeddings',
     'is_tabular_file',
     'extract_schema_from_csv',
     'extract_rows_from_csv',
+    'iter_rows_from_csv',
+    'extract_schema_and_rows',
 ]
 
+# PDFs with at least this many pages have their pages extracted in parallel worker processes
+PDF_PARALLEL_MIN_PAGES = 32
+PDF_PAGES_PER_TASK = 8
+
+# PDF reader of the worker process (set once per worker by _init_pdf_worker)
+_worker_pdf_reader = None
+
+def _init_pdf_worker(file_content: bytes) -> None:
+    """Parse the PDF once per worker process instead of once per task."""
+    global _worker_pdf_reader
+    import pypdf
+    _worker_pdf_reader = pypdf.PdfReader(io.BytesIO(file_content))
+
+def _extract_page_range(page_range: Tuple[int, int]) -> List[str]:
+    """Extract the text of pages [start, stop) in a worker process."""
+    start, stop = page_range
+    return [_worker_pdf_reader.pages[i].extract_text() for i in range(start, stop)]
+
+def iter_pdf_pages(file_content: bytes) -> Iterator[str]:
+    """
+    Lazily yield the text of each page of a PDF with pypdf, in page order.
+    Large PDFs are extracted in parallel worker processes, a range of pages at a time.
+    
+    Args:
+        file_content: Binary content of the PDF file
+        
+    Yields:
+        Text of each page (empty string for pages without text)
+    """
+    # Imported here: most files never need it, and it is slow to import
+    import pypdf
+    pdf_reader = pypdf.PdfReader(io.BytesIO(file_content))
+    page_count = len(pdf_reader.pages)
+    workers = min(os.cpu_count() or 1, -(-page_count // PDF_PAGES_PER_TASK))
+    
+    if page_count >= PDF_PARALLEL_MIN_PAGES and workers > 1:
+        # Large PDF: extract page ranges in parallel, each worker parsing the PDF once
+        page_ranges = [(start, min(start + PDF_PAGES_PER_TASK, page_count))
+                       for start in range(0, page_count, PDF_PAGES_PER_TASK)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_pdf_worker,
+                                 initargs=(file_content,)) as executor:
+            # map() yields ranges in order as they complete, so early pages are available first
+            for texts in executor.map(_extract_page_range, page_ranges):
+                for text in texts:
+                    yield text or ""
+    else:
+        for page in pdf_reader.pages:
+            yield page.extract_text() or ""
+
 def extract_text_from_pdf(file_content: bytes, file_name: str = "document.pdf") -> str:
     """
     Extract text from a PDF file using Mistral OCR API.
@@ -57,29 +101,47 @@ def extract_text_from_pdf(file_content: bytes, file_name: str = "document.pdf")
         # Use Mistral OCR for better text extraction
         return extract_text_from_pdf_ocr(file_content, file_name)
     
-    # Fallback to pypdf for basic extraction
-    # Create a temporary file to store the PDF content
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
-        temp_file.write(file_content)
-        temp_file_path = temp_file.name
-    
-    try:
-        # Open the PDF file
-        with open(temp_file_path, 'rb') as file:
-            pdf_reader = pypdf.PdfReader(file)
-            text = ""
-            
-            # Extract text from each page
-            for page in pdf_reader.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n\n"
-        
-        return text
-    finally:
-        # Clean up the temporary file
-        if os.path.exists(temp_file_path):
-            os.remove(temp_file_path)
+    # Fallback to pypdf for basic extraction, parsed straight from memory
+    # (join once instead of growing a string page by page)
+    return "".join(f"{page_text}\n\n" for page_text in iter_pdf_pages(file_content) if page_text)
+
+def _handle_pdf(file_content: bytes, mime_type: str, file_name: str) -> str:
+    return extract_text_from_pdf(file_content, file_name)
+
+
+def _handle_ocr_image(file_content: bytes, mime_type: str, file_name: str) -> str:
+    # Use OCR for images if configured
+    if os.getenv('LLM_OCR_API_KEY'):
+        print(f"Processing image {file_name} with Mistral OCR")
+        return extract_text_with_ocr(file_content, file_name, mime_type)
+    # Fallback to filename if OCR not configured
+    return file_name
+
+
+def _handle_other_image(file_content: bytes, mime_type: str, file_name: str) -> str:
+    # For other image types, return filename
+    return file_name
+
+
+def _handle_text(file_content: bytes, mime_type: str, file_name: str) -> str:
+    return file_content.decode('utf-8', errors='replace')
+
+
+# Extraction handlers by exact (normalized) MIME type
+_MIME_HANDLERS = {
+    'application/pdf': _handle_pdf,
+    'image/png': _handle_ocr_image,
+    'image/jpg': _handle_ocr_image,
+    'image/jpeg': _handle_ocr_image,
+    'image/svg': _handle_ocr_image,
+    'image/svg+xml': _handle_ocr_image,
+}
+
+# Extraction handlers by top-level MIME type, for types without an exact handler
+_MIME_PREFIX_HANDLERS = {
+    'image': _handle_other_image,
+}
+
 
 def extract_text_from_file(file_content: bytes, mime_type: str, file_name: str, config: Dict[str, Any] = None) -> str:
     """
@@ -89,33 +151,35 @@ def extract_text_from_file(file_content: bytes, mime_type: str, file_name: str,
         file_content: Binary content of the file
         mime_type: MIME type of the file
         file_name: Name of the file
-        config: Configuration dictionary with supported_mime_types
+        config: Configuration dictionary with supported_mime_types (files that are neither
+            PDFs nor images are decoded as text whether or not their type is listed)
         
     Returns:
         Extracted text from the file
     """
-    supported_mime_types = []
-    if config and 'supported_mime_types' in config:
-        supported_mime_types = config['supported_mime_types']
+    # Drop parameters such as "; charset=utf-8" and normalize case before the lookup
+    mime = mime_type.partition(';')[0].strip().lower()
+    handler = _MIME_HANDLERS.get(mime) or _MIME_PREFIX_HANDLERS.get(mime.partition('/')[0], _handle_text)
+    return handler(file_content, mime_type, file_name)
+
+
+def iter_pages_from_file(file_content: bytes, mime_type: str) -> Optional[Iterator[str]]:
+    """
+    Stream the pages of a file that can be chunked page by page while it is extracted.
+    Only PDFs read with pypdf qualify: OCR returns the whole document at once.
     
-    if 'application/pdf' in mime_type:
-        return extract_text_from_pdf(file_content, file_name)
-    elif mime_type.startswith('image/') and mime_type in ['image/png', 'image/jpg', 'image/jpeg', 'image/svg', 'image/svg+xml']:
-        # Use OCR for images if configured
-        if os.getenv('LLM_OCR_API_KEY'):
-            print(f"Processing image {file_name} with Mistral OCR")
-            return extract_text_with_ocr(file_content, file_name, mime_type)
-        else:
-            # Fallback to filename if OCR not configured
-            return file_name
-    elif mime_type.startswith('image'):
-        # For other image types, return filename
-        return file_name
-    elif config and any(mime_type.startswith(t) for t in supported_mime_types):
-        return file_content.decode('utf-8', errors='replace')
-    else:
-        # For unsupported file types, just try to extract the text
-        return file_content.decode('utf-8', errors='replace')
+    Args:
+        file_content: Binary content of the file
+        mime_type: MIME type of the file
+        
+    Returns:
+        Lazy iterator over the page texts, or None if the file must go through extract_text_from_file()
+    """
+    mime = mime_type.partition(';')[0].strip().lower()
+    if mime != 'application/pdf' or os.getenv('LLM_OCR_API_KEY'):
+        return None
+    return iter_pdf_pages(file_content)
+
 
 def is_tabular_file(mime_type: str, config: Dict[str, Any] = None) -> bool:
     """
@@ -143,6 +207,10 @@ def is_tabular_file(mime_type: str, config: Dict[str, Any] = None) -> bool:
     
     return any(mime_type.startswith(t) for t in tabular_mime_types)
 
+def _open_csv_text(file_content: bytes) -> io.TextIOWrapper:
+    """Decode CSV bytes incrementally as the csv module reads them, instead of copying the whole file into a str."""
+    return io.TextIOWrapper(io.BytesIO(file_content), encoding='utf-8', errors='replace', newline='')
+
 def extract_schema_from_csv(file_content: bytes) -> List[str]:
     """
     Extract column names from a CSV file.
@@ -154,9 +222,7 @@ def extract_schema_from_csv(file_content: bytes) -> List[str]:
         List[str]: List of column names
     """
     try:
-        # Decode the CSV content
-        text_content = file_content.decode('utf-8', errors='replace')
-        csv_reader = csv.reader(io.StringIO(text_content))
+        csv_reader = csv.reader(_open_csv_text(file_content))
         # Get the header row (first row)
         header = next(csv_reader)
         return header
@@ -164,9 +230,51 @@ def extract_schema_from_csv(file_content: bytes) -> List[str]:
         print(f"Error extracting schema from CSV: {e}")
         return []
 
+def iter_rows_from_csv(file_content: bytes) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily yield rows from a CSV file as dictionaries, so callers can stream them.
+    
+    Args:
+        file_content: The binary content of the CSV file
+        
+    Yields:
+        Dict[str, Any]: Row data as a dictionary
+    """
+    try:
+        yield from csv.DictReader(_open_csv_text(file_content))
+    except Exception as e:
+        print(f"Error extracting rows from CSV: {e}")
+
+def _iter_dict_rows(stream: io.TextIOWrapper, header: List[str]) -> Iterator[Dict[str, Any]]:
+    try:
+        yield from csv.DictReader(stream, fieldnames=header)
+    except Exception as e:
+        print(f"Error extracting rows from CSV: {e}")
+
+def extract_schema_and_rows(file_content: bytes) -> Tuple[List[str], Iterator[Dict[str, Any]]]:
+    """
+    Extract the column names and lazily the rows of a CSV file in a single decoding pass.
+    
+    Args:
+        file_content: The binary content of the CSV file
+        
+    Returns:
+        Tuple[List[str], Iterator[Dict[str, Any]]]: Column names, and an iterator over the
+        remaining rows as dictionaries (empty if the header could not be read)
+    """
+    stream = _open_csv_text(file_content)
+    try:
+        # The rows reader continues on the same stream right after the header
+        header = next(csv.reader(stream))
+    except Exception as e:
+        print(f"Error extracting schema from CSV: {e}")
+        return [], iter(())
+    return header, _iter_dict_rows(stream, header)
+
 def extract_rows_from_csv(file_content: bytes) -> List[Dict[str, Any]]:
     """
     Extract rows from a CSV file as a list of dictionaries.
+    Prefer iter_rows_from_csv() for large files.
     
     Args:
         file_content: The binary content of the CSV file
@@ -174,11 +282,4 @@ def extract_rows_from_csv(file_content: bytes) -> List[Dict[str, Any]]:
     Returns:
         List[Dict[str, Any]]: List of row data as dictionaries
     """
-    try:
-        # Decode the CSV content
-        text_content = file_content.decode('utf-8', errors='replace')
-        csv_reader = csv.DictReader(io.StringIO(text_content))
-        return list(csv_reader)
-    except Exception as e:
-        print(f"Error extracting rows from CSV: {e}")
-        return []    
+    return list(iter_rows_from_csv(file_content))    
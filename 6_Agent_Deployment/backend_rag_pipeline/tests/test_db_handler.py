@@ -241,23 +241,29 @@ class TestInsertDocumentRows:
         mock_table.delete.assert_called_once()
         mock_table.delete.return_value.eq.assert_called_once_with("dataset_id", "file123")
         
-        # Should insert new rows
-        assert mock_table.insert.call_count == 2
-        
-        # Check first row insertion
-        first_call_args = mock_table.insert.call_args_list[0][0][0]
-        assert first_call_args["dataset_id"] == "file123"
-        assert first_call_args["row_data"] == {"name": "John", "age": 30}
-        
-        # Check second row insertion
-        second_call_args = mock_table.insert.call_args_list[1][0][0]
-        assert second_call_args["dataset_id"] == "file123"
-        assert second_call_args["row_data"] == {"name": "Jane", "age": 25}
+        # Should insert both rows in one batch
+        mock_table.insert.assert_called_once_with([
+            {"dataset_id": "file123", "row_data": {"name": "John", "age": 30}},
+            {"dataset_id": "file123", "row_data": {"name": "Jane", "age": 25}}
+        ])
         
         # Should print success message
         captured = capfd.readouterr()
         assert "Inserted 2 rows for file ID: file123" in captured.out
     
+    @patch('common.db_handler.supabase')
+    def test_streams_rows_in_batches(self, mock_supabase):
+        """Test that a lazy row iterator is inserted in fixed-size batches"""
+        from common import db_handler
+        mock_table = MagicMock()
+        mock_supabase.table.return_value = mock_table
+        rows = ({"n": n} for n in range(db_handler.ROW_INSERT_BATCH_SIZE + 1))
+        
+        insert_document_rows("file123", rows)
+        
+        batch_sizes = [len(c.args[0]) for c in mock_table.insert.call_args_list]
+        assert batch_sizes == [db_handler.ROW_INSERT_BATCH_SIZE, 1]
+    
     @patch('common.db_handler.supabase')
     def test_error_handling(self, mock_supabase, capfd):
         """Test error handling in document rows insertion"""
@@ -283,8 +289,7 @@ class TestProcessFileForRag:
              patch('common.db_handler.insert_document_rows') as mock_insert_rows, \
              patch('common.db_handler.insert_document_chunks') as mock_insert_chunks, \
              patch('common.db_handler.is_tabular_file') as mock_is_tabular, \
-             patch('common.db_handler.extract_schema_from_csv') as mock_extract_schema, \
-             patch('common.db_handler.extract_rows_from_csv') as mock_extract_rows, \
+             patch('common.db_handler.extract_schema_and_rows') as mock_extract_schema_and_rows, \
              patch('common.db_handler.chunk_text') as mock_chunk_text, \
              patch('common.db_handler.create_embeddings') as mock_create_embeddings:
             
@@ -294,8 +299,7 @@ class TestProcessFileForRag:
                 'insert_rows': mock_insert_rows,
                 'insert_chunks': mock_insert_chunks,
                 'is_tabular': mock_is_tabular,
-                'extract_schema': mock_extract_schema,
-                'extract_rows': mock_extract_rows,
+                'extract_schema_and_rows': mock_extract_schema_and_rows,
                 'chunk_text': mock_chunk_text,
                 'create_embeddings': mock_create_embeddings
             }
@@ -327,7 +331,7 @@ class TestProcessFileForRag:
         mocks['delete_document'].assert_called_once_with(file_id)
         mocks['is_tabular'].assert_called_once_with(mime_type, {'text_processing': {'default_chunk_size': 400, 'default_chunk_overlap': 0}})
         mocks['insert_metadata'].assert_called_once_with(file_id, file_title, file_url, None)
-        mocks['extract_rows'].assert_not_called()
+        mocks['extract_schema_and_rows'].assert_not_called()
         mocks['insert_rows'].assert_not_called()
         mocks['chunk_text'].assert_called_once_with(content, chunk_size=400, overlap=0)
         mocks['create_embeddings'].assert_called_once_with(["Chunk 1", "Chunk 2"])
@@ -342,8 +346,7 @@ class TestProcessFileForRag:
         
         # Setup mocks
         mocks['is_tabular'].return_value = True
-        mocks['extract_schema'].return_value = ["col1", "col2"]
-        mocks['extract_rows'].return_value = [{"col1": "val1", "col2": "val2"}]
+        mocks['extract_schema_and_rows'].return_value = (["col1", "col2"], [{"col1": "val1", "col2": "val2"}])
         mocks['chunk_text'].return_value = ["Chunk 1", "Chunk 2"]
         mocks['create_embeddings'].return_value = [[0.1, 0.2], [0.3, 0.4]]
         
@@ -364,9 +367,8 @@ class TestProcessFileForRag:
         # Assertions
         mocks['delete_document'].assert_called_once_with(file_id)
         mocks['is_tabular'].assert_called_once_with(mime_type, {'text_processing': {'default_chunk_size': 400, 'default_chunk_overlap': 0}})
-        mocks['extract_schema'].assert_called_once_with(file_content)
+        mocks['extract_schema_and_rows'].assert_called_once_with(file_content)
         mocks['insert_metadata'].assert_called_once_with(file_id, file_title, file_url, ["col1", "col2"])
-        mocks['extract_rows'].assert_called_once_with(file_content)
         mocks['insert_rows'].assert_called_once_with(file_id, [{"col1": "val1", "col2": "val2"}])
         mocks['chunk_text'].assert_called_once_with(content, chunk_size=400, overlap=0)
         mocks['create_embeddings'].assert_called_once_with(["Chunk 1", "Chunk 2"])
@@ -0,0 +1,46 @@
+import pytest
+import os
+import sys
+
+np = pytest.importorskip("numpy")
+
+# Add the parent directory to sys.path to import the modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from common.semantic_cache import SemanticBreakpointCache
+
+class BagOfWordsModel:
+    """Deterministic stand-in for a sentence-transformers model"""
+    def get_sentence_embedding_dimension(self):
+        return 64
+    
+    def encode(self, text, normalize_embeddings=True):
+        vector = np.zeros(64, dtype=np.float32)
+        for word in text.lower().split():
+            vector[sum(map(ord, word)) % 64] += 1
+        return vector / np.linalg.norm(vector)
+
+class TestSemanticBreakpointCache:
+    def test_near_duplicate_replays_scaled_breakpoint(self):
+        """Test that a near-duplicate window reuses the stored breakpoint at a word boundary"""
+        cache = SemanticBreakpointCache(BagOfWordsModel())
+        window = "Terms and conditions apply to every order. " * 5 + "Shipping is free."
+        cache.add(window, window.index("Shipping"))
+        
+        near_duplicate = window.replace("every", "each", 1)
+        result = cache.lookup(near_duplicate, len(near_duplicate))
+        
+        assert result == near_duplicate.index("Shipping")
+        assert cache.lookup("Completely different words about quarterly revenue growth.", 100) is None
+    
+    def test_save_and_warm_start(self, tmp_path):
+        """Test that entries survive a restart through the pickle file"""
+        path = str(tmp_path / "breakpoints.pkl")
+        window = "Introduction to the policy. Details follow below."
+        cache = SemanticBreakpointCache(BagOfWordsModel(), path=path)
+        cache.add(window, window.index("Details"))
+        cache.save()
+        
+        warm = SemanticBreakpointCache(BagOfWordsModel(), path=path)
+        
+        assert warm.lookup(window, len(window)) == window.index("Details")
+        assert [p.name for p in tmp_path.iterdir()] == ["breakpoints.pkl"]
@@ -1,5 +1,5 @@
 import pytest
-from unittest.mock import patch, MagicMock, mock_open
+from unittest.mock import patch, MagicMock, AsyncMock
 import io
 import csv
 import os
@@ -30,9 +30,20 @@ with patch.dict(os.environ, {
             create_embeddings, 
             is_tabular_file, 
             extract_schema_from_csv, 
-            extract_rows_from_csv
+            extract_rows_from_csv,
+            iter_simple_chunks
         )
 
+@pytest.fixture
+def chunking_loop(monkeypatch):
+    """Start with no chunking event loop or shared async client, and close the loop afterwards"""
+    from common import text_chunker
+    monkeypatch.setattr(text_chunker, '_chunking_loop', None)
+    monkeypatch.setattr(text_chunker, '_async_llm_client', None)
+    monkeypatch.setattr(text_chunker, '_async_llm_client_loop', None)
+    yield text_chunker
+    text_chunker._close_chunking_loop()
+
 class TestChunkText:
     def test_empty_text(self):
         """Test chunking with empty text returns empty list"""
@@ -83,20 +94,280 @@ class TestChunkText:
             
             # Current chunk should start with this overlap
             assert curr_chunk.startswith(overlap_portion), f"Chunk {i} should start with overlap from previous chunk"
+    
+    def test_simple_mode_streams_chunks(self):
+        """Test that simple mode yields fixed-size chunks lazily and strips carriage returns"""
+        text = "ab\r\ncd" * 100
+        chunks = iter_simple_chunks(text, chunk_size=40, overlap=10)
+        
+        assert next(chunks) == ("ab\ncd" * 8)[:40]
+        assert [next(chunks)] + list(chunks) == chunk_text(text, chunk_size=40, overlap=10, use_advanced=False)[1:]
+    
+    def test_simple_mode_overlap_not_smaller_than_chunk(self):
+        """Test that simple chunking rejects an overlap >= chunk_size"""
+        with pytest.raises(ValueError):
+            chunk_text("A\r\nB" * 3, chunk_size=2, overlap=5, use_advanced=False)
+        with pytest.raises(ValueError):
+            list(iter_simple_chunks("A\r\nB" * 3, chunk_size=2, overlap=2))
+    
+    def test_repeated_document_reuses_blocks(self):
+        """Test that chunking the same text twice only sanitizes and splits it once"""
+        from common import text_chunker
+        text = "# Title\nSome intro text.\n\n| a | b |\n|---|---|\n| 1 | 2 |\n"
+        text_chunker._block_cache.clear()
+        
+        with patch.object(text_chunker, 'sanitize_text', wraps=text_chunker.sanitize_text) as mock_sanitize:
+            first = chunk_text(text, chunk_size=400)
+            second = chunk_text(text, chunk_size=400)
+        
+        assert first == second
+        assert mock_sanitize.call_count == 1
+
+class TestIterChunksFromPages:
+    def test_streamed_pages_keep_all_text(self):
+        """Test that chunking page by page keeps all text, in order, within the size limit"""
+        from common.text_chunker import iter_chunks_from_pages
+        pages = [f"Page {n} starts here. " + "This sentence is on the page. " * 40 for n in range(6)]
+        
+        chunks = list(iter_chunks_from_pages(iter(pages), chunk_size=400))
+        
+        assert len(chunks) > 6
+        assert all(len(chunk) <= 420 for chunk in chunks)
+        assert "".join(chunks).replace(" ", "").replace("\n", "") == "".join(pages).replace(" ", "")
+        assert [chunk for chunk in chunks if chunk.startswith("Page")][0].startswith("Page 0")
+    
+    def test_overlap_spans_batches(self):
+        """Test that every chunk after the first starts with the end of the previous one"""
+        from common.text_chunker import iter_chunks_from_pages
+        pages = ["Words on a page. " * 60 for _ in range(4)]
+        
+        chunks = list(iter_chunks_from_pages(pages, chunk_size=400, overlap=30))
+        
+        for prev_chunk, chunk in zip(chunks, chunks[1:]):
+            assert chunk.startswith(prev_chunk[-30:])
+    
+    def test_one_client_for_all_pages(self, chunking_loop):
+        """Test that every buffer of a page stream is split with the same client, kept open for the next document"""
+        text_chunker = chunking_loop
+        client = MagicMock()
+        client.chat.completions.create = AsyncMock(return_value=MagicMock(
+            choices=[MagicMock(message=MagicMock(content="page"))]
+        ))
+        client.close = AsyncMock()
+        pages = ["Words on a page. " * 60 for _ in range(6)]
+        
+        with patch.object(text_chunker, '_remote_llm_active', return_value=True), \
+             patch.object(text_chunker, 'new_async_llm_client', return_value=client) as mock_new_client:
+            chunks = list(text_chunker.iter_chunks_from_pages(pages, chunk_size=400))
+        
+        assert len(chunks) > 6
+        mock_new_client.assert_called_once()
+        client.close.assert_not_awaited()
+        
+        text_chunker._close_chunking_loop()
+        client.close.assert_awaited_once()
+
+class TestLlmBreakpoint:
+    @pytest.fixture(autouse=True)
+    def clear_breakpoint_cache(self, monkeypatch):
+        """Start each test with an empty breakpoint cache and no local model"""
+        from common import text_chunker
+        text_chunker._breakpoint_cache.clear()
+        monkeypatch.setattr(text_chunker, '_local_model', None)
+        monkeypatch.setattr(text_chunker, '_local_model_name', None)
+        monkeypatch.setattr(text_chunker, '_onnx_model', None)
+        monkeypatch.setattr(text_chunker, '_chunking_backend', '')
+        monkeypatch.setattr(text_chunker, '_remote_required', False)
+        yield
+        text_chunker._breakpoint_cache.clear()
+    
+    def test_repeated_window_uses_cache(self):
+        """Test that the same window only asks the LLM once"""
+        import asyncio
+        from common import text_chunker
+        window = "First topic ends here. Second topic starts now."
+        client = MagicMock()
+        client.chat.completions.create = AsyncMock(return_value=MagicMock(
+            choices=[MagicMock(message=MagicMock(content="here"))]
+        ))
+        
+        first = asyncio.run(text_chunker.llm_breakpoints_batch_async(client, [window], len(window)))
+        second = asyncio.run(text_chunker.llm_breakpoints_batch_async(client, [window], len(window)))
+        
+        assert first == second == [window.index("Second")]
+        assert client.chat.completions.create.call_count == 1
+        assert client.chat.completions.create.call_args.kwargs['temperature'] == 0
+        assert client.chat.completions.create.call_args.kwargs['max_tokens'] == text_chunker.BREAKPOINT_MAX_TOKENS
+    
+    def test_local_model_skips_remote_llm(self):
+        """Test that a configured local model picks the lowest-similarity boundary without calling the LLM"""
+        np = pytest.importorskip("numpy")
+        from common import text_chunker
+        window = "Cats purr. Cats meow. Stocks fell today."
+        model = MagicMock()
+        model.encode.return_value = np.array([[1.0, 0.0], [1.0, 0.0], [0.0, 1.0]])
+        
+        with patch.object(text_chunker, '_local_model', model), \
+             patch.object(text_chunker, 'new_async_llm_client') as mock_new_client:
+            result = text_chunker.offline_breakpoint(window, len(window))
+        
+        assert result == window.index("Stocks")
+        mock_new_client.assert_not_called()
+
+    def test_onnx_backend_skips_remote_llm(self):
+        """Test that the ONNX backend breaks after the highest-scoring token between words"""
+        np = pytest.importorskip("numpy")
+        from common import text_chunker
+        from common.chunker_onnx import OnnxBreakpointModel
+        window = "Cats purr loudly. Stocks fell."
+        # [CLS] Cats pur ##r loudly . Stocks fell . [SEP]
+        offsets = [(0, 0), (0, 4), (5, 8), (8, 9), (10, 16), (16, 17), (18, 24), (25, 29), (29, 30), (0, 0)]
+        tokenizer = MagicMock()
+        tokenizer.encode.return_value = MagicMock(
+            ids=list(range(len(offsets))), attention_mask=[1] * len(offsets),
+            type_ids=[0] * len(offsets), offsets=offsets
+        )
+        session = MagicMock()
+        session.get_inputs.return_value = [MagicMock(), MagicMock()]
+        session.get_inputs.return_value[0].name = 'input_ids'
+        session.get_inputs.return_value[1].name = 'attention_mask'
+        # "pur" scores highest but is inside a word, so the break goes after "."
+        boundary = [0.0, 0.1, 0.9, 0.2, 0.3, 0.8, 0.1, 0.1, 0.0, 0.0]
+        session.run.return_value = [np.array([[[0.0, score] for score in boundary]])]
+        
+        with patch.object(text_chunker, '_onnx_model', OnnxBreakpointModel(session, tokenizer)), \
+             patch.object(text_chunker, 'new_async_llm_client') as mock_new_client:
+            result = text_chunker.offline_breakpoint(window, len(window))
+        
+        assert result == window.index("Stocks")
+        assert set(session.run.call_args.args[1]) == {'input_ids', 'attention_mask'}
+        mock_new_client.assert_not_called()
+
+    def test_batch_asks_llm_once(self):
+        """Test that several windows are decided in a single JSON request"""
+        import asyncio
+        from common import text_chunker
+        windows = ["Alpha ends. Beta starts.", "Gamma ends. Delta starts.", "No answer for this one. Really."]
+        client = MagicMock()
+        client.chat.completions.create = AsyncMock(return_value=MagicMock(choices=[MagicMock(message=MagicMock(
+            content=json.dumps({"breaks": [{"index": 0, "word": "ends"}, {"index": 1, "word": "ends"}]})
+        ))]))
+        
+        result = asyncio.run(text_chunker.llm_breakpoints_batch_async(client, windows, 30))
+        
+        assert result == [windows[0].index("Beta"), windows[1].index("Delta"), windows[2].index("Really")]
+        assert client.chat.completions.create.call_count == 1
+        assert client.chat.completions.create.call_args.kwargs['response_format'] == {"type": "json_object"}
+
+    def test_long_blocks_split_concurrently(self, chunking_loop):
+        """Test that breakpoint requests for different blocks are in flight at the same time"""
+        import asyncio
+        text_chunker = chunking_loop
+        in_flight = {'now': 0, 'peak': 0}
+        
+        async def create(**kwargs):
+            in_flight['now'] += 1
+            in_flight['peak'] = max(in_flight['peak'], in_flight['now'])
+            await asyncio.sleep(0.01)
+            in_flight['now'] -= 1
+            return MagicMock(choices=[MagicMock(message=MagicMock(content="topic"))])
+        
+        client = MagicMock()
+        client.chat.completions.create = create
+        client.close = AsyncMock()
+        text = "\n".join(f"# Part {n}\n" + "Words about the topic go here. " * 50 for n in range(3))
+        
+        with patch.object(text_chunker, '_remote_llm_active', return_value=True), \
+             patch.object(text_chunker, 'new_async_llm_client', return_value=client) as mock_new_client:
+            result = chunk_text(text, chunk_size=1000)
+            chunk_text(text.replace("topic", "subject"), chunk_size=1000)
+        
+        assert in_flight['peak'] == 3
+        assert all(len(chunk) <= 1052 for chunk in result)
+        # Both documents ran on the long-lived chunking loop with one client
+        mock_new_client.assert_called_once()
+        client.close.assert_not_awaited()
+
+    def test_local_chunking_runs_no_event_loop(self, chunking_loop):
+        """Test that without a remote LLM, chunk_text() splits long prose without starting an event loop"""
+        text_chunker = chunking_loop
+        text = "Words about the topic go here. " * 100
+        
+        with patch.object(text_chunker, '_remote_llm_active', return_value=False), \
+             patch.object(text_chunker, '_run_on_chunking_loop') as mock_run:
+            result = chunk_text(text, chunk_size=400)
+            pages = list(text_chunker.iter_chunks_from_pages([text, text], chunk_size=400))
+        
+        assert len(result) > 1 and len(pages) > 1
+        assert all(len(chunk) <= 400 for chunk in result)
+        mock_run.assert_not_called()
+
+    def test_chunk_text_in_running_loop_raises(self, chunking_loop):
+        """Test that chunk_text() with a remote LLM refuses to run inside an event loop"""
+        import asyncio
+        text_chunker = chunking_loop
+        
+        async def chunk_inside_loop():
+            coro = text_chunker.chunk_text_async("Words. " * 300, chunk_size=400)
+            try:
+                with patch.object(text_chunker, 'chunk_text_async', MagicMock(return_value=coro)):
+                    return chunk_text("Words. " * 300, chunk_size=400)
+            finally:
+                coro.close()
+        
+        with patch.object(text_chunker, '_remote_llm_active', return_value=True):
+            with pytest.raises(RuntimeError):
+                asyncio.run(chunk_inside_loop())
+
+    def test_documents_on_one_loop_share_client(self):
+        """Test that documents chunked on the same event loop reuse one async client"""
+        import asyncio
+        from common import text_chunker
+        client = MagicMock()
+        client.chat.completions.create = AsyncMock(return_value=MagicMock(
+            choices=[MagicMock(message=MagicMock(content="topic"))]
+        ))
+        client.close = AsyncMock()
+        documents = [f"Document {n}. " + "Words about the topic go here. " * 50 for n in range(3)]
+        
+        async def chunk_all():
+            try:
+                return [await text_chunker.chunk_text_async(doc, chunk_size=400) for doc in documents]
+            finally:
+                await text_chunker.close_async_llm_client()
+        
+        with patch.object(text_chunker, '_remote_llm_active', return_value=True), \
+             patch.object(text_chunker, 'new_async_llm_client', return_value=client) as mock_new_client:
+            results = asyncio.run(chunk_all())
+        
+        assert all(len(chunks) > 1 for chunks in results)
+        mock_new_client.assert_called_once()
+        client.close.assert_awaited_once()
+
+    def test_reload_config_reads_environment_once(self, monkeypatch):
+        """Test that chunking settings come from the environment only when reload_config() runs"""
+        from common import text_chunker
+        monkeypatch.setenv('CHUNKING_LLM_MODEL', 'test-chunk-model')
+        monkeypatch.setenv('CHUNKING_LLM_BASE_URL', 'https://llm.example.com/v1')
+        monkeypatch.setenv('CHUNKING_LLM_API_KEY', 'test-key')
+        
+        try:
+            text_chunker.reload_config()
+            monkeypatch.setenv('CHUNKING_LLM_MODEL', 'changed-model')
+            monkeypatch.delenv('CHUNKING_LLM_API_KEY')
+            
+            assert text_chunker._remote_llm_active()
+            assert text_chunker.CHUNKING_LLM_MODEL == 'test-chunk-model'
+        finally:
+            monkeypatch.undo()
+            text_chunker.reload_config()
 
 class TestExtractTextFromPdf:
     @patch('tempfile.NamedTemporaryFile')
     @patch('pypdf.PdfReader')
-    @patch('os.path.exists')
-    @patch('os.remove')
-    @patch('builtins.open', new_callable=mock_open)
-    def test_extract_text(self, mock_file_open, mock_remove, mock_exists, mock_pdf_reader, mock_temp_file):
+    def test_extract_text(self, mock_pdf_reader, mock_temp_file):
         """Test extracting text from PDF"""
         # Setup mocks
-        mock_temp = MagicMock()
-        mock_temp.name = 'temp.pdf'
-        mock_temp_file.return_value.__enter__.return_value = mock_temp
-        
         mock_page1 = MagicMock()
         mock_page1.extract_text.return_value = "Page 1 content"
         mock_page2 = MagicMock()
@@ -106,15 +377,14 @@ class TestExtractTextFromPdf:
         mock_reader.pages = [mock_page1, mock_page2]
         mock_pdf_reader.return_value = mock_reader
         
-        mock_exists.return_value = True
-        
         # Call the function
         result = extract_text_from_pdf(b'fake pdf content')
         
         # Assertions
         assert result == "Page 1 content\n\nPage 2 content\n\n"
-        mock_temp.write.assert_called_once_with(b'fake pdf content')
-        mock_remove.assert_called_once_with('temp.pdf')
+        # Parsed from memory, without a temporary file
+        assert mock_pdf_reader.call_args[0][0].getvalue() == b'fake pdf content'
+        mock_temp_file.assert_not_called()
 
 class TestExtractTextFromFile:
     @patch('common.text_processor.extract_text_from_pdf')
@@ -147,6 +417,28 @@ class TestExtractTextFromFile:
         result = extract_text_from_file(content, mime_type, file_name)
         
         assert result == "Some content"
+    
+    @patch('common.text_processor.extract_text_from_pdf')
+    def test_mime_type_is_normalized(self, mock_extract_pdf):
+        """Test that MIME parameters and case do not change how a file is handled"""
+        mock_extract_pdf.return_value = "PDF content"
+        
+        assert extract_text_from_file(b'%PDF', 'Application/PDF; charset=binary', 'test.pdf') == "PDF content"
+        assert extract_text_from_file(b'GIF89a', 'image/gif', 'test.gif') == "test.gif"
+
+class TestIterPagesFromFile:
+    @patch('common.text_processor.iter_pdf_pages')
+    def test_pdf_pages_are_streamed(self, mock_iter_pages, monkeypatch):
+        """Test that PDFs read with pypdf are returned as a page stream and other files are not"""
+        from common.text_processor import iter_pages_from_file
+        monkeypatch.delenv('LLM_OCR_API_KEY', raising=False)
+        mock_iter_pages.return_value = iter(["Page 1", "Page 2"])
+        
+        assert list(iter_pages_from_file(b'%PDF', 'application/pdf')) == ["Page 1", "Page 2"]
+        assert iter_pages_from_file(b'Text', 'text/plain') is None
+        
+        monkeypatch.setenv('LLM_OCR_API_KEY', 'test-key')
+        assert iter_pages_from_file(b'%PDF', 'application/pdf') is None
 
 # Global reference to the mocked OpenAI client
 openai_client_mock = mock_client
@@ -248,3 +540,30 @@ class TestExtractRowsFromCsv:
         # Check that error was printed
         captured = capfd.readouterr()
         assert "Error extracting rows from CSV" in captured.out
+
+class TestExtractSchemaAndRows:
+    def test_single_pass(self):
+        """Test that the header and the rows come from one reader, including quoted multi-line fields"""
+        from common.text_processor import extract_schema_and_rows
+        csv_content = b'Name,"Notes\nmore"\r\nJohn,"line1\nline2"\r\nJane,ok\r\n'
+        
+        schema, rows = extract_schema_and_rows(csv_content)
+        
+        assert schema == ['Name', 'Notes\nmore']
+        assert list(rows) == [
+            {'Name': 'John', 'Notes\nmore': 'line1\nline2'},
+            {'Name': 'Jane', 'Notes\nmore': 'ok'}
+        ]
+        assert extract_rows_from_csv(csv_content) == [
+            {'Name': 'John', 'Notes\nmore': 'line1\nline2'},
+            {'Name': 'Jane', 'Notes\nmore': 'ok'}
+        ]
+    
+    def test_empty_csv(self):
+        """Test that an empty file has no columns and no rows"""
+        from common.text_processor import extract_schema_and_rows
+        
+        schema, rows = extract_schema_and_rows(b'')
+        
+        assert schema == []
+        assert list(rows) == []
@@ -0,0 +1,212 @@
+"""
+Brave Search client for the multi-agent system.
+Keeps one pooled HTTP client per event loop and caches recent search results.
+"""
+
+import json
+import asyncio
+import logging
+import httpx
+from typing import List, Dict, Any, Optional, Tuple
+
+from cachetools import TTLCache
+
+try:
+    # Optional C JSON parser for API responses; json.loads accepts the same bytes
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+logger = logging.getLogger(__name__)
+
+BRAVE_API_BASE_URL = "https://api.search.brave.com"
+# Most results Brave returns for one query
+BRAVE_MAX_RESULTS = 20
+# Relevance score by result position: 1.0 for the first, 0.05 less for each next one, at least 0.1
+_RESULT_SCORES = tuple(max(1.0 - idx * 0.05, 0.1) for idx in range(BRAVE_MAX_RESULTS))
+# Recent search results by (query, count, offset, country, lang), to spare the API quota on repeats
+SEARCH_CACHE_TTL = 600
+_search_cache: TTLCache = TTLCache(maxsize=1024, ttl=SEARCH_CACHE_TTL)
+# Searches currently waiting on Brave, so concurrent identical searches share one request
+_search_in_flight: Dict[Tuple[Any, ...], "asyncio.Task[List[Dict[str, Any]]]"] = {}
+
+# Shared Brave Search client, reused across searches so connections (and their TLS
+# handshakes) are kept alive; tied to the event loop it was created in
+_brave_client: Optional[httpx.AsyncClient] = None
+_brave_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+async def _get_brave_client(api_key: str) -> httpx.AsyncClient:
+    """
+    Get the shared Brave Search client, creating it on first use.
+    
+    A new client is created when called from a different event loop (e.g. a new
+    asyncio.run() per request), since pooled connections cannot move between loops;
+    the client of the earlier loop is closed first.
+    
+    Args:
+        api_key: Brave Search API key, sent with every request as a default header
+    
+    Returns:
+        HTTP/2 client with a keep-alive connection pool
+    """
+    global _brave_client, _brave_client_loop
+    
+    loop = asyncio.get_running_loop()
+    if _brave_client is not None and not _brave_client.is_closed and _brave_client_loop is not loop:
+        stale = _brave_client
+        _brave_client = None
+        try:
+            await stale.aclose()
+        except Exception as e:
+            # Its connections belong to the earlier loop, which may already be closed
+            logger.debug("Error closing the Brave client of a previous event loop: %s", e)
+    
+    if _brave_client is None or _brave_client.is_closed or _brave_client_loop is not loop:
+        _brave_client = httpx.AsyncClient(
+            base_url=BRAVE_API_BASE_URL,
+            http2=True,
+            timeout=30.0,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+            # gzip is the compression Brave documents; httpx decompresses it transparently
+            headers={"X-Subscription-Token": api_key, "Accept": "application/json", "Accept-Encoding": "gzip"}
+        )
+        _brave_client_loop = loop
+    elif _brave_client.headers["X-Subscription-Token"] != api_key:
+        _brave_client.headers["X-Subscription-Token"] = api_key
+    return _brave_client
+
+
+async def close_brave_client() -> None:
+    """Close the shared Brave Search client (call before the event loop shuts down)."""
+    global _brave_client, _brave_client_loop
+    
+    if _brave_client is not None:
+        await _brave_client.aclose()
+    _brave_client = None
+    _brave_client_loop = None
+
+
+# Brave Search Tool Function
+async def search_web_tool(
+    api_key: str,
+    query: str,
+    count: int = 10,
+    offset: int = 0,
+    country: Optional[str] = None,
+    lang: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Pure function to search the web using Brave Search API.
+    
+    Args:
+        api_key: Brave Search API key
+        query: Search query
+        count: Number of results to return (1-20)
+        offset: Offset for pagination
+        country: Country code for localized results
+        lang: Language code for results
+        
+    Returns:
+        List of search results as dictionaries
+        
+    Raises:
+        ValueError: If query is empty or API key missing
+        Exception: If API request fails
+    """
+    if not api_key or not api_key.strip():
+        raise ValueError("Brave API key is required")
+    
+    if not query or not query.strip():
+        raise ValueError("Query cannot be empty")
+    
+    # Ensure count is within valid range
+    count = min(max(count, 1), BRAVE_MAX_RESULTS)
+    
+    params = (("q", query), ("count", count), ("offset", offset))
+    if country:
+        params += (("country", country),)
+    if lang:
+        params += (("lang", lang),)
+    
+    key = (query.strip().lower(), count, offset, country, lang)
+    cached = _search_cache.get(key)
+    if cached is not None:
+        logger.info("Using cached Brave results for: %s", query)
+        return cached
+    
+    # Share the request of an identical search that is already in flight
+    task = _search_in_flight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_fetch_search_results(api_key, query, params))
+        _search_in_flight[key] = task
+        task.add_done_callback(lambda _: _search_in_flight.pop(key, None))
+    
+    # Shielded so one caller being cancelled doesn't cancel the search for the others
+    results = await asyncio.shield(task)
+    _search_cache[key] = results
+    return results
+
+
+async def _fetch_search_results(api_key: str, query: str, params: Tuple[Tuple[str, Any], ...]) -> List[Dict[str, Any]]:
+    """
+    Run a search against the Brave Search API.
+    
+    Args:
+        api_key: Brave Search API key
+        query: Search query (for logging)
+        params: Query parameters of the request, as (name, value) pairs
+        
+    Returns:
+        List of search results as dictionaries
+        
+    Raises:
+        Exception: If API request fails
+    """
+    logger.info("Searching Brave for: %s", query)
+    
+    try:
+        client = await _get_brave_client(api_key)
+        response = await client.get(
+            "/res/v1/web/search",
+            params=params
+        )
+        
+        # Handle rate limiting
+        if response.status_code == 429:
+            raise Exception("Rate limit exceeded. Check your Brave API quota.")
+        
+        # Handle authentication errors
+        if response.status_code == 401:
+            raise Exception("Invalid Brave API key")
+        
+        # Handle other errors
+        if response.status_code != 200:
+            raise Exception(f"Brave API returned {response.status_code}: {response.text}")
+        
+        data = _json_loads(response.content)
+        
+        # Extract web results
+        web_results = data.get("web", {}).get("results", [])
+        
+        # Convert to our format, scoring results by position
+        results = [
+            {
+                "title": result.get("title", ""),
+                "url": result.get("url", ""),
+                "description": result.get("description", ""),
+                "score": score
+            }
+            for result, score in zip(web_results, _RESULT_SCORES)
+        ]
+        
+        logger.info("Found %d results for query: %s", len(results), query)
+        return results
+        
+    except httpx.RequestError as e:
+        logger.error("Request error during Brave search: %s", e)
+        raise Exception(f"Request failed: {str(e)}")
+    except Exception as e:
+        logger.error("Error during Brave search: %s", e)
+        raise
@@ -3,13 +3,14 @@ Email Draft Agent for creating Gmail drafts.
 """
 
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from dataclasses import dataclass
 
 from pydantic_ai import Agent, RunContext
 
 from .providers import get_llm_model
-from .tools import create_email_draft_tool, list_email_drafts_tool
+from .models import EmailDraft
+from .tools import create_email_draft_tool, create_email_drafts_batch_tool, list_email_drafts_tool
 
 logger = logging.getLogger(__name__)
 
@@ -35,7 +36,7 @@ When creating emails:
 """
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class EmailAgentDependencies:
     """Dependencies for the email agent - only configuration, no tool instances."""
     gmail_credentials_path: str
@@ -108,6 +109,45 @@ async def create_gmail_draft(
         }
 
 
+@email_agent.tool
+async def create_gmail_drafts_batch(
+    ctx: RunContext[EmailAgentDependencies],
+    drafts: List[EmailDraft]
+) -> Dict[str, Any]:
+    """
+    Create several Gmail drafts at once. Prefer this over repeated create_gmail_draft calls.
+    
+    Args:
+        drafts: Drafts to create, each with recipients, subject, body and optional CC/BCC
+    
+    Returns:
+        Dictionary with one result per draft, in order
+    """
+    try:
+        results = await create_email_drafts_batch_tool(
+            credentials_path=ctx.deps.gmail_credentials_path,
+            token_path=ctx.deps.gmail_token_path,
+            drafts=[draft.model_dump() for draft in drafts]
+        )
+        
+        created = sum(1 for result in results if result["success"])
+        logger.info("Gmail drafts created: %d/%d", created, len(results))
+        return {
+            "success": created == len(results),
+            "results": results,
+            "count": created
+        }
+        
+    except Exception as e:
+        logger.error("Failed to create Gmail drafts: %s", e)
+        return {
+            "success": False,
+            "error": str(e),
+            "results": [],
+            "count": 0
+        }
+
+
 @email_agent.tool
 async def list_gmail_drafts(
     ctx: RunContext[EmailAgentDependencies],
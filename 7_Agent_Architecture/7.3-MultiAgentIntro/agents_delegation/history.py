@@ -0,0 +1,39 @@
+"""
+Helpers for bounding conversation history passed to agents.
+"""
+
+from typing import List, Optional
+
+from pydantic_ai.messages import ModelMessage, ModelRequest, UserPromptPart
+
+
+def starts_turn(message: ModelMessage) -> bool:
+    """Check whether a message is a request carrying a user prompt, i.e. the start of a turn."""
+    return isinstance(message, ModelRequest) and any(isinstance(part, UserPromptPart) for part in message.parts)
+
+
+def trim_history(messages: List[ModelMessage], max_messages: int, end: Optional[int] = None) -> List[ModelMessage]:
+    """
+    Bound a conversation history to its opening request and latest messages.
+    
+    The opening request is always kept: it carries the system prompt, which agents don't add
+    again when given a history. Of the rest, at most max_messages of the latest messages are
+    kept, starting at a turn so no tool result is separated from its call.
+    
+    Args:
+        messages: Conversation history
+        max_messages: Maximum number of latest messages to keep besides the opening request
+        end: Number of leading messages to consider (defaults to all)
+    
+    Returns:
+        The bounded history (a new list)
+    """
+    if end is None:
+        end = len(messages)
+    if end <= max_messages + 1:
+        return messages[:max(end, 0)]
+    
+    start = end - max_messages
+    while start < end and not starts_turn(messages[start]):
+        start += 1
+    return messages[:1] + messages[start:end]
@@ -6,7 +6,7 @@ Based on examples/agent/providers.py pattern.
 from typing import Optional
 from pydantic_ai.providers.openai import OpenAIProvider
 from pydantic_ai.models.openai import OpenAIModel
-from config.settings import settings
+from config.settings import get_settings
 
 
 def get_llm_model(model_choice: Optional[str] = None) -> OpenAIModel:
@@ -19,6 +19,7 @@ def get_llm_model(model_choice: Optional[str] = None) -> OpenAIModel:
     Returns:
         Configured OpenAI-compatible model
     """
+    settings = get_settings()
     llm_choice = model_choice or settings.llm_model
     base_url = settings.llm_base_url
     api_key = settings.llm_api_key
@@ -36,6 +37,7 @@ def get_model_info() -> dict:
     Returns:
         Dictionary with model configuration info
     """
+    settings = get_settings()
     return {
         "llm_provider": settings.llm_provider,
         "llm_model": settings.llm_model,
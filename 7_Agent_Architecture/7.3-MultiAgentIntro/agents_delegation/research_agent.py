@@ -2,7 +2,9 @@
 Research Agent that uses Brave Search and can invoke Email Agent.
 """
 
+import asyncio
 import logging
+from itertools import islice
 from typing import Dict, Any, List, Optional
 from dataclasses import dataclass
 
@@ -24,6 +26,7 @@ Your capabilities:
 
 When conducting research:
 - Use specific, targeted search queries
+- When you need several searches, run them together with search_web_many instead of one search_web call each
 - Analyze search results for relevance and credibility
 - Synthesize information from multiple sources
 - Provide clear, well-organized summaries
@@ -39,7 +42,7 @@ Always strive to provide accurate, helpful, and actionable information.
 """
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ResearchAgentDependencies:
     """Dependencies for the research agent - only configuration, no tool instances."""
     brave_api_key: str
@@ -82,14 +85,51 @@ async def search_web(
             count=max_results
         )
         
-        logger.info(f"Found {len(results)} results for query: {query}")
+        logger.info("Found %d results for query: %s", len(results), query)
         return results
         
     except Exception as e:
-        logger.error(f"Web search failed: {e}")
+        logger.error("Web search failed: %s", e)
         return [{"error": f"Search failed: {str(e)}"}]
 
 
+@research_agent.tool
+async def search_web_many(
+    ctx: RunContext[ResearchAgentDependencies],
+    queries: List[str],
+    max_results: int = 10
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Search the web for several queries at once using Brave Search API.
+    
+    Args:
+        queries: Search queries to run in parallel
+        max_results: Maximum number of results to return per query (1-20)
+    
+    Returns:
+        Search results for each query, keyed by query
+    """
+    # Ensure max_results is within valid range
+    max_results = min(max(max_results, 1), 20)
+    
+    # The searches share one pooled HTTP/2 connection, so they run concurrently
+    queries = list(dict.fromkeys(queries))
+    outcomes = await asyncio.gather(
+        *(search_web_tool(api_key=ctx.deps.brave_api_key, query=query, count=max_results) for query in queries),
+        return_exceptions=True
+    )
+    
+    results = {}
+    for query, outcome in zip(queries, outcomes):
+        if isinstance(outcome, Exception):
+            logger.error("Web search failed for query %s: %s", query, outcome)
+            results[query] = [{"error": f"Search failed: {str(outcome)}"}]
+        else:
+            logger.info("Found %d results for query: %s", len(outcome), query)
+            results[query] = outcome
+    return results
+
+
 @research_agent.tool
 async def create_email_draft(
     ctx: RunContext[ResearchAgentDependencies],
@@ -153,7 +193,7 @@ Please create a well-structured email that addresses the context provided.
             usage=ctx.usage  # Pass usage for token tracking
         )
         
-        logger.info(f"Email agent invoked for recipient: {recipient_email}")
+        logger.info("Email agent invoked for recipient: %s", recipient_email)
         
         return {
             "success": True,
@@ -164,7 +204,7 @@ Please create a well-structured email that addresses the context provided.
         }
         
     except Exception as e:
-        logger.error(f"Failed to create email draft via Email Agent: {e}")
+        logger.error("Failed to create email draft via Email Agent: %s", e)
         return {
             "success": False,
             "error": str(e),
@@ -199,19 +239,13 @@ async def summarize_research(
                 "sources": []
             }
         
-        # Extract key information
-        sources = []
-        descriptions = []
-        
-        for result in search_results:
-            if "title" in result and "url" in result:
-                sources.append(f"- {result['title']}: {result['url']}")
-                if "description" in result:
-                    descriptions.append(result["description"])
+        # Extract key information; only the first 5 descriptions and 10 sources are used
+        sources = [result for result in search_results if "title" in result and "url" in result]
+        descriptions = list(islice((result["description"] for result in sources if "description" in result), 5))
         
         # Create summary content
-        content_summary = "\n".join(descriptions[:5])  # Limit to top 5 descriptions
-        sources_list = "\n".join(sources[:10])  # Limit to top 10 sources
+        content_summary = "\n".join(descriptions)
+        sources_list = "\n".join(f"- {result['title']}: {result['url']}" for result in sources[:10])
         
         focus_text = f"\nSpecific focus areas: {focus_areas}" if focus_areas else ""
         
@@ -229,11 +263,11 @@ Sources:
             "summary": summary,
             "topic": topic,
             "sources_count": len(sources),
-            "key_points": descriptions[:5]
+            "key_points": descriptions
         }
         
     except Exception as e:
-        logger.error(f"Failed to summarize research: {e}")
+        logger.error("Failed to summarize research: %s", e)
         return {
             "summary": f"Failed to summarize research: {str(e)}",
             "key_points": [],
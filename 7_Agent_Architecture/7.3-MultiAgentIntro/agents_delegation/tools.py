@@ -5,134 +5,92 @@ These are standalone functions that can be imported and used by any agent.
 
 import os
 import base64
+import asyncio
 import logging
-import httpx
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+import tempfile
+import threading
+import httplib2
+from email.message import EmailMessage
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime, timedelta, timezone
 
 from google.auth.transport.requests import Request
+from google_auth_httplib2 import AuthorizedHttp
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
 from agents_delegation.models import BraveSearchResult
+# Re-exported: the research agents import the search tool from here
+from agents_delegation.brave_client import search_web_tool
+
+try:
+    # Optional SIMD base64 (several times faster on large messages); same API as base64
+    import pybase64 as _b64
+except ImportError:
+    _b64 = base64
 
 logger = logging.getLogger(__name__)
 
+# Gmail Tool Functions
+# Authenticated Gmail services by (credentials_path, token_path), with the credentials they use
+_gmail_service_cache: Dict[Tuple[str, str], Tuple[Credentials, Any]] = {}
+# Serializes token loading/refreshing so concurrent calls don't all refresh the same token
+_gmail_auth_lock = threading.Lock()
+# Refresh tokens this long before they expire, so a request never starts with a token about to lapse
+GMAIL_TOKEN_LEEWAY = timedelta(seconds=300)
+# Per-thread authorized HTTP connection for Gmail requests (httplib2 is not thread-safe)
+_gmail_http = threading.local()
+# Most requests the Gmail API accepts in a single batch
+GMAIL_BATCH_SIZE = 100
 
-# Brave Search Tool Function
-async def search_web_tool(
-    api_key: str,
-    query: str,
-    count: int = 10,
-    offset: int = 0,
-    country: Optional[str] = None,
-    lang: Optional[str] = None
-) -> List[Dict[str, Any]]:
+
+def _gmail_creds_fresh(creds: Credentials) -> bool:
+    """Check that credentials are valid and not within GMAIL_TOKEN_LEEWAY of expiring."""
+    if not creds.valid:
+        return False
+    # google-auth stores expiry as a naive UTC datetime
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    return creds.expiry is None or creds.expiry - now > GMAIL_TOKEN_LEEWAY
+
+
+def _save_gmail_token(token_path: str, token_json: str) -> None:
     """
-    Pure function to search the web using Brave Search API.
+    Write the Gmail token file atomically, skipping the write if it already holds this token.
     
     Args:
-        api_key: Brave Search API key
-        query: Search query
-        count: Number of results to return (1-20)
-        offset: Offset for pagination
-        country: Country code for localized results
-        lang: Language code for results
-        
-    Returns:
-        List of search results as dictionaries
-        
-    Raises:
-        ValueError: If query is empty or API key missing
-        Exception: If API request fails
+        token_path: Path to token.json file
+        token_json: Serialized credentials
     """
-    if not api_key or not api_key.strip():
-        raise ValueError("Brave API key is required")
-    
-    if not query or not query.strip():
-        raise ValueError("Query cannot be empty")
-    
-    # Ensure count is within valid range
-    count = min(max(count, 1), 20)
-    
-    headers = {
-        "X-Subscription-Token": api_key,
-        "Accept": "application/json"
-    }
-    
-    params = {
-        "q": query,
-        "count": count,
-        "offset": offset
-    }
-    
-    if country:
-        params["country"] = country
-    if lang:
-        params["lang"] = lang
-    
-    logger.info(f"Searching Brave for: {query}")
+    try:
+        with open(token_path) as token:
+            if token.read() == token_json:
+                return
+    except OSError:
+        pass
     
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(
-                "https://api.search.brave.com/res/v1/web/search",
-                headers=headers,
-                params=params,
-                timeout=30.0
-            )
-            
-            # Handle rate limiting
-            if response.status_code == 429:
-                raise Exception("Rate limit exceeded. Check your Brave API quota.")
-            
-            # Handle authentication errors
-            if response.status_code == 401:
-                raise Exception("Invalid Brave API key")
-            
-            # Handle other errors
-            if response.status_code != 200:
-                raise Exception(f"Brave API returned {response.status_code}: {response.text}")
-            
-            data = response.json()
-            
-            # Extract web results
-            web_results = data.get("web", {}).get("results", [])
-            
-            # Convert to our format
-            results = []
-            for idx, result in enumerate(web_results):
-                # Calculate a simple relevance score based on position
-                score = 1.0 - (idx * 0.05)  # Decrease by 0.05 for each position
-                score = max(score, 0.1)  # Minimum score of 0.1
-                
-                results.append({
-                    "title": result.get("title", ""),
-                    "url": result.get("url", ""),
-                    "description": result.get("description", ""),
-                    "score": score
-                })
-            
-            logger.info(f"Found {len(results)} results for query: {query}")
-            return results
-            
-        except httpx.RequestError as e:
-            logger.error(f"Request error during Brave search: {e}")
-            raise Exception(f"Request failed: {str(e)}")
-        except Exception as e:
-            logger.error(f"Error during Brave search: {e}")
-            raise
+    directory = os.path.dirname(token_path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    # mkstemp creates the file as 0600, which suits a token
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(token_path)}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as token:
+            token.write(token_json)
+        os.replace(tmp_path, token_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    logger.info("Gmail token saved to %s", token_path)
 
 
-# Gmail Tool Functions
 def _get_gmail_service(credentials_path: str, token_path: str) -> Any:
     """
     Get authenticated Gmail service.
     
+    The service and its credentials are cached per (credentials_path, token_path), so the
+    token file is only read and the service only built again when the token needs a refresh.
+    
     Args:
         credentials_path: Path to credentials.json file
         token_path: Path to token.json file
@@ -140,50 +98,97 @@ def _get_gmail_service(credentials_path: str, token_path: str) -> Any:
     Returns:
         Authenticated Gmail service object
     """
-    scopes = [
-        "https://www.googleapis.com/auth/gmail.compose",
-        "https://www.googleapis.com/auth/gmail.send"
-    ]
+    key = (credentials_path, token_path)
+    cached = _gmail_service_cache.get(key)
+    if cached and _gmail_creds_fresh(cached[0]):
+        return cached[1]
     
-    creds = None
-    
-    # Load existing token
-    if os.path.exists(token_path):
-        creds = Credentials.from_authorized_user_file(token_path, scopes)
-    
-    # If there are no (valid) credentials available, let the user log in
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            try:
-                creds.refresh(Request())
-                logger.info("Gmail credentials refreshed successfully")
-            except Exception as e:
-                logger.warning(f"Failed to refresh credentials: {e}")
-                creds = None
+    with _gmail_auth_lock:
+        # Another caller may have refreshed the token while we waited for the lock
+        cached = _gmail_service_cache.get(key)
+        if cached and _gmail_creds_fresh(cached[0]):
+            return cached[1]
+        
+        scopes = [
+            "https://www.googleapis.com/auth/gmail.compose",
+            "https://www.googleapis.com/auth/gmail.send"
+        ]
         
-        if not creds:
-            if not os.path.exists(credentials_path):
-                raise Exception(
-                    f"Gmail credentials file not found at {credentials_path}. "
-                    "Please download credentials.json from Google Cloud Console."
-                )
+        creds = cached[0] if cached else None
+        
+        # Load existing token
+        if creds is None and os.path.exists(token_path):
+            creds = Credentials.from_authorized_user_file(token_path, scopes)
+        
+        # If there are no (fresh) credentials available, refresh them or let the user log in
+        if not creds or not _gmail_creds_fresh(creds):
+            if creds and creds.refresh_token:
+                try:
+                    creds.refresh(Request())
+                    logger.info("Gmail credentials refreshed successfully")
+                except Exception as e:
+                    logger.warning("Failed to refresh credentials: %s", e)
+                    creds = None
+            else:
+                creds = None
             
-            flow = InstalledAppFlow.from_client_secrets_file(credentials_path, scopes)
-            creds = flow.run_local_server(port=0)
-            logger.info("Gmail authentication completed successfully")
+            if not creds:
+                if not os.path.exists(credentials_path):
+                    raise Exception(
+                        f"Gmail credentials file not found at {credentials_path}. "
+                        "Please download credentials.json from Google Cloud Console."
+                    )
+                
+                flow = InstalledAppFlow.from_client_secrets_file(credentials_path, scopes)
+                creds = flow.run_local_server(port=0)
+                logger.info("Gmail authentication completed successfully")
+            
+            # Save the credentials for the next run
+            _save_gmail_token(token_path, creds.to_json())
         
-        # Save the credentials for the next run
-        os.makedirs(os.path.dirname(token_path), exist_ok=True)
-        with open(token_path, 'w') as token:
-            token.write(creds.to_json())
-            logger.info(f"Gmail token saved to {token_path}")
-    
-    try:
-        service = build('gmail', 'v1', credentials=creds)
-        logger.info("Gmail service initialized successfully")
+        # A service built on these credentials picks up the refreshed token in place
+        if cached and cached[0] is creds:
+            service = cached[1]
+        else:
+            try:
+                # The discovery file cache only supports oauth2client and just logs a warning otherwise
+                service = build('gmail', 'v1', credentials=creds, cache_discovery=False)
+                logger.info("Gmail service initialized successfully")
+            except Exception as e:
+                raise Exception(f"Failed to build Gmail service: {e}")
+        
+        _gmail_service_cache[key] = (creds, service)
         return service
-    except Exception as e:
-        raise Exception(f"Failed to build Gmail service: {e}")
+
+
+def _execute_gmail_request(request: Any) -> Dict[str, Any]:
+    """
+    Execute a Gmail API request on an HTTP connection owned by the current thread.
+    
+    Requests run in worker threads, and the service's own httplib2 connection must not be
+    shared between them, so each thread keeps its own one authorized with the same credentials.
+    
+    Args:
+        request: Gmail API request built from the service (not yet executed)
+        
+    Returns:
+        The API response
+    """
+    return request.execute(http=_thread_gmail_http(request.http.credentials))
+
+
+def _thread_gmail_http(credentials: Credentials) -> AuthorizedHttp:
+    """Get the current thread's HTTP connection authorized with the given credentials."""
+    http = getattr(_gmail_http, 'http', None)
+    if http is None or http.credentials is not credentials:
+        http = AuthorizedHttp(credentials, http=httplib2.Http())
+        _gmail_http.http = http
+    return http
+
+
+def _execute_gmail_batch(batch: Any, credentials: Credentials) -> None:
+    """Execute a Gmail batch request on the current thread's HTTP connection."""
+    batch.execute(http=_thread_gmail_http(credentials))
 
 
 def _create_email_message(to: List[str], subject: str, body: str, cc: Optional[List[str]] = None, bcc: Optional[List[str]] = None) -> dict:
@@ -200,21 +205,20 @@ def _create_email_message(to: List[str], subject: str, body: str, cc: Optional[L
     Returns:
         Encoded message dict
     """
-    message = MIMEMultipart()
-    message['to'] = ', '.join(to)
-    message['subject'] = subject
+    # A single text/plain part; drafts carry no attachments, so no multipart framing is needed
+    message = EmailMessage()
+    message['To'] = ', '.join(to)
+    message['Subject'] = subject
     
     if cc:
-        message['cc'] = ', '.join(cc)
+        message['Cc'] = ', '.join(cc)
     if bcc:
-        message['bcc'] = ', '.join(bcc)
+        message['Bcc'] = ', '.join(bcc)
     
-    # Attach the body
-    body_part = MIMEText(body, 'plain')
-    message.attach(body_part)
+    message.set_content(body)
     
-    # Encode the message
-    raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode()
+    # Encode the message; the output is pure ASCII, so skip UTF-8 decoding
+    raw_message = _b64.urlsafe_b64encode(message.as_bytes()).decode('ascii')
     
     return {'raw': raw_message}
 
@@ -256,26 +260,24 @@ async def create_email_draft_tool(
         raise ValueError("Body is required")
     
     try:
-        # Get Gmail service
-        service = _get_gmail_service(credentials_path, token_path)
+        # Get Gmail service (may read the token file or refresh it, so off the event loop)
+        service = await asyncio.to_thread(_get_gmail_service, credentials_path, token_path)
         
         # Create the message
         message = _create_email_message(to, subject, body, cc, bcc)
         create_message = {"message": message}
         
-        # Create the draft
-        draft = (
-            service.users()
-            .drafts()
-            .create(userId="me", body=create_message)
-            .execute()
+        # Create the draft; the blocking HTTPS call runs in a worker thread
+        draft = await asyncio.to_thread(
+            _execute_gmail_request,
+            service.users().drafts().create(userId="me", body=create_message)
         )
         
         draft_id = draft.get('id')
         message_id = draft.get('message', {}).get('id')
         thread_id = draft.get('message', {}).get('threadId')
         
-        logger.info(f"Gmail draft created successfully: {draft_id}")
+        logger.info("Gmail draft created successfully: %s", draft_id)
         
         return {
             "success": True,
@@ -288,10 +290,10 @@ async def create_email_draft_tool(
         }
         
     except HttpError as e:
-        logger.error(f"Gmail API error creating draft: {e}")
+        logger.error("Gmail API error creating draft: %s", e)
         raise Exception(f"Failed to create draft: {e}")
     except Exception as e:
-        logger.error(f"Unexpected error creating draft: {e}")
+        logger.error("Unexpected error creating draft: %s", e)
         raise Exception(f"Unexpected error: {e}")
 
 async def list_email_drafts_tool(
@@ -314,18 +316,16 @@ async def list_email_drafts_tool(
         Exception: If listing fails
     """
     try:
-        # Get Gmail service
-        service = _get_gmail_service(credentials_path, token_path)
+        # Get Gmail service (may read the token file or refresh it, so off the event loop)
+        service = await asyncio.to_thread(_get_gmail_service, credentials_path, token_path)
         
-        results = (
-            service.users()
-            .drafts()
-            .list(userId="me", maxResults=max_results)
-            .execute()
+        results = await asyncio.to_thread(
+            _execute_gmail_request,
+            service.users().drafts().list(userId="me", maxResults=max_results)
         )
         
         drafts = results.get('drafts', [])
-        logger.info(f"Retrieved {len(drafts)} Gmail drafts")
+        logger.info("Retrieved %d Gmail drafts", len(drafts))
         
         return {
             "success": True,
@@ -334,8 +334,86 @@ async def list_email_drafts_tool(
         }
         
     except HttpError as e:
-        logger.error(f"Gmail API error listing drafts: {e}")
+        logger.error("Gmail API error listing drafts: %s", e)
         raise Exception(f"Failed to list drafts: {e}")
     except Exception as e:
-        logger.error(f"Unexpected error listing drafts: {e}")
-        raise Exception(f"Unexpected error: {e}")
\ No newline at end of file
+        logger.error("Unexpected error listing drafts: %s", e)
+        raise Exception(f"Unexpected error: {e}")
+
+
+async def create_email_drafts_batch_tool(
+    credentials_path: str,
+    token_path: str,
+    drafts: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """
+    Pure function to create several Gmail drafts, GMAIL_BATCH_SIZE per HTTPS round trip.
+    
+    Args:
+        credentials_path: Path to Gmail credentials.json file
+        token_path: Path to store/load Gmail token.json
+        drafts: Drafts to create, each with the arguments of create_email_draft_tool
+            ("to", "subject", "body" and optional "cc"/"bcc")
+        
+    Returns:
+        One result per draft, in the same order; failed drafts have success False and an error
+        
+    Raises:
+        Exception: If the Gmail service cannot be created
+    """
+    results: List[Optional[Dict[str, Any]]] = [None] * len(drafts)
+    requests = []
+    
+    for index, draft in enumerate(drafts):
+        if not draft.get("to"):
+            results[index] = {"success": False, "error": "At least one recipient is required"}
+        elif not (draft.get("subject") or "").strip():
+            results[index] = {"success": False, "error": "Subject is required"}
+        elif not (draft.get("body") or "").strip():
+            results[index] = {"success": False, "error": "Body is required"}
+        else:
+            requests.append(index)
+    
+    if not requests:
+        return results
+    
+    # Get Gmail service (may read the token file or refresh it, so off the event loop)
+    service = await asyncio.to_thread(_get_gmail_service, credentials_path, token_path)
+    
+    def collect(request_id: str, response: Dict[str, Any], exception: Optional[Exception]) -> None:
+        index = int(request_id)
+        draft = drafts[index]
+        if exception is not None:
+            logger.error("Gmail API error creating draft: %s", exception)
+            results[index] = {"success": False, "error": f"Failed to create draft: {exception}"}
+            return
+        
+        results[index] = {
+            "success": True,
+            "draft_id": response.get('id'),
+            "message_id": response.get('message', {}).get('id'),
+            "thread_id": response.get('message', {}).get('threadId'),
+            "created_at": datetime.now().isoformat(),
+            "recipients": draft["to"],
+            "subject": draft["subject"]
+        }
+    
+    for start in range(0, len(requests), GMAIL_BATCH_SIZE):
+        batch = service.new_batch_http_request(callback=collect)
+        for index in requests[start:start + GMAIL_BATCH_SIZE]:
+            draft = drafts[index]
+            message = _create_email_message(draft["to"], draft["subject"], draft["body"], draft.get("cc"), draft.get("bcc"))
+            request = service.users().drafts().create(userId="me", body={"message": message})
+            batch.add(request, request_id=str(index))
+        
+        try:
+            # Callbacks run in the worker thread; each fills in its own slot of results
+            await asyncio.to_thread(_execute_gmail_batch, batch, request.http.credentials)
+        except Exception as e:
+            logger.error("Unexpected error creating draft batch: %s", e)
+            for index in requests[start:start + GMAIL_BATCH_SIZE]:
+                if results[index] is None:
+                    results[index] = {"success": False, "error": f"Unexpected error: {e}"}
+    
+    logger.info("Gmail draft batch finished: %d/%d created", sum(1 for r in results if r['success']), len(drafts))
+    return results
@@ -4,8 +4,15 @@ Simple interface to the handoff research agent.
 This just exposes the research agent that uses output functions for email handoffs.
 """
 
-from .research_agent import research_agent, ResearchAgentDependencies
+from .research_agent import (
+    research_agent, ResearchAgentDependencies, route_request, run_research_agent, direct_email_reply_header
+)
 
 # Export the research agent and dependencies directly
-# The research agent now handles handoffs via output functions automatically
-__all__ = ['research_agent', 'ResearchAgentDependencies']
\ No newline at end of file
+# The research agent now handles handoffs via output functions automatically;
+# route_request/run_research_agent send plain email requests straight to the email agent,
+# whose replies get the direct_email_reply_header heading
+__all__ = [
+    'research_agent', 'ResearchAgentDependencies', 'route_request', 'run_research_agent',
+    'direct_email_reply_header'
+]
\ No newline at end of file
@@ -7,16 +7,16 @@ rather than as a subagent.
 """
 
 from dataclasses import dataclass
-from typing import Optional
+from typing import List, Optional
 from pydantic_ai import Agent, RunContext
 from pydantic_ai.models import KnownModelName
 
 from agents_delegation.providers import get_llm_model
-from agents_delegation.tools import create_email_draft_tool, list_email_drafts_tool
-from agents_delegation.models import EmailDraftResponse
+from agents_delegation.tools import create_email_draft_tool, create_email_drafts_batch_tool, list_email_drafts_tool
+from agents_delegation.models import EmailDraft, EmailDraftResponse
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class EmailAgentDependencies:
     """Dependencies for the email agent."""
     
@@ -30,7 +30,9 @@ email_agent = Agent(
     model=get_llm_model(),
     deps_type=EmailAgentDependencies,
     output_type=str,
-    system_prompt=(
+    # Instructions rather than a system prompt: pydantic_ai only adds a system prompt to an
+    # empty history, and the handed-off history starts with the research agent's prompt
+    instructions=(
         "You are an email drafting specialist. Your role is to create professional, "
         "clear, and well-structured emails based on the provided context and research. "
         "When creating emails:\n"
@@ -85,6 +87,39 @@ async def create_gmail_draft(
         }
 
 
+@email_agent.tool
+async def create_gmail_drafts_batch(
+    ctx: RunContext[EmailAgentDependencies],
+    drafts: List[EmailDraft],
+) -> dict:
+    """
+    Create several Gmail draft emails in one request. Prefer this over repeated create_gmail_draft calls.
+
+    Args:
+        ctx: Runtime context with dependencies
+        drafts: Drafts to create, each with recipients, subject, body and optional CC/BCC
+
+    Returns:
+        dict: One result per draft, in order
+    """
+    try:
+        results = await create_email_drafts_batch_tool(
+            credentials_path=ctx.deps.gmail_credentials_path,
+            token_path=ctx.deps.gmail_token_path,
+            drafts=[draft.model_dump() for draft in drafts],
+        )
+        
+        return {
+            "success": all(result["success"] for result in results),
+            "results": results,
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "error_message": f"Failed to create email drafts: {str(e)}",
+        }
+
+
 @email_agent.tool
 async def list_gmail_drafts(
     ctx: RunContext[EmailAgentDependencies],
@@ -6,13 +6,19 @@ that hands off to the email agent. The handoff is a true handoff - control
 does NOT return to the research agent after the email agent runs.
 """
 
+import re
+import asyncio
 import logging
-from typing import Dict, Any, List, Optional, Union
+from itertools import islice
+from typing import Dict, Any, List, Optional, Tuple, Union
 from dataclasses import dataclass
 
 from pydantic_ai import Agent, RunContext
+from pydantic_ai.agent import AgentRunResult
+from pydantic_ai.messages import ModelMessage
 
 from agents_delegation.providers import get_llm_model
+from agents_delegation.history import trim_history
 from agents_delegation.tools import search_web_tool
 from .email_agent import email_agent, EmailAgentDependencies
 
@@ -29,6 +35,7 @@ Your capabilities:
 
 When conducting research:
 - Use specific, targeted search queries
+- When you need several searches, run them together with search_web_many instead of one search_web call each
 - Analyze search results for relevance and credibility
 - Synthesize information from multiple sources
 - Provide clear, well-organized summaries
@@ -57,8 +64,55 @@ You have access to web search tools to gather information for your responses.
 Always strive to provide accurate, helpful, and actionable information.
 """
 
+# Prompts handed to the email agent, filled in with str.format()
+EMAIL_PROMPT_WITH_RESEARCH = """
+Create a professional email to {recipient_email} with the subject "{subject}".
+
+Context: {context}
+
+Research Summary to Include:
+{research_summary}
+
+Please create a well-structured email that:
+1. Has an appropriate greeting
+2. Provides clear context about why you're writing
+3. Incorporates the research findings professionally
+4. Includes actionable next steps if appropriate
+5. Ends with a professional closing
 
-@dataclass
+The email should be informative but concise, maintaining a professional yet friendly tone.
+"""
+
+EMAIL_PROMPT = """
+Create a professional email to {recipient_email} with the subject "{subject}".
+
+Context: {context}
+
+Please create a well-structured email that addresses the context provided.
+"""
+
+# Most recent conversation messages handed to the email agent, besides the opening request
+MAX_HANDOFF_HISTORY = 10
+
+# Heading of every email agent reply, whether it was handed off or routed directly
+EMAIL_REPLY_HEADER = "📧 **Email Draft Created for {recipient}:**\n\n"
+
+# Prompts that plainly ask for an email to someone go straight to the email agent: an email
+# word plus a recipient address, or "to <recipient>" right after the email verb...
+_EMAIL_WORD_RE = re.compile(r"\b(?:email|e-mail|draft|compose|send)\b", re.IGNORECASE)
+_EMAIL_ADDRESS_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+_EMAIL_TO_RECIPIENT_RE = re.compile(
+    r"\b(?:email|e-mail|draft|compose|send|write)\s+(?:(?:an?|the)\s+(?:email|e-mail|message|note)\s+)?"
+    r"to\s+(?P<recipient>[\w.+-]+(?:@[\w-]+(?:\.[\w-]+)+)?)",
+    re.IGNORECASE
+)
+# ...but not questions about email, which the research agent answers
+_QUESTION_RE = re.compile(r"^\s*(?:how|what|why|when|where|which|who|explain|tell me|is|are|do|does)\b", re.IGNORECASE)
+# ...unless they also need research, which the research agent has to do first
+_RESEARCH_REQUEST_RE = re.compile(r"\b(?:research|search|find|look up|latest|analy[sz]e|summari[sz]e)", re.IGNORECASE)
+
+
+@dataclass(slots=True, frozen=True)
 class ResearchAgentDependencies:
     """Dependencies for the research agent - only configuration, no tool instances."""
     brave_api_key: str
@@ -67,6 +121,25 @@ class ResearchAgentDependencies:
     session_id: Optional[str] = None
 
 
+def _handoff_history(messages: List[ModelMessage], end: Optional[int] = None) -> List[ModelMessage]:
+    """
+    Select the conversation context handed to the email agent.
+    
+    By default the last message (the response calling email_handoff) is left out; see
+    trim_history for what is kept of the rest.
+    
+    Args:
+        messages: Messages of the research agent run so far
+        end: Number of leading messages to consider (defaults to all but the last)
+    
+    Returns:
+        Message history for the email agent
+    """
+    if end is None:
+        end = len(messages) - 1
+    return trim_history(messages, MAX_HANDOFF_HISTORY, end)
+
+
 # Email handoff output function - TRUE handoff, control does NOT return
 async def email_handoff(
     ctx: RunContext[ResearchAgentDependencies],
@@ -93,35 +166,16 @@ async def email_handoff(
         str: The final response from the email agent (this ends the conversation)
     """
     try:
-        logger.info(f"🔄 Email handoff initiated for {recipient_email}")
+        logger.info("🔄 Email handoff initiated for %s", recipient_email)
         
         # Prepare comprehensive prompt for email agent
-        if research_summary:
-            email_prompt = f"""
-Create a professional email to {recipient_email} with the subject "{subject}".
-
-Context: {context}
-
-Research Summary to Include:
-{research_summary}
-
-Please create a well-structured email that:
-1. Has an appropriate greeting
-2. Provides clear context about why you're writing
-3. Incorporates the research findings professionally
-4. Includes actionable next steps if appropriate
-5. Ends with a professional closing
-
-The email should be informative but concise, maintaining a professional yet friendly tone.
-"""
-        else:
-            email_prompt = f"""
-Create a professional email to {recipient_email} with the subject "{subject}".
-
-Context: {context}
-
-Please create a well-structured email that addresses the context provided.
-"""
+        template = EMAIL_PROMPT_WITH_RESEARCH if research_summary else EMAIL_PROMPT
+        email_prompt = template.format(
+            recipient_email=recipient_email,
+            subject=subject,
+            context=context,
+            research_summary=research_summary
+        )
         
         # Create email agent dependencies
         email_deps = EmailAgentDependencies(
@@ -130,22 +184,26 @@ Please create a well-structured email that addresses the context provided.
             session_id=ctx.deps.session_id
         )
         
+        # Pass recent conversation context
+        message_history = _handoff_history(ctx.messages)
+        logger.debug("Handing off %d of %d messages", len(message_history), len(ctx.messages))
+        
         logger.info("📧 Handing off to email agent...")
         
         # HANDOFF: Email agent takes over completely
         result = await email_agent.run(
             email_prompt,
             deps=email_deps,
-            message_history=ctx.messages[:-1]  # Pass conversation context
+            message_history=message_history
         )
         
-        logger.info(f"✅ Email handoff completed successfully for {recipient_email}")
+        logger.info("✅ Email handoff completed successfully for %s", recipient_email)
         
         # The email agent's response becomes the final response
-        return f"📧 **Email Draft Created for {recipient_email}:**\n\n{result.output}"
+        return EMAIL_REPLY_HEADER.format(recipient=recipient_email) + result.output
         
     except Exception as e:
-        logger.error(f"❌ Email handoff failed: {e}")
+        logger.error("❌ Email handoff failed: %s", e)
         return f"❌ Failed to create email for {recipient_email}: {str(e)}"
 
 
@@ -158,6 +216,91 @@ research_agent = Agent(
 )
 
 
+def is_direct_email_request(prompt: str) -> bool:
+    """Check whether a prompt only asks for an email to someone, so no research is needed first."""
+    if _QUESTION_RE.match(prompt) or _RESEARCH_REQUEST_RE.search(prompt):
+        return False
+    if _EMAIL_TO_RECIPIENT_RE.search(prompt):
+        return True
+    return bool(_EMAIL_ADDRESS_RE.search(prompt)) and bool(_EMAIL_WORD_RE.search(prompt))
+
+
+def direct_email_reply_header(prompt: str) -> str:
+    """
+    Heading for the reply to a direct email request, matching the one email_handoff adds.
+    
+    Args:
+        prompt: User prompt routed straight to the email agent
+    
+    Returns:
+        The reply heading, naming the recipient's address (or the name after "to")
+    """
+    address = _EMAIL_ADDRESS_RE.search(prompt)
+    if address:
+        recipient = address.group()
+    else:
+        match = _EMAIL_TO_RECIPIENT_RE.search(prompt)
+        recipient = match.group("recipient") if match else "recipient"
+    return EMAIL_REPLY_HEADER.format(recipient=recipient)
+
+
+def route_request(
+    prompt: str,
+    deps: ResearchAgentDependencies,
+    message_history: Optional[List[ModelMessage]] = None
+) -> Tuple[Agent, Any, Optional[List[ModelMessage]]]:
+    """
+    Pick the agent for a prompt.
+    
+    Plain email requests skip the research agent's decide-then-hand-off round trip and go to
+    the email agent directly; everything else goes to the research agent, which can still hand
+    off to the email agent itself.
+    
+    Args:
+        prompt: User prompt
+        deps: Research agent dependencies
+        message_history: Conversation so far
+    
+    Returns:
+        Tuple of (agent, its dependencies, message history to run it with)
+    """
+    if not is_direct_email_request(prompt):
+        return research_agent, deps, message_history
+    
+    logger.info("📧 Routing email request directly to email agent")
+    email_deps = EmailAgentDependencies(
+        gmail_credentials_path=deps.gmail_credentials_path,
+        gmail_token_path=deps.gmail_token_path,
+        session_id=deps.session_id
+    )
+    history = _handoff_history(message_history, len(message_history)) if message_history else None
+    return email_agent, email_deps, history
+
+
+async def run_research_agent(
+    prompt: str,
+    deps: ResearchAgentDependencies,
+    message_history: Optional[List[ModelMessage]] = None
+) -> AgentRunResult[str]:
+    """
+    Run a prompt through the agent chosen by route_request.
+    
+    Args:
+        prompt: User prompt
+        deps: Research agent dependencies
+        message_history: Conversation so far
+    
+    Returns:
+        Result of the agent run
+    """
+    agent, agent_deps, history = route_request(prompt, deps, message_history)
+    result = await agent.run(prompt, deps=agent_deps, message_history=history)
+    if agent is email_agent:
+        # Same heading as an email_handoff reply
+        result.output = direct_email_reply_header(prompt) + result.output
+    return result
+
+
 # Tools for the research agent (web search and research summarization)
 # Note: NO email tools here - email creation is handled via output function handoff
 
@@ -187,14 +330,51 @@ async def search_web(
             count=max_results
         )
         
-        logger.info(f"Found {len(results)} results for query: {query}")
+        logger.info("Found %d results for query: %s", len(results), query)
         return results
         
     except Exception as e:
-        logger.error(f"Web search failed: {e}")
+        logger.error("Web search failed: %s", e)
         return [{"error": f"Search failed: {str(e)}"}]
 
 
+@research_agent.tool
+async def search_web_many(
+    ctx: RunContext[ResearchAgentDependencies],
+    queries: List[str],
+    max_results: int = 10
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Search the web for several queries at once using Brave Search API.
+    
+    Args:
+        queries: Search queries to run in parallel
+        max_results: Maximum number of results to return per query (1-20)
+    
+    Returns:
+        Search results for each query, keyed by query
+    """
+    # Ensure max_results is within valid range
+    max_results = min(max(max_results, 1), 20)
+    
+    # The searches share one pooled HTTP/2 connection, so they run concurrently
+    queries = list(dict.fromkeys(queries))
+    outcomes = await asyncio.gather(
+        *(search_web_tool(api_key=ctx.deps.brave_api_key, query=query, count=max_results) for query in queries),
+        return_exceptions=True
+    )
+    
+    results = {}
+    for query, outcome in zip(queries, outcomes):
+        if isinstance(outcome, Exception):
+            logger.error("Web search failed for query %s: %s", query, outcome)
+            results[query] = [{"error": f"Search failed: {str(outcome)}"}]
+        else:
+            logger.info("Found %d results for query: %s", len(outcome), query)
+            results[query] = outcome
+    return results
+
+
 @research_agent.tool
 async def summarize_research(
     ctx: RunContext[ResearchAgentDependencies],
@@ -221,19 +401,13 @@ async def summarize_research(
                 "sources": []
             }
         
-        # Extract key information
-        sources = []
-        descriptions = []
-        
-        for result in search_results:
-            if "title" in result and "url" in result:
-                sources.append(f"- {result['title']}: {result['url']}")
-                if "description" in result:
-                    descriptions.append(result["description"])
+        # Extract key information; only the first 5 descriptions and 10 sources are used
+        sources = [result for result in search_results if "title" in result and "url" in result]
+        descriptions = list(islice((result["description"] for result in sources if "description" in result), 5))
         
         # Create summary content
-        content_summary = "\n".join(descriptions[:5])  # Limit to top 5 descriptions
-        sources_list = "\n".join(sources[:10])  # Limit to top 10 sources
+        content_summary = "\n".join(descriptions)
+        sources_list = "\n".join(f"- {result['title']}: {result['url']}" for result in sources[:10])
         
         focus_text = f"\nSpecific focus areas: {focus_areas}" if focus_areas else ""
         
@@ -251,11 +425,11 @@ Sources:
             "summary": summary,
             "topic": topic,
             "sources_count": len(sources),
-            "key_points": descriptions[:5]
+            "key_points": descriptions
         }
         
     except Exception as e:
-        logger.error(f"Failed to summarize research: {e}")
+        logger.error("Failed to summarize research: %s", e)
         return {
             "summary": f"Failed to summarize research: {str(e)}",
             "key_points": [],
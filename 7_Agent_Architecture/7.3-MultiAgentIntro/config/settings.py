@@ -3,14 +3,13 @@ Configuration management using pydantic-settings.
 """
 
 import os
+import logging
+from functools import cached_property, lru_cache
 from typing import Optional
 from pydantic_settings import BaseSettings
 from pydantic import Field, field_validator, ConfigDict
 from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
-
 
 class Settings(BaseSettings):
     """Application settings with environment variable support."""
@@ -52,6 +51,8 @@ class Settings(BaseSettings):
     app_env: str = Field(default="development")
     log_level: str = Field(default="INFO")
     debug: bool = Field(default=False)
+    # Messages of a chat session kept as history (besides the opening request)
+    max_chat_messages: int = Field(default=40)
     
     @field_validator("llm_api_key", "brave_api_key")
     @classmethod
@@ -66,20 +67,33 @@ class Settings(BaseSettings):
     def validate_gmail_credentials(cls, v):
         """Check if Gmail credentials file exists."""
         if not os.path.exists(v):
-            # Create credentials directory if it doesn't exist
-            os.makedirs(os.path.dirname(v), exist_ok=True)
-            # Note: The actual credentials.json needs to be obtained from Google Cloud Console
+            # Note: The actual credentials.json needs to be obtained from Google Cloud Console;
+            # the credentials directory is created when the Gmail token is first saved
             print(f"Warning: Gmail credentials file not found at {v}")
             print("Please download credentials.json from Google Cloud Console")
         return v
+    
+    @cached_property
+    def log_level_int(self) -> int:
+        """Numeric logging level for log_level (INFO if the name is unknown)."""
+        return getattr(logging, self.log_level.upper(), logging.INFO)
 
 
-# Global settings instance
-try:
-    settings = Settings()
-except Exception:
-    # For testing, create settings with dummy values
-    import os
-    os.environ.setdefault("LLM_API_KEY", "test_key")
-    os.environ.setdefault("BRAVE_API_KEY", "test_key")
-    settings = Settings()
\ No newline at end of file
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Get the application settings, loading the .env file on first use.
+    
+    Returns:
+        The settings instance shared by the whole application
+    """
+    # Load environment variables from .env file
+    load_dotenv()
+    
+    try:
+        return Settings()
+    except Exception:
+        # For testing, create settings with dummy values
+        os.environ.setdefault("LLM_API_KEY", "test_key")
+        os.environ.setdefault("BRAVE_API_KEY", "test_key")
+        return Settings()
@@ -7,88 +7,165 @@ Streams both regular responses and email handoffs seamlessly.
 
 import streamlit as st
 import asyncio
-import uuid
+import time
+import secrets
 import logging
 from typing import Optional
 
 from pydantic_ai.messages import ModelRequest, ModelResponse, PartDeltaEvent, PartStartEvent, TextPartDelta
 
-from agents_handoff.cli_interface import research_agent, ResearchAgentDependencies
+from agents_handoff.cli_interface import ResearchAgentDependencies, research_agent, route_request, direct_email_reply_header
+from agents_delegation.brave_client import close_brave_client
+from agents_delegation.history import trim_history
 from agents_delegation.providers import validate_llm_configuration, get_model_info
-from config.settings import settings
+from config.settings import get_settings
 
-# Setup logging
-logging.basicConfig(level=getattr(logging, settings.log_level.upper()))
+settings = get_settings()
+
+# Setup logging (once per process; Streamlit re-executes this script on every rerun)
+if not logging.getLogger().handlers:
+    logging.basicConfig(level=settings.log_level_int)
 logger = logging.getLogger(__name__)
 
+# Streamed text is rendered in batches: once this many characters are pending...
+STREAM_FLUSH_CHARS = 64
+# ...or this many seconds have passed since the last render
+STREAM_FLUSH_INTERVAL = 0.025
+
+# Chat role each displayed message part kind is shown as (user prompts and AI text);
+# other parts (system prompts, tool calls, tool returns) are not displayed
+_CHAT_ROLES = {'user-prompt': 'user', 'text': 'assistant'}
+
+# Capabilities banner shown above the chat
+_CAPABILITIES_MD = """
+**Capabilities:**
+- 🌐 Web research using Brave Search
+- 📧 **Automatic email handoffs** - Agent decides when to create emails
+- 🤖 Multi-agent collaboration with structured outputs
+- 🔄 Seamless handoffs between research and email agents
+"""
+
+
+@st.cache_resource
+def _cached_model_info() -> dict:
+    """Model configuration info, computed once per process instead of on every rerun."""
+    return get_model_info()
+
+
+@st.cache_resource
+def _cached_validate_llm() -> bool:
+    """LLM configuration check (builds a model), run once per process instead of on every rerun."""
+    return validate_llm_configuration()
+
+
+def _session_agent_deps() -> ResearchAgentDependencies:
+    """Agent dependencies for this chat session, created on its first message and reused after."""
+    if 'agent_deps' not in st.session_state:
+        st.session_state.agent_deps = ResearchAgentDependencies(
+            brave_api_key=settings.brave_api_key,
+            gmail_credentials_path=settings.gmail_credentials_path,
+            gmail_token_path=settings.gmail_token_path,
+            session_id=st.session_state.session_id
+        )
+    return st.session_state.agent_deps
+
+
 def display_message_part(part):
     """
     Display a single part of a message in the Streamlit UI.
     Customize how you display system prompts, user prompts,
     tool calls, tool returns, etc.
     """
-    # User messages
-    if part.part_kind == 'user-prompt' and part.content:
-        with st.chat_message("user"):
-            st.markdown(part.content)
-    # AI messages
-    elif part.part_kind == 'text' and part.content:
-        with st.chat_message("assistant"):
+    role = _CHAT_ROLES.get(part.part_kind)
+    if role and part.content:
+        with st.chat_message(role):
             st.markdown(part.content)             
 
+def _persist_messages(result) -> None:
+    """Add the new messages of a finished run to the chat history."""
+    get_new_messages = getattr(result, 'new_messages', None)
+    if get_new_messages is not None:
+        new_messages = get_new_messages()
+        if new_messages:
+            # Keep the session history bounded so every turn doesn't resend (and re-render) all of it
+            st.session_state.messages = trim_history(
+                st.session_state.messages + new_messages, settings.max_chat_messages
+            )
+
 async def run_agent_with_streaming(user_input, placeholder):
-    """Run the agent with streaming output - works for both regular responses and handoffs."""
+    """
+    Run the agent with streaming output - works for both regular responses and handoffs.
+    
+    The placeholder is written once per flushed batch and the final text is rendered exactly
+    once: by the last flush, or from the run's output when no text was streamed.
+    
+    Returns:
+        The response text (already displayed)
+    """
     # Initialize session_id
     if 'session_id' not in st.session_state:
-        st.session_state.session_id = str(uuid.uuid4())
+        st.session_state.session_id = secrets.token_hex(8)
     
     try:
-        # Create dependencies
-        agent_deps = ResearchAgentDependencies(
-            brave_api_key=settings.brave_api_key,
-            gmail_credentials_path=settings.gmail_credentials_path,
-            gmail_token_path=settings.gmail_token_path,
-            session_id=st.session_state.session_id
-        )
+        # Dependencies of this session
+        agent_deps = _session_agent_deps()
         
-        logger.info(f"Starting streaming for: {user_input}")
+        logger.info("Starting streaming for: %s", user_input)
+        
+        # Plain email requests go straight to the email agent
+        agent, run_deps, message_history = route_request(user_input, agent_deps, st.session_state.messages)
         
         # Stream the agent response (tools work much better for streaming!)
+        # Deltas are kept in a list and joined only when rendered; a direct email reply
+        # starts with the same heading as one handed off by the research agent
+        chunks = [] if agent is research_agent else [direct_email_reply_header(user_input)]
         accumulated_text = ""
-        async with research_agent.iter(
+        pending_chars = 0
+        last_flush = time.monotonic()
+        async with agent.iter(
             user_input, 
-            deps=agent_deps, 
-            message_history=st.session_state.messages
+            deps=run_deps, 
+            message_history=message_history
         ) as run:
             async for event in run:
-                if isinstance(event, PartStartEvent):
-                    logger.debug(f"Part started: {event.part_kind}")
-                elif isinstance(event, PartDeltaEvent):
-                    if isinstance(event.delta, TextPartDelta):
-                        accumulated_text += event.delta.content
-                        placeholder.markdown(accumulated_text)
+                # Exact type checks (the event classes are not subclassed), most frequent first
+                event_type = type(event)
+                if event_type is PartDeltaEvent:
+                    if type(event.delta) is TextPartDelta:
+                        chunks.append(event.delta.content_delta)
+                        pending_chars += len(event.delta.content_delta)
+                        now = time.monotonic()
+                        if pending_chars >= STREAM_FLUSH_CHARS or now - last_flush >= STREAM_FLUSH_INTERVAL:
+                            accumulated_text = "".join(chunks)
+                            pending_chars = 0
+                            last_flush = now
+                            placeholder.markdown(accumulated_text)
+                elif event_type is PartStartEvent:
+                    logger.debug("Part started: %s", event.part_kind)
         
-        # Get final result and update message history
-        result = run.result
-        if hasattr(result, 'new_messages') and callable(result.new_messages):
-            new_messages = result.new_messages()
-            if new_messages:
-                st.session_state.messages.extend(new_messages)
+        # Render whatever is still pending
+        if pending_chars:
+            accumulated_text = "".join(chunks)
+            placeholder.markdown(accumulated_text)
         
-        logger.info("Streaming completed")
-        
-        # Return accumulated text if we got any, otherwise the final result
+        # Use accumulated text if we got any, otherwise show the final result
+        result = run.result
         if accumulated_text:
-            return accumulated_text
+            response = accumulated_text
         elif hasattr(result, 'output'):
-            final_response = str(result.output)
-            placeholder.markdown(final_response)
-            return final_response
+            response = "".join(chunks) + str(result.output)
+            placeholder.markdown(response)
         else:
-            return "No response"
+            response = "No response"
+        
+        # The reply is on screen before the history is updated
+        _persist_messages(result)
+        
+        logger.info("Streaming completed")
+        return response
         
     except Exception as e:
-        logger.error(f"Streaming error: {e}")
+        logger.error("Streaming error: %s", e)
         error_msg = f"❌ Error: {e}"
         placeholder.markdown(error_msg)
         return error_msg       
@@ -105,7 +182,7 @@ async def main():
     st.title("🔬 Multi-Agent Research & Email System (with Handoffs)")
     
     # Show configuration info
-    config_info = get_model_info()
+    config_info = _cached_model_info()
     st.sidebar.header("Configuration")
     st.sidebar.info(f"**LLM:** {config_info['llm_provider']}/{config_info['llm_model']}")
     
@@ -113,27 +190,21 @@ async def main():
     if 'messages' not in st.session_state:
         st.session_state.messages = []
     if 'session_id' not in st.session_state:
-        st.session_state.session_id = str(uuid.uuid4())
+        st.session_state.session_id = secrets.token_hex(8)
     
     st.sidebar.info(f"**Session ID:** {st.session_state.session_id[:8]}...")
     
     # Validate configuration
-    if not validate_llm_configuration():
+    if not _cached_validate_llm():
         st.error("❌ LLM configuration invalid. Please check your .env file.")
         return
     
     # Display capabilities
-    st.markdown("""
-    **Capabilities:**
-    - 🌐 Web research using Brave Search
-    - 📧 **Automatic email handoffs** - Agent decides when to create emails
-    - 🤖 Multi-agent collaboration with structured outputs
-    - 🔄 Seamless handoffs between research and email agents
-    """)
+    st.markdown(_CAPABILITIES_MD)
 
     # Display all messages from the conversation so far
     for msg in st.session_state.messages:
-        if isinstance(msg, ModelRequest) or isinstance(msg, ModelResponse):
+        if isinstance(msg, (ModelRequest, ModelResponse)):
             for part in msg.parts:
                 display_message_part(part)
 
@@ -150,8 +221,12 @@ async def main():
             # Create a placeholder for streaming content
             placeholder = st.empty()
             
-            # Stream the response (handles both regular responses and handoffs)
-            response = await run_agent_with_streaming(user_input, placeholder)
+            # Stream the response (handles both regular responses and handoffs); it renders
+            # its own final state into the placeholder, so nothing is re-rendered here
+            await run_agent_with_streaming(user_input, placeholder)
+    
+    # Close the shared Brave client while this rerun's event loop is still running
+    await close_brave_client()
 
 
 if __name__ == "__main__":
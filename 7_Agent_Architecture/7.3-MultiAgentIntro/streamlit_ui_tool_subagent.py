@@ -8,51 +8,114 @@ import streamlit as st
 import asyncio
 import sys
 import os
-import uuid
+import time
+import secrets
 import logging
-from typing import Optional
+from typing import AsyncIterator, Optional
 
 from pydantic_ai import Agent
 from httpx import AsyncClient
 from pydantic_ai.messages import ModelRequest, ModelResponse, PartDeltaEvent, PartStartEvent, TextPartDelta
 
 from agents_delegation.research_agent import research_agent, ResearchAgentDependencies
+from agents_delegation.brave_client import close_brave_client
+from agents_delegation.history import trim_history
 from agents_delegation.providers import validate_llm_configuration, get_model_info
-from config.settings import settings
+from config.settings import get_settings
 
-# Setup logging
-logging.basicConfig(level=getattr(logging, settings.log_level.upper()))
+settings = get_settings()
+
+# Setup logging (once per process; Streamlit re-executes this script on every rerun)
+if not logging.getLogger().handlers:
+    logging.basicConfig(level=settings.log_level_int)
 logger = logging.getLogger(__name__)
 
+# Streamed text is yielded in batches: once this many characters are pending...
+STREAM_FLUSH_CHARS = 64
+# ...or this many seconds have passed since the last batch
+STREAM_FLUSH_INTERVAL = 0.025
+
+# Chat role each displayed message part kind is shown as (user prompts and AI text);
+# other parts (system prompts, tool calls, tool returns) are not displayed
+_CHAT_ROLES = {'user-prompt': 'user', 'text': 'assistant'}
+
+# Capabilities banner shown above the chat
+_CAPABILITIES_MD = """
+**Capabilities:**
+- 🌐 Web research using Brave Search
+- 📧 Email draft creation via Gmail API
+- 📝 Direct text responses
+"""
+
+
+@st.cache_resource
+def _cached_model_info() -> dict:
+    """Model configuration info, computed once per process instead of on every rerun."""
+    return get_model_info()
+
+
+@st.cache_resource
+def _cached_validate_llm() -> bool:
+    """LLM configuration check (builds a model), run once per process instead of on every rerun."""
+    return validate_llm_configuration()
+
+
+def _session_agent_deps() -> ResearchAgentDependencies:
+    """Agent dependencies for this chat session, created on its first message and reused after."""
+    if 'agent_deps' not in st.session_state:
+        st.session_state.agent_deps = ResearchAgentDependencies(
+            brave_api_key=settings.brave_api_key,
+            gmail_credentials_path=settings.gmail_credentials_path,
+            gmail_token_path=settings.gmail_token_path,
+            session_id=st.session_state.session_id
+        )
+    return st.session_state.agent_deps
+
+
 def display_message_part(part):
     """
     Display a single part of a message in the Streamlit UI.
     Customize how you display system prompts, user prompts,
     tool calls, tool returns, etc.
     """
-    # User messages
-    if part.part_kind == 'user-prompt' and part.content:
-        with st.chat_message("user"):
-            st.markdown(part.content)
-    # AI messages
-    elif part.part_kind == 'text' and part.content:
-        with st.chat_message("assistant"):
+    role = _CHAT_ROLES.get(part.part_kind)
+    if role and part.content:
+        with st.chat_message(role):
             st.markdown(part.content)             
 
+async def _batched(stream: AsyncIterator[str]) -> AsyncIterator[str]:
+    """
+    Re-yield streamed text in batches, so the UI isn't re-rendered for every token.
+    
+    A batch is yielded once STREAM_FLUSH_CHARS characters are pending or STREAM_FLUSH_INTERVAL
+    seconds have passed since the last one; whatever is left is yielded at the end.
+    """
+    pending = []
+    pending_chars = 0
+    last_flush = time.monotonic()
+    
+    async for text in stream:
+        pending.append(text)
+        pending_chars += len(text)
+        now = time.monotonic()
+        if pending_chars >= STREAM_FLUSH_CHARS or now - last_flush >= STREAM_FLUSH_INTERVAL:
+            yield "".join(pending)
+            pending.clear()
+            pending_chars = 0
+            last_flush = now
+    
+    if pending:
+        yield "".join(pending)
+
 async def run_agent_with_streaming(user_input):
     """Run the original research agent with streaming capabilities."""
     # Initialize session_id if not present
     if 'session_id' not in st.session_state:
-        st.session_state.session_id = str(uuid.uuid4())
+        st.session_state.session_id = secrets.token_hex(8)
     
     try:
-        # Create agent dependencies using configuration
-        agent_deps = ResearchAgentDependencies(
-            brave_api_key=settings.brave_api_key,
-            gmail_credentials_path=settings.gmail_credentials_path,
-            gmail_token_path=settings.gmail_token_path,
-            session_id=st.session_state.session_id
-        )
+        # Dependencies of this session
+        agent_deps = _session_agent_deps()
         
         # Use .iter() method for streaming
         async with research_agent.iter(user_input, deps=agent_deps, message_history=st.session_state.messages) as run:
@@ -62,24 +125,31 @@ async def run_agent_with_streaming(user_input):
                     async with node.stream(run.ctx) as request_stream:
                         async for event in request_stream:
                             if isinstance(event, PartStartEvent) and event.part.part_kind == 'text':
-                                yield event.part.content
+                                delta = event.part.content
                             elif isinstance(event, PartDeltaEvent) and isinstance(event.delta, TextPartDelta):
                                 delta = event.delta.content_delta
-                                yield delta
+                            else:
+                                continue
+                            
+                            yield delta
         
         # Add the new messages to the chat history (including tool calls and responses)
-        if hasattr(run, 'result') and run.result and hasattr(run.result, 'new_messages'):
+        get_new_messages = getattr(getattr(run, 'result', None), 'new_messages', None)
+        if get_new_messages is not None:
             try:
-                new_messages = run.result.new_messages()
+                new_messages = get_new_messages()
                 if new_messages:
-                    st.session_state.messages.extend(new_messages)
+                    # Keep the session history bounded so every turn doesn't resend (and re-render) all of it
+                    st.session_state.messages = trim_history(
+                        st.session_state.messages + new_messages, settings.max_chat_messages
+                    )
             except Exception as e:
-                logger.error(f"Error getting new messages: {e}")
+                logger.error("Error getting new messages: %s", e)
         else:
             logger.warning("No result or new_messages method available")
             
     except Exception as e:
-        logger.error(f"Agent error: {e}")
+        logger.error("Agent error: %s", e)
         yield f"❌ Error: {e}"       
 
 async def main():
@@ -87,7 +157,7 @@ async def main():
     st.title("🔬 Original Research Agent")
     
     # Show configuration info
-    config_info = get_model_info()
+    config_info = _cached_model_info()
     st.sidebar.header("Configuration")
     st.sidebar.info(f"**LLM:** {config_info['llm_provider']}/{config_info['llm_model']}")
     
@@ -95,26 +165,21 @@ async def main():
     if 'messages' not in st.session_state:
         st.session_state.messages = []
     if 'session_id' not in st.session_state:
-        st.session_state.session_id = str(uuid.uuid4())
+        st.session_state.session_id = secrets.token_hex(8)
     
     st.sidebar.info(f"**Session ID:** {st.session_state.session_id[:8]}...")
     
     # Validate configuration
-    if not validate_llm_configuration():
+    if not _cached_validate_llm():
         st.error("❌ LLM configuration invalid. Please check your .env file.")
         return
     
     # Display capabilities
-    st.markdown("""
-    **Capabilities:**
-    - 🌐 Web research using Brave Search
-    - 📧 Email draft creation via Gmail API
-    - 📝 Direct text responses
-    """)
+    st.markdown(_CAPABILITIES_MD)
 
     # Display all messages from the conversation so far
     for msg in st.session_state.messages:
-        if isinstance(msg, ModelRequest) or isinstance(msg, ModelResponse):
+        if isinstance(msg, (ModelRequest, ModelResponse)):
             for part in msg.parts:
                 display_message_part(part)
 
@@ -130,16 +195,18 @@ async def main():
         with st.chat_message("assistant"):
             # Create a placeholder for the streaming text
             message_placeholder = st.empty()
-            full_response = ""
+            chunks = []
             
-            # Properly consume the async generator with async for
-            generator = run_agent_with_streaming(user_input)
-            async for message in generator:
-                full_response += message
-                message_placeholder.markdown(full_response + "▌")
+            # Consume the streamed text in batches, re-rendering once per batch
+            async for chunk in _batched(run_agent_with_streaming(user_input)):
+                chunks.append(chunk)
+                message_placeholder.markdown("".join(chunks) + "▌")
             
             # Final response without the cursor
-            message_placeholder.markdown(full_response)
+            message_placeholder.markdown("".join(chunks))
+    
+    # Close the shared Brave client while this rerun's event loop is still running
+    await close_brave_client()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,83 @@
+"""
+Shared fixtures for the tool tests.
+"""
+
+import sys
+import json
+from pathlib import Path
+from typing import Any, Optional
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+# Make the project packages importable from the tests (once per session)
+_PROJECT_ROOT = str(Path(__file__).resolve().parent.parent)
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
+
+
+def build_gmail_service_mock() -> MagicMock:
+    """
+    Build a Gmail service mock with the users().drafts() chain already wired.
+    
+    The chain is set up through return_value attributes, so tests configure
+    create/list results on gmail_drafts without calling through the mock.
+    """
+    service = MagicMock()
+    service.users.return_value.drafts.return_value = MagicMock()
+    return service
+
+
+@pytest.fixture
+def gmail_service(monkeypatch):
+    """Gmail service mock returned by agents_delegation.tools._get_gmail_service."""
+    service = build_gmail_service_mock()
+    monkeypatch.setattr('agents_delegation.tools._get_gmail_service', lambda *args, **kwargs: service)
+    return service
+
+
+@pytest.fixture
+def gmail_drafts(gmail_service):
+    """The drafts resource of the Gmail service mock."""
+    return gmail_service.users.return_value.drafts.return_value
+
+
+@pytest.fixture
+def brave_client(monkeypatch):
+    """Brave HTTP client mock returned by agents_delegation.brave_client._get_brave_client; get is an AsyncMock."""
+    client = MagicMock()
+    client.get = AsyncMock()
+    monkeypatch.setattr('agents_delegation.brave_client._get_brave_client', AsyncMock(return_value=client))
+    return client
+
+
+@pytest.fixture
+def brave_response():
+    """Factory for Brave API responses: brave_response(status_code, body=None, text="")."""
+    def make_response(status_code: int, body: Optional[Any] = None, text: str = "") -> MagicMock:
+        response = MagicMock()
+        response.status_code = status_code
+        response.content = json.dumps(body if body is not None else {}).encode()
+        response.text = text
+        return response
+    
+    return make_response
+
+
+class FakeAsyncContextManager:
+    """Async context manager standing in for agent.iter(); yields the given run."""
+    
+    def __init__(self, run: Any):
+        self.run = run
+    
+    async def __aenter__(self) -> Any:
+        return self.run
+    
+    async def __aexit__(self, *exc_info) -> None:
+        return None
+
+
+@pytest.fixture
+def fake_async_context_manager():
+    """The FakeAsyncContextManager class, for tests that patch an agent's iter()."""
+    return FakeAsyncContextManager
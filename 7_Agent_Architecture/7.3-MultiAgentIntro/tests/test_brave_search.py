@@ -2,18 +2,25 @@
 Tests for Brave Search Tool.
 """
 
+import asyncio
 import pytest
-from unittest.mock import AsyncMock, patch, MagicMock
 import httpx
 
-from agents.tools import search_web_tool
-from agents.models import BraveSearchResult
+from agents_delegation.brave_client import search_web_tool, _search_cache, _get_brave_client, close_brave_client
+from agents_delegation.models import BraveSearchResult
+
+
+@pytest.fixture(autouse=True)
+def clear_search_cache():
+    """Start every test without cached search results."""
+    _search_cache.clear()
+    yield
+    _search_cache.clear()
 
 
 class TestBraveSearchTool:
     """Tests for Brave Search pure function."""
     
-    @pytest.mark.asyncio
     async def test_search_empty_query_raises_error(self):
         """Test search with empty query raises error."""
         with pytest.raises(ValueError, match="Query cannot be empty"):
@@ -22,7 +29,6 @@ class TestBraveSearchTool:
         with pytest.raises(ValueError, match="Query cannot be empty"):
             await search_web_tool(api_key="test_key", query="   ")
     
-    @pytest.mark.asyncio
     async def test_search_empty_api_key_raises_error(self):
         """Test search with empty API key raises error."""
         with pytest.raises(ValueError, match="Brave API key is required"):
@@ -31,8 +37,7 @@ class TestBraveSearchTool:
         with pytest.raises(ValueError, match="Brave API key is required"):
             await search_web_tool(api_key=None, query="test query")
     
-    @pytest.mark.asyncio
-    async def test_search_success(self):
+    async def test_search_success(self, brave_client, brave_response):
         """Test successful search."""
         # Mock response data
         mock_response_data = {
@@ -51,18 +56,9 @@ class TestBraveSearchTool:
                 ]
             }
         }
+        brave_client.get.return_value = brave_response(200, mock_response_data)
         
-        # Mock httpx client
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = mock_response_data
-        
-        with patch('httpx.AsyncClient') as mock_client:
-            mock_context_manager = AsyncMock()
-            mock_context_manager.__aenter__.return_value.get = AsyncMock(return_value=mock_response)
-            mock_client.return_value = mock_context_manager
-            
-            results = await search_web_tool(api_key="test_key", query="test query", count=2)
+        results = await search_web_tool(api_key="test_key", query="test query", count=2)
         
         assert len(results) == 2
         assert results[0]["title"] == "Test Result 1"
@@ -73,89 +69,66 @@ class TestBraveSearchTool:
         assert results[1]["title"] == "Test Result 2"
         assert results[1]["score"] == 0.95  # Second result gets slightly lower score
     
-    @pytest.mark.asyncio
-    async def test_search_rate_limit_error(self):
+    async def test_search_rate_limit_error(self, brave_client, brave_response):
         """Test search with rate limit error."""
-        mock_response = MagicMock()
-        mock_response.status_code = 429
+        brave_client.get.return_value = brave_response(429)
         
-        with patch('httpx.AsyncClient') as mock_client:
-            mock_context_manager = AsyncMock()
-            mock_context_manager.__aenter__.return_value.get = AsyncMock(return_value=mock_response)
-            mock_client.return_value = mock_context_manager
-            
-            with pytest.raises(Exception, match="Rate limit exceeded"):
-                await search_web_tool(api_key="test_key", query="test query")
+        with pytest.raises(Exception, match="Rate limit exceeded"):
+            await search_web_tool(api_key="test_key", query="test query")
     
-    @pytest.mark.asyncio
-    async def test_search_invalid_api_key_error(self):
+    async def test_search_invalid_api_key_error(self, brave_client, brave_response):
         """Test search with invalid API key."""
-        mock_response = MagicMock()
-        mock_response.status_code = 401
+        brave_client.get.return_value = brave_response(401)
         
-        with patch('httpx.AsyncClient') as mock_client:
-            mock_context_manager = AsyncMock()
-            mock_context_manager.__aenter__.return_value.get = AsyncMock(return_value=mock_response)
-            mock_client.return_value = mock_context_manager
-            
-            with pytest.raises(Exception, match="Invalid Brave API key"):
-                await search_web_tool(api_key="invalid_key", query="test query")
+        with pytest.raises(Exception, match="Invalid Brave API key"):
+            await search_web_tool(api_key="invalid_key", query="test query")
     
-    @pytest.mark.asyncio
-    async def test_search_http_error(self):
+    async def test_search_http_error(self, brave_client, brave_response):
         """Test search with HTTP error."""
-        mock_response = MagicMock()
-        mock_response.status_code = 500
-        mock_response.text = "Internal Server Error"
+        brave_client.get.return_value = brave_response(500, text="Internal Server Error")
         
-        with patch('httpx.AsyncClient') as mock_client:
-            mock_context_manager = AsyncMock()
-            mock_context_manager.__aenter__.return_value.get = AsyncMock(return_value=mock_response)
-            mock_client.return_value = mock_context_manager
-            
-            with pytest.raises(Exception, match="Brave API returned 500"):
-                await search_web_tool(api_key="test_key", query="test query")
+        with pytest.raises(Exception, match="Brave API returned 500"):
+            await search_web_tool(api_key="test_key", query="test query")
     
-    @pytest.mark.asyncio
-    async def test_search_request_error(self):
+    async def test_search_request_error(self, brave_client):
         """Test search with request error."""
-        with patch('httpx.AsyncClient') as mock_client:
-            mock_context_manager = AsyncMock()
-            mock_context_manager.__aenter__.return_value.get = AsyncMock(
-                side_effect=httpx.RequestError("Connection failed")
-            )
-            mock_client.return_value = mock_context_manager
-            
-            with pytest.raises(Exception, match="Request failed"):
-                await search_web_tool(api_key="test_key", query="test query")
+        brave_client.get.side_effect = httpx.RequestError("Connection failed")
+        
+        with pytest.raises(Exception, match="Request failed"):
+            await search_web_tool(api_key="test_key", query="test query")
     
-    @pytest.mark.asyncio
-    async def test_search_count_limits(self):
+    async def test_search_count_limits(self, brave_client, brave_response):
         """Test search count parameter limits."""
-        mock_response_data = {"web": {"results": []}}
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = mock_response_data
+        brave_client.get.return_value = brave_response(200, {"web": {"results": []}})
+        
+        # Test count below minimum (should be adjusted to 1)
+        await search_web_tool(api_key="test_key", query="test", count=0)
+        args, kwargs = brave_client.get.call_args
+        assert dict(kwargs['params'])['count'] == 1
+        
+        # Test count above maximum (should be adjusted to 20)
+        await search_web_tool(api_key="test_key", query="test", count=50)
+        args, kwargs = brave_client.get.call_args
+        assert dict(kwargs['params'])['count'] == 20
+    
+    async def test_search_results_are_cached(self, brave_client, brave_response):
+        """Test that repeated and concurrent identical searches share one API request."""
+        brave_client.get.return_value = brave_response(200, {"web": {"results": [{"title": "Cached"}]}})
         
-        with patch('httpx.AsyncClient') as mock_client:
-            mock_context_manager = AsyncMock()
-            mock_get = AsyncMock(return_value=mock_response)
-            mock_context_manager.__aenter__.return_value.get = mock_get
-            mock_client.return_value = mock_context_manager
-            
-            # Test count below minimum (should be adjusted to 1)
-            await search_web_tool(api_key="test_key", query="test", count=0)
-            args, kwargs = mock_get.call_args
-            assert kwargs['params']['count'] == 1
-            
-            # Test count above maximum (should be adjusted to 20)
-            await search_web_tool(api_key="test_key", query="test", count=50)
-            args, kwargs = mock_get.call_args
-            assert kwargs['params']['count'] == 20
+        first, second = await asyncio.gather(
+            search_web_tool(api_key="test_key", query="test query"),
+            search_web_tool(api_key="test_key", query="Test Query ")
+        )
+        third = await search_web_tool(api_key="test_key", query="test query")
+        await search_web_tool(api_key="test_key", query="test query", count=5)
+        
+        assert first == second == third
+        assert third[0]["title"] == "Cached"
+        # One request for the three identical searches, one for the different count
+        assert brave_client.get.await_count == 2
 
 
-@pytest.mark.asyncio
-async def test_search_web_tool_function():
+async def test_search_web_tool_function(brave_client, brave_response):
     """Test the search_web_tool function."""
     mock_response_data = {
         "web": {
@@ -168,17 +141,25 @@ async def test_search_web_tool_function():
             ]
         }
     }
+    brave_client.get.return_value = brave_response(200, mock_response_data)
     
-    mock_response = MagicMock()
-    mock_response.status_code = 200
-    mock_response.json.return_value = mock_response_data
-    
-    with patch('httpx.AsyncClient') as mock_client:
-        mock_context_manager = AsyncMock()
-        mock_context_manager.__aenter__.return_value.get = AsyncMock(return_value=mock_response)
-        mock_client.return_value = mock_context_manager
-        
-        results = await search_web_tool(api_key="test_key", query="test query", count=1)
+    results = await search_web_tool(api_key="test_key", query="test query", count=1)
     
     assert len(results) == 1
-    assert results[0]["title"] == "Test Result"
\ No newline at end of file
+    assert results[0]["title"] == "Test Result"
+
+
+def test_client_of_previous_loop_is_closed():
+    """Test that a new event loop gets its own Brave client and the old loop's client is closed."""
+    first_loop, second_loop = asyncio.new_event_loop(), asyncio.new_event_loop()
+    try:
+        first = first_loop.run_until_complete(_get_brave_client("test_key"))
+        second = second_loop.run_until_complete(_get_brave_client("test_key"))
+        
+        assert second is not first
+        assert first.is_closed
+        assert not second.is_closed
+    finally:
+        second_loop.run_until_complete(close_brave_client())
+        first_loop.close()
+        second_loop.close()
@@ -5,9 +5,18 @@ Tests for dotenv integration in settings.
 import os
 import pytest
 from unittest.mock import patch
-from dotenv import load_dotenv
+from dotenv import dotenv_values
 
-from config.settings import Settings
+from config.settings import Settings, get_settings
+
+# Parsed once; dotenv_values leaves os.environ untouched
+_ENV_EXAMPLE = dotenv_values('.env.example')
+
+
+@pytest.fixture(scope="module")
+def base_settings():
+    """Settings built once for the module."""
+    return get_settings()
 
 
 def test_dotenv_is_loaded():
@@ -42,27 +51,17 @@ def test_settings_with_env_variables():
 
 def test_dotenv_loads_example_file():
     """Test that we can load from .env.example file."""
-    # Clear existing env vars first
-    for key in ['LLM_PROVIDER', 'LLM_MODEL', 'GMAIL_CREDENTIALS_PATH', 'BRAVE_API_KEY']:
-        if key in os.environ:
-            del os.environ[key]
-    
-    # Load from .env.example
-    load_dotenv('.env.example')
-    
     # Check that variables are loaded
-    assert os.getenv('LLM_PROVIDER') == 'openai'
-    assert os.getenv('LLM_MODEL') == 'gpt-4'
-    assert os.getenv('GMAIL_CREDENTIALS_PATH') == './credentials/credentials.json'
-    assert 'BSA-' in os.getenv('BRAVE_API_KEY', '')
+    assert _ENV_EXAMPLE.get('LLM_PROVIDER') == 'openai'
+    assert _ENV_EXAMPLE.get('LLM_MODEL') == 'gpt-4'
+    assert _ENV_EXAMPLE.get('GMAIL_CREDENTIALS_PATH') == './credentials/credentials.json'
+    assert 'BSA-' in (_ENV_EXAMPLE.get('BRAVE_API_KEY') or '')
 
 
-def test_settings_model_config_includes_env_file():
+def test_settings_model_config_includes_env_file(base_settings):
     """Test that settings model config is properly configured for .env files."""
-    settings = Settings()
-    
     # Check that model_config includes .env file
-    assert hasattr(settings, 'model_config')
-    assert settings.model_config.get('env_file') == '.env'
-    assert settings.model_config.get('env_file_encoding') == 'utf-8'
-    assert settings.model_config.get('case_sensitive') is False
\ No newline at end of file
+    assert hasattr(base_settings, 'model_config')
+    assert base_settings.model_config.get('env_file') == '.env'
+    assert base_settings.model_config.get('env_file_encoding') == 'utf-8'
+    assert base_settings.model_config.get('case_sensitive') is False
\ No newline at end of file
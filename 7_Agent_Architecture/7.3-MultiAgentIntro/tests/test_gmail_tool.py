@@ -3,69 +3,56 @@ Tests for Gmail Tool pure functions.
 """
 
 import pytest
-from unittest.mock import MagicMock, patch, AsyncMock
+from unittest.mock import MagicMock, patch
 from googleapiclient.errors import HttpError
 
-from agents.tools import create_email_draft_tool, list_email_drafts_tool
-from agents.models import EmailDraft, EmailDraftResponse
+from agents_delegation.tools import create_email_draft_tool, create_email_drafts_batch_tool, list_email_drafts_tool, _get_gmail_service
+from agents_delegation.models import EmailDraft, EmailDraftResponse
 
 
 class TestGmailTool:
     """Tests for Gmail pure functions."""
     
-    @pytest.mark.asyncio
-    async def test_create_draft_success(self):
+    async def test_create_draft_success(self, gmail_drafts):
         """Test successful draft creation."""
-        with patch('agents.tools._get_gmail_service') as mock_service_func:
-            # Mock Gmail service
-            mock_service = MagicMock()
-            mock_service_func.return_value = mock_service
-            
-            # Mock draft creation response
-            mock_draft_response = {
-                'id': 'draft_123',
-                'message': {
-                    'id': 'message_456',
-                    'threadId': 'thread_789'
-                }
+        # Mock draft creation response
+        mock_draft_response = {
+            'id': 'draft_123',
+            'message': {
+                'id': 'message_456',
+                'threadId': 'thread_789'
             }
-            
-            mock_service.users().drafts().create().execute.return_value = mock_draft_response
-            
-            result = await create_email_draft_tool(
+        }
+        
+        gmail_drafts.create.return_value.execute.return_value = mock_draft_response
+        
+        result = await create_email_draft_tool(
+            credentials_path="fake_creds.json",
+            token_path="fake_token.json",
+            to=["test@example.com"],
+            subject="Test Subject",
+            body="Test Body"
+        )
+        
+        assert result["success"] is True
+        assert result["draft_id"] == 'draft_123'
+        assert result["message_id"] == 'message_456'
+        assert result["thread_id"] == 'thread_789'
+    
+    async def test_create_draft_http_error(self, gmail_drafts):
+        """Test draft creation with HTTP error."""
+        http_error = HttpError(resp=MagicMock(status=500), content=b"Server Error")
+        gmail_drafts.create.return_value.execute.side_effect = http_error
+        
+        with pytest.raises(Exception, match="Failed to create draft"):
+            await create_email_draft_tool(
                 credentials_path="fake_creds.json",
                 token_path="fake_token.json",
                 to=["test@example.com"],
                 subject="Test Subject",
                 body="Test Body"
             )
-            
-            assert result["success"] is True
-            assert result["draft_id"] == 'draft_123'
-            assert result["message_id"] == 'message_456'
-            assert result["thread_id"] == 'thread_789'
-    
-    @pytest.mark.asyncio
-    async def test_create_draft_http_error(self):
-        """Test draft creation with HTTP error."""
-        with patch('agents.tools._get_gmail_service') as mock_service_func:
-            # Mock Gmail service that raises HttpError
-            mock_service = MagicMock()
-            mock_service_func.return_value = mock_service
-            
-            http_error = HttpError(resp=MagicMock(status=500), content=b"Server Error")
-            mock_service.users().drafts().create().execute.side_effect = http_error
-            
-            with pytest.raises(Exception, match="Failed to create draft"):
-                await create_email_draft_tool(
-                    credentials_path="fake_creds.json",
-                    token_path="fake_token.json",
-                    to=["test@example.com"],
-                    subject="Test Subject",
-                    body="Test Body"
-                )
-    
-    @pytest.mark.asyncio
+    
     async def test_create_draft_empty_to_raises_error(self):
         """Test draft creation with empty to field raises error."""
         with pytest.raises(ValueError, match="At least one recipient is required"):
@@ -77,7 +64,6 @@ class TestGmailTool:
                 body="Test Body"
             )
     
-    @pytest.mark.asyncio
     async def test_create_draft_empty_subject_raises_error(self):
         """Test draft creation with empty subject raises error."""
         with pytest.raises(ValueError, match="Subject is required"):
@@ -89,7 +75,6 @@ class TestGmailTool:
                 body="Test Body"
             )
     
-    @pytest.mark.asyncio
     async def test_create_draft_empty_body_raises_error(self):
         """Test draft creation with empty body raises error."""
         with pytest.raises(ValueError, match="Body is required"):
@@ -101,64 +86,101 @@ class TestGmailTool:
                 body=""
             )
     
-    @pytest.mark.asyncio
-    async def test_list_drafts_success(self):
+    async def test_list_drafts_success(self, gmail_drafts):
         """Test successful draft listing."""
-        with patch('agents.tools._get_gmail_service') as mock_service_func:
-            # Mock Gmail service
-            mock_service = MagicMock()
-            mock_service_func.return_value = mock_service
-            
-            # Mock drafts list response
-            mock_drafts_response = {
-                'drafts': [
-                    {'id': 'draft_1', 'message': {'id': 'msg_1'}},
-                    {'id': 'draft_2', 'message': {'id': 'msg_2'}}
-                ]
-            }
-            
-            mock_service.users().drafts().list().execute.return_value = mock_drafts_response
-            
-            result = await list_email_drafts_tool(
-                credentials_path="fake_creds.json",
-                token_path="fake_token.json",
-                max_results=10
-            )
-            
-            assert result["success"] is True
-            assert result["count"] == 2
-            assert len(result["drafts"]) == 2
-            assert result["drafts"][0]['id'] == 'draft_1'
-            assert result["drafts"][1]['id'] == 'draft_2'
-
-
-@pytest.mark.asyncio
-async def test_create_email_draft_tool_convenience_function():
-    """Test the create_email_draft_tool function directly."""
-    with patch('agents.tools._get_gmail_service') as mock_service_func:
-        mock_service = MagicMock()
-        mock_service_func.return_value = mock_service
-        
-        # Mock successful draft creation
-        mock_draft_response = {
-            'id': 'draft_123',
-            'message': {
-                'id': 'message_456',
-                'threadId': 'thread_789'
-            }
+        # Mock drafts list response
+        mock_drafts_response = {
+            'drafts': [
+                {'id': 'draft_1', 'message': {'id': 'msg_1'}},
+                {'id': 'draft_2', 'message': {'id': 'msg_2'}}
+            ]
         }
-        mock_service.users().drafts().create().execute.return_value = mock_draft_response
         
-        result = await create_email_draft_tool(
+        gmail_drafts.list.return_value.execute.return_value = mock_drafts_response
+        
+        result = await list_email_drafts_tool(
             credentials_path="fake_creds.json",
             token_path="fake_token.json",
-            to=["test@example.com"],
-            subject="Test",
-            body="Test body"
+            max_results=10
         )
         
         assert result["success"] is True
-        assert result["draft_id"] == 'draft_123'
+        assert result["count"] == 2
+        assert len(result["drafts"]) == 2
+        assert result["drafts"][0]['id'] == 'draft_1'
+        assert result["drafts"][1]['id'] == 'draft_2'
+
+
+async def test_create_email_draft_tool_convenience_function(gmail_drafts):
+    """Test the create_email_draft_tool function directly."""
+    # Mock successful draft creation
+    mock_draft_response = {
+        'id': 'draft_123',
+        'message': {
+            'id': 'message_456',
+            'threadId': 'thread_789'
+        }
+    }
+    gmail_drafts.create.return_value.execute.return_value = mock_draft_response
+    
+    result = await create_email_draft_tool(
+        credentials_path="fake_creds.json",
+        token_path="fake_token.json",
+        to=["test@example.com"],
+        subject="Test",
+        body="Test body"
+    )
+    
+    assert result["success"] is True
+    assert result["draft_id"] == 'draft_123'
+
+
+def test_gmail_service_is_cached_while_token_is_fresh():
+    """Test that the token file is read and the service built only once while the token is fresh."""
+    mock_creds = MagicMock(valid=True, expiry=None)
+    
+    with patch.dict('agents_delegation.tools._gmail_service_cache', clear=True), \
+         patch('agents_delegation.tools.os.path.exists', return_value=True), \
+         patch('agents_delegation.tools.Credentials') as mock_credentials, \
+         patch('agents_delegation.tools.build') as mock_build:
+        mock_credentials.from_authorized_user_file.return_value = mock_creds
+        
+        first = _get_gmail_service("fake_creds.json", "fake_token.json")
+        second = _get_gmail_service("fake_creds.json", "fake_token.json")
+    
+    assert first is second
+    mock_credentials.from_authorized_user_file.assert_called_once()
+    mock_build.assert_called_once_with('gmail', 'v1', credentials=mock_creds, cache_discovery=False)
+
+
+async def test_create_email_drafts_batch_tool(gmail_service):
+    """Test that valid drafts are sent in one batch and results keep the input order."""
+    mock_batch = gmail_service.new_batch_http_request.return_value
+    
+    def execute_batch(http=None):
+        callback = gmail_service.new_batch_http_request.call_args.kwargs['callback']
+        callback('0', {'id': 'draft_0', 'message': {'id': 'msg_0'}}, None)
+        callback('2', None, Exception("Server Error"))
+    
+    mock_batch.execute.side_effect = execute_batch
+    
+    results = await create_email_drafts_batch_tool(
+        credentials_path="fake_creds.json",
+        token_path="fake_token.json",
+        drafts=[
+            {"to": ["a@example.com"], "subject": "First", "body": "Body"},
+            {"to": [], "subject": "No recipient", "body": "Body"},
+            {"to": ["c@example.com"], "subject": "Third", "body": "Body"}
+        ]
+    )
+    
+    assert gmail_service.new_batch_http_request.call_count == 1
+    assert mock_batch.add.call_count == 2
+    assert results[0]["success"] is True
+    assert results[0]["draft_id"] == 'draft_0'
+    assert results[1] == {"success": False, "error": "At least one recipient is required"}
+    assert results[2]["success"] is False
+    assert "Failed to create draft" in results[2]["error"]
 
 
 class TestEmailDraft:
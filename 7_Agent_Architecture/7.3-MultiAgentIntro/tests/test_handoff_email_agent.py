@@ -6,11 +6,7 @@ ensuring proper tool integration and email functionality.
 """
 
 import pytest
-from unittest.mock import MagicMock, AsyncMock, patch
-
-import sys
-import os
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from unittest.mock import MagicMock, patch
 
 from agents_handoff.email_agent import email_agent, EmailAgentDependencies
 
@@ -43,7 +39,6 @@ class TestEmailAgentDependencies:
 class TestEmailAgentTools:
     """Test cases for email agent tools."""
     
-    @pytest.mark.asyncio
     async def test_create_gmail_draft_success(self):
         """Test successful Gmail draft creation."""
         # Mock context
@@ -83,7 +78,6 @@ class TestEmailAgentTools:
             assert result["draft_id"] == "test_draft_123"
             assert result["message"] == "Email draft created successfully"
     
-    @pytest.mark.asyncio
     async def test_create_gmail_draft_failure(self):
         """Test Gmail draft creation failure."""
         # Mock context
@@ -110,7 +104,6 @@ class TestEmailAgentTools:
             assert result["success"] is False
             assert "Gmail API authentication failed" in result["error_message"]
     
-    @pytest.mark.asyncio
     async def test_list_gmail_drafts_success(self):
         """Test successful Gmail drafts listing."""
         # Mock context
@@ -146,7 +139,6 @@ class TestEmailAgentTools:
             assert len(result["drafts"]) == 2
             assert result["drafts"][0]["subject"] == "Test Subject 1"
     
-    @pytest.mark.asyncio
     async def test_list_gmail_drafts_failure(self):
         """Test Gmail drafts listing failure."""
         # Mock context
@@ -172,7 +164,6 @@ class TestEmailAgentTools:
 class TestEmailAgentIntegration:
     """Test cases for email agent integration."""
     
-    @pytest.mark.asyncio
     async def test_email_agent_create_draft_response(self):
         """Test email agent creating draft and responding appropriately."""
         # Create dependencies
@@ -200,7 +191,6 @@ class TestEmailAgentIntegration:
             assert isinstance(result.output, str)
             assert "email draft" in result.output.lower()
     
-    @pytest.mark.asyncio
     async def test_email_agent_graceful_fallback(self):
         """Test email agent graceful fallback when draft creation fails."""
         # Create dependencies
@@ -274,7 +264,6 @@ class TestEmailAgentSystemPrompt:
 class TestEmailAgentErrorHandling:
     """Test cases for email agent error handling."""
     
-    @pytest.mark.asyncio
     async def test_email_agent_invalid_dependencies(self):
         """Test email agent with invalid dependencies."""
         # Create dependencies with invalid paths
@@ -294,7 +283,6 @@ class TestEmailAgentErrorHandling:
                     deps=deps
                 )
     
-    @pytest.mark.asyncio
     async def test_email_agent_empty_prompt(self):
         """Test email agent with empty prompt."""
         # Create dependencies
@@ -318,7 +306,6 @@ class TestEmailAgentErrorHandling:
             assert isinstance(result.output, str)
             assert "Please provide" in result.output
     
-    @pytest.mark.asyncio
     async def test_email_agent_malformed_request(self):
         """Test email agent with malformed email request."""
         # Create dependencies
@@ -346,7 +333,6 @@ class TestEmailAgentErrorHandling:
 class TestEmailAgentToolParameters:
     """Test cases for email agent tool parameter handling."""
     
-    @pytest.mark.asyncio
     async def test_create_gmail_draft_parameter_validation(self):
         """Test create_gmail_draft tool parameter validation."""
         # Mock context
@@ -380,7 +366,6 @@ class TestEmailAgentToolParameters:
             
             assert result["success"] is True
     
-    @pytest.mark.asyncio
     async def test_list_gmail_drafts_parameter_validation(self):
         """Test list_gmail_drafts tool parameter validation."""
         # Mock context
@@ -420,8 +405,7 @@ class TestEmailAgentToolParameters:
 class TestEmailAgentStreamingCompatibility:
     """Test cases for email agent streaming compatibility."""
     
-    @pytest.mark.asyncio
-    async def test_email_agent_streaming_interface(self):
+    async def test_email_agent_streaming_interface(self, fake_async_context_manager):
         """Test that email agent supports streaming interface."""
         # Create dependencies
         deps = EmailAgentDependencies(
@@ -439,10 +423,7 @@ class TestEmailAgentStreamingCompatibility:
             mock_run.result = MagicMock()
             mock_run.result.output = "Streaming email creation..."
             
-            mock_context_manager = MagicMock()
-            mock_context_manager.__aenter__ = AsyncMock(return_value=mock_run)
-            mock_context_manager.__aexit__ = AsyncMock(return_value=None)
-            mock_iter.return_value = mock_context_manager
+            mock_iter.return_value = fake_async_context_manager(mock_run)
             
             # Test streaming
             async with email_agent.iter(
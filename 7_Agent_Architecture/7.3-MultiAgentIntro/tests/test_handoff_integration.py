@@ -9,11 +9,7 @@ This module tests the complete end-to-end handoff flow:
 """
 
 import pytest
-from unittest.mock import MagicMock, AsyncMock, patch
-
-import sys
-import os
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from unittest.mock import MagicMock, patch
 
 from agents_handoff.cli_interface import research_agent, ResearchAgentDependencies
 
@@ -21,7 +17,6 @@ from agents_handoff.cli_interface import research_agent, ResearchAgentDependenci
 class TestEndToEndHandoffFlow:
     """Test cases for complete handoff flow."""
     
-    @pytest.mark.asyncio
     async def test_complete_research_flow_no_handoff(self):
         """Test complete flow for research request (no handoff)."""
         # Create dependencies
@@ -67,7 +62,6 @@ These developments show significant progress in both capability and safety measu
             assert "📧 **Email Draft Created" not in result.output  # No handoff occurred
             assert result.new_messages() == []
     
-    @pytest.mark.asyncio
     async def test_complete_email_handoff_flow(self):
         """Test complete flow for email request (TRUE handoff)."""
         # Create dependencies
@@ -121,7 +115,6 @@ The email draft has been created and saved to your Gmail drafts."""
             assert "email draft has been created" in result.output
             assert result.new_messages() == []
     
-    @pytest.mark.asyncio
     async def test_handoff_with_research_summary(self):
         """Test handoff flow when research findings are included in email."""
         # Create dependencies
@@ -187,7 +180,6 @@ Email drafted with comprehensive research findings included."""
 class TestHandoffDecisionMaking:
     """Test cases for the agent's decision between direct response and handoff."""
     
-    @pytest.mark.asyncio
     async def test_agent_correctly_identifies_research_requests(self):
         """Test that agent chooses direct response for various research queries."""
         # Create dependencies
@@ -221,7 +213,6 @@ class TestHandoffDecisionMaking:
                 assert "📧 **Email Draft Created" not in result.output
                 assert f"Research response about: {query}" in result.output
     
-    @pytest.mark.asyncio
     async def test_agent_correctly_identifies_email_requests(self):
         """Test that agent chooses handoff for various email creation requests."""
         # Create dependencies
@@ -258,7 +249,6 @@ class TestHandoffDecisionMaking:
 class TestHandoffErrorHandling:
     """Test cases for error handling in handoff scenarios."""
     
-    @pytest.mark.asyncio
     async def test_handoff_failure_graceful_degradation(self):
         """Test graceful handling when email handoff fails."""
         # Create dependencies
@@ -288,7 +278,6 @@ class TestHandoffErrorHandling:
             assert "user@example.com" in result.output
             assert "Gmail API authentication failed" in result.output
     
-    @pytest.mark.asyncio
     async def test_research_failure_direct_error(self):
         """Test error handling for research requests."""
         # Create dependencies with invalid API key
@@ -313,7 +302,6 @@ class TestHandoffErrorHandling:
 class TestMessageHistoryHandling:
     """Test cases for message history handling in handoffs."""
     
-    @pytest.mark.asyncio
     async def test_handoff_preserves_conversation_context(self):
         """Test that handoff passes conversation history to email agent."""
         # Create dependencies
@@ -346,7 +334,6 @@ class TestMessageHistoryHandling:
             assert "conversation context" in result.output
             assert result.new_messages() == message_history
     
-    @pytest.mark.asyncio
     async def test_direct_response_preserves_message_history(self):
         """Test that direct responses also handle message history correctly."""
         # Create dependencies
@@ -383,8 +370,7 @@ class TestMessageHistoryHandling:
 class TestStreamingCompatibility:
     """Test cases for streaming compatibility with handoff system."""
     
-    @pytest.mark.asyncio
-    async def test_streaming_interface_available_for_handoff_agent(self):
+    async def test_streaming_interface_available_for_handoff_agent(self, fake_async_context_manager):
         """Test that streaming interface works with handoff agent."""
         # Create dependencies
         deps = ResearchAgentDependencies(
@@ -404,10 +390,7 @@ class TestStreamingCompatibility:
             mock_run.result.output = "Streaming research response..."
             mock_run.result.new_messages = MagicMock(return_value=[])
             
-            mock_context_manager = MagicMock()
-            mock_context_manager.__aenter__ = AsyncMock(return_value=mock_run)
-            mock_context_manager.__aexit__ = AsyncMock(return_value=None)
-            mock_iter.return_value = mock_context_manager
+            mock_iter.return_value = fake_async_context_manager(mock_run)
             
             # Test streaming interface
             async with research_agent.iter("Test streaming query", deps=deps) as run:
@@ -416,8 +399,7 @@ class TestStreamingCompatibility:
             
             mock_iter.assert_called_once_with("Test streaming query", deps=deps)
     
-    @pytest.mark.asyncio
-    async def test_streaming_works_for_both_response_types(self):
+    async def test_streaming_works_for_both_response_types(self, fake_async_context_manager):
         """Test that streaming works for both direct responses and handoffs."""
         # Create dependencies
         deps = ResearchAgentDependencies(
@@ -432,10 +414,7 @@ class TestStreamingCompatibility:
             mock_run.result = MagicMock()
             mock_run.result.output = "Direct streaming research response"
             
-            mock_context_manager = MagicMock()
-            mock_context_manager.__aenter__ = AsyncMock(return_value=mock_run)
-            mock_context_manager.__aexit__ = AsyncMock(return_value=None)
-            mock_iter.return_value = mock_context_manager
+            mock_iter.return_value = fake_async_context_manager(mock_run)
             
             async with research_agent.iter("Research query", deps=deps) as run:
                 assert "Direct streaming research response" in run.result.output
@@ -447,10 +426,7 @@ class TestStreamingCompatibility:
             mock_run.result = MagicMock()
             mock_run.result.output = "📧 **Email Draft Created for test@example.com:**\n\nStreaming handoff result"
             
-            mock_context_manager = MagicMock()
-            mock_context_manager.__aenter__ = AsyncMock(return_value=mock_run)
-            mock_context_manager.__aexit__ = AsyncMock(return_value=None)
-            mock_iter.return_value = mock_context_manager
+            mock_iter.return_value = fake_async_context_manager(mock_run)
             
             async with research_agent.iter("Create email to test@example.com", deps=deps) as run:
                 assert "📧 **Email Draft Created" in run.result.output
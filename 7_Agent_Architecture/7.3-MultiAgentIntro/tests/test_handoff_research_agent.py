@@ -9,10 +9,6 @@ This module tests the research agent that uses Union output types:
 import pytest
 from unittest.mock import MagicMock, AsyncMock, patch
 
-import sys
-import os
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
-
 from agents_handoff.research_agent import (
     research_agent, 
     ResearchAgentDependencies,
@@ -52,7 +48,6 @@ class TestResearchAgentDependencies:
 class TestEmailHandoffOutputFunction:
     """Test cases for the email_handoff output function."""
     
-    @pytest.mark.asyncio
     async def test_email_handoff_success(self):
         """Test successful email handoff output function."""
         # Mock context
@@ -92,7 +87,6 @@ class TestEmailHandoffOutputFunction:
             assert "📧 **Email Draft Created for test@example.com:**" in result
             assert "Professional email draft created successfully" in result
     
-    @pytest.mark.asyncio
     async def test_email_handoff_without_research_summary(self):
         """Test email handoff without research summary."""
         # Mock context
@@ -130,7 +124,6 @@ class TestEmailHandoffOutputFunction:
             assert "📧 **Email Draft Created for simple@example.com:**" in result
             assert "Simple email draft created." in result
     
-    @pytest.mark.asyncio
     async def test_email_handoff_failure(self):
         """Test email handoff when email agent fails."""
         # Mock context
@@ -156,11 +149,31 @@ class TestEmailHandoffOutputFunction:
             assert "❌ Failed to create email for fail@example.com" in result
             assert "Email service unavailable" in result
 
+    
+    def test_handoff_history_is_bounded(self):
+        """Test that long conversations are trimmed to recent whole turns plus the opening request."""
+        from pydantic_ai.messages import ModelRequest, ModelResponse, TextPart, UserPromptPart, SystemPromptPart
+        from agents_handoff.research_agent import _handoff_history, MAX_HANDOFF_HISTORY
+        
+        opening = ModelRequest(parts=[SystemPromptPart("system"), UserPromptPart("first")])
+        messages = [opening, ModelResponse(parts=[TextPart("answer")])]
+        for turn in range(MAX_HANDOFF_HISTORY):
+            messages.append(ModelRequest(parts=[UserPromptPart(f"question {turn}")]))
+            messages.append(ModelResponse(parts=[TextPart(f"answer {turn}")]))
+        
+        history = _handoff_history(messages)
+        
+        assert history[0] is opening
+        assert len(history) <= MAX_HANDOFF_HISTORY + 1
+        assert isinstance(history[1], ModelRequest)
+        assert history[-1] is messages[-2]
+        
+        # Short conversations are passed whole, minus the handoff call
+        assert _handoff_history(messages[:4]) == messages[:3]
 
 class TestResearchAgentTools:
     """Test cases for research agent tools."""
     
-    @pytest.mark.asyncio
     async def test_search_web_success(self):
         """Test successful web search tool."""
         # Mock context
@@ -203,7 +216,6 @@ class TestResearchAgentTools:
             assert result[0]["title"] == "Test Result 1"
             assert result[0]["url"] == "https://example.com/1"
     
-    @pytest.mark.asyncio
     async def test_search_web_failure(self):
         """Test web search failure."""
         # Mock context
@@ -224,7 +236,28 @@ class TestResearchAgentTools:
             assert len(result) == 1
             assert result[0]["error"] == "Search failed: API rate limit exceeded"
     
-    @pytest.mark.asyncio
+    async def test_search_web_many(self):
+        """Test that several queries are searched concurrently and failures are reported per query."""
+        # Mock context
+        mock_ctx = MagicMock()
+        mock_ctx.deps.brave_api_key = "test_api_key"
+        
+        async def fake_search(api_key, query, count):
+            if query == "bad query":
+                raise Exception("API rate limit exceeded")
+            return [{"title": f"Result for {query}", "url": "https://example.com"}]
+        
+        with patch('agents_handoff.research_agent.search_web_tool', side_effect=fake_search) as mock_tool:
+            from agents_handoff.research_agent import search_web_many
+            
+            result = await search_web_many(mock_ctx, ["first", "bad query", "first"], max_results=3)
+            
+            # Duplicate queries are only searched once
+            assert mock_tool.call_count == 2
+            assert list(result) == ["first", "bad query"]
+            assert result["first"][0]["title"] == "Result for first"
+            assert result["bad query"] == [{"error": "Search failed: API rate limit exceeded"}]
+    
     async def test_summarize_research_success(self):
         """Test successful research summarization."""
         # Mock context
@@ -261,7 +294,6 @@ class TestResearchAgentTools:
 class TestResearchAgentIntegration:
     """Test cases for research agent integration with Union output types."""
     
-    @pytest.mark.asyncio
     async def test_research_agent_direct_response(self):
         """Test research agent returning direct string response."""
         # Create dependencies
@@ -289,7 +321,6 @@ class TestResearchAgentIntegration:
             assert isinstance(result.output, str)
             assert "AI safety research" in result.output
     
-    @pytest.mark.asyncio
     async def test_research_agent_email_handoff_via_output_function(self):
         """Test research agent using email handoff output function."""
         # Create dependencies
@@ -383,7 +414,6 @@ class TestResearchAgentFactory:
 class TestResearchAgentErrorHandling:
     """Test cases for research agent error handling."""
     
-    @pytest.mark.asyncio
     async def test_research_agent_invalid_dependencies(self):
         """Test research agent with invalid dependencies."""
         # Create dependencies with invalid API key
@@ -404,7 +434,6 @@ class TestResearchAgentErrorHandling:
                     deps=deps
                 )
     
-    @pytest.mark.asyncio
     async def test_research_agent_empty_query(self):
         """Test research agent with empty query."""
         # Create dependencies
@@ -433,7 +462,6 @@ class TestResearchAgentErrorHandling:
 class TestUnionOutputTypeDecisionMaking:
     """Test cases for the agent's decision making between output types."""
     
-    @pytest.mark.asyncio
     async def test_agent_chooses_direct_response_for_research(self):
         """Test that agent chooses direct string response for research queries."""
         # Create dependencies
@@ -462,7 +490,6 @@ class TestUnionOutputTypeDecisionMaking:
             assert "quantum computing" in result.output
             assert "📧 **Email Draft Created" not in result.output  # Should NOT be email handoff
     
-    @pytest.mark.asyncio
     async def test_agent_chooses_email_handoff_for_email_requests(self):
         """Test that agent chooses email handoff output function for email requests."""
         # Create dependencies
@@ -489,4 +516,100 @@ class TestUnionOutputTypeDecisionMaking:
             # Should be result from email handoff function
             assert isinstance(result.output, str)
             assert "📧 **Email Draft Created" in result.output
-            assert "colleague@company.com" in result.output
\ No newline at end of file
+            assert "colleague@company.com" in result.output
+
+class TestDirectEmailRouting:
+    """Test cases for routing plain email requests straight to the email agent."""
+    
+    @pytest.mark.parametrize("prompt, direct", [
+        ("Create an email to john@example.com about the meeting", True),
+        ("Compose an email about the launch for sam@corp.io", True),
+        ("Draft an email with my research findings to bob@example.com", False),
+        ("Research quantum computing and email the results to a@example.com", False),
+        ("What is the latest AI research?", False),
+        ("Send an email to Sarah about the budget review", True),
+        ("Tell me about email security and how to configure SPF", False),
+        ("How do I send a large file to a colleague?", False),
+        ("Explain email deliverability best practices for sending to Gmail", False),
+    ])
+    def test_is_direct_email_request(self, prompt, direct):
+        """Test that only plain email requests skip the research agent."""
+        from agents_handoff.research_agent import is_direct_email_request
+        
+        assert is_direct_email_request(prompt) is direct
+    
+    def test_route_request(self):
+        """Test that the email agent gets email requests and the research agent everything else."""
+        from agents_handoff.research_agent import route_request
+        from agents_handoff.email_agent import email_agent, EmailAgentDependencies
+        
+        deps = ResearchAgentDependencies(
+            brave_api_key="test_api_key",
+            gmail_credentials_path="/fake/creds.json",
+            gmail_token_path="/fake/token.json",
+            session_id="test_session"
+        )
+        
+        agent, agent_deps, history = route_request("Create an email to john@example.com about the meeting", deps)
+        assert agent is email_agent
+        assert agent_deps == EmailAgentDependencies("/fake/creds.json", "/fake/token.json", "test_session")
+        assert history is None
+        
+        agent, agent_deps, history = route_request("Tell me about quantum computing", deps, [])
+        assert agent is research_agent
+        assert agent_deps is deps
+        assert history == []
+    
+    @pytest.mark.parametrize("prompt, recipient", [
+        ("Create an email to john@example.com about the meeting", "john@example.com"),
+        ("Compose an email about the launch for sam@corp.io", "sam@corp.io"),
+        ("Send an email to Sarah about the budget review", "Sarah"),
+    ])
+    def test_direct_email_reply_header(self, prompt, recipient):
+        """Test that direct email replies get the heading email_handoff adds."""
+        from agents_handoff.research_agent import direct_email_reply_header
+        
+        assert direct_email_reply_header(prompt) == f"📧 **Email Draft Created for {recipient}:**\n\n"
+    
+    async def test_direct_email_reply_is_formatted_like_handoff(self):
+        """Test that run_research_agent adds the handoff heading to a directly routed email reply."""
+        from agents_handoff.research_agent import run_research_agent
+        from agents_handoff.email_agent import email_agent
+        
+        deps = ResearchAgentDependencies(
+            brave_api_key="test_api_key",
+            gmail_credentials_path="/fake/creds.json",
+            gmail_token_path="/fake/token.json"
+        )
+        
+        with patch.object(email_agent, 'run', AsyncMock(return_value=MagicMock(output="Draft created."))):
+            result = await run_research_agent("Create an email to john@example.com about the meeting", deps)
+        
+        assert result.output == "📧 **Email Draft Created for john@example.com:**\n\nDraft created."
+    
+    async def test_email_agent_prompt_survives_research_history(self):
+        """Test that the email agent's own prompt is sent even when the history starts with the research prompt."""
+        from pydantic_ai.messages import ModelRequest, ModelResponse, SystemPromptPart, TextPart, UserPromptPart
+        from pydantic_ai.models.function import FunctionModel
+        from agents_handoff.email_agent import email_agent, EmailAgentDependencies
+        from agents_handoff.research_agent import SYSTEM_PROMPT
+        
+        requests = []
+        
+        def reply(messages, info):
+            requests.append(messages[-1])
+            return ModelResponse(parts=[TextPart("Draft created.")])
+        
+        history = [
+            ModelRequest(parts=[SystemPromptPart(SYSTEM_PROMPT), UserPromptPart("Tell me about AI")]),
+            ModelResponse(parts=[TextPart("AI is...")]),
+        ]
+        
+        with email_agent.override(model=FunctionModel(reply)):
+            await email_agent.run(
+                "Create an email to john@example.com",
+                deps=EmailAgentDependencies("/fake/creds.json", "/fake/token.json"),
+                message_history=history
+            )
+        
+        assert "email drafting specialist" in requests[0].instructions
@@ -2,11 +2,10 @@
 Tests for Research Agent.
 """
 
-import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 
-from agents.research_agent import ResearchAgentDependencies, create_research_agent
-from agents.models import BraveSearchResult
+from agents_delegation.research_agent import ResearchAgentDependencies, create_research_agent
+from agents_delegation.models import BraveSearchResult
 
 
 class TestResearchAgent:
@@ -54,10 +53,9 @@ class TestResearchAgent:
 class TestResearchAgentTools:
     """Tests for Research Agent tool functions."""
     
-    @pytest.mark.asyncio
     async def test_search_web_success(self):
         """Test successful web search."""
-        from agents.research_agent import search_web
+        from agents_delegation.research_agent import search_web
         
         # Mock the search_web_tool function
         mock_search_results = [
@@ -75,7 +73,7 @@ class TestResearchAgentTools:
             }
         ]
         
-        with patch('agents.research_agent.search_web_tool', new_callable=AsyncMock) as mock_search_tool:
+        with patch('agents_delegation.research_agent.search_web_tool', new_callable=AsyncMock) as mock_search_tool:
             mock_search_tool.return_value = mock_search_results
             
             # Mock context with new dependency structure
@@ -97,10 +95,9 @@ class TestResearchAgentTools:
                 count=2
             )
     
-    @pytest.mark.asyncio
     async def test_search_web_empty_query(self):
         """Test web search with empty query."""
-        from agents.research_agent import search_web
+        from agents_delegation.research_agent import search_web
         
         mock_ctx = MagicMock()
         mock_ctx.deps.brave_api_key = "test_api_key"
@@ -112,12 +109,11 @@ class TestResearchAgentTools:
         assert len(result) == 1
         assert "error" in result[0]
     
-    @pytest.mark.asyncio
     async def test_search_web_api_error(self):
         """Test web search with API error."""
-        from agents.research_agent import search_web
+        from agents_delegation.research_agent import search_web
         
-        with patch('agents.research_agent.search_web_tool', new_callable=AsyncMock) as mock_search_tool:
+        with patch('agents_delegation.research_agent.search_web_tool', new_callable=AsyncMock) as mock_search_tool:
             mock_search_tool.side_effect = Exception("API Error")
             
             mock_ctx = MagicMock()
@@ -129,12 +125,11 @@ class TestResearchAgentTools:
             assert "error" in result[0]
             assert "Search failed: API Error" == result[0]["error"]
     
-    @pytest.mark.asyncio
     async def test_search_web_count_limits(self):
         """Test web search count parameter limits."""
-        from agents.research_agent import search_web
+        from agents_delegation.research_agent import search_web
         
-        with patch('agents.research_agent.search_web_tool', new_callable=AsyncMock) as mock_search_tool:
+        with patch('agents_delegation.research_agent.search_web_tool', new_callable=AsyncMock) as mock_search_tool:
             mock_search_tool.return_value = []
             
             mock_ctx = MagicMock()
@@ -151,10 +146,9 @@ class TestResearchAgentTools:
             await search_web(mock_ctx, "test", max_results=50)
             mock_search_tool.assert_called_with(api_key="test_api_key", query="test", count=20)
     
-    @pytest.mark.asyncio
     async def test_summarize_research_success(self):
         """Test successful research summarization."""
-        from agents.research_agent import summarize_research
+        from agents_delegation.research_agent import summarize_research
         
         search_results = [
             {
@@ -184,10 +178,9 @@ class TestResearchAgentTools:
         assert "AI safety research" in result["summary"]
         assert "Research methodologies" in result["summary"]
     
-    @pytest.mark.asyncio
     async def test_summarize_research_empty_results(self):
         """Test research summarization with empty results."""
-        from agents.research_agent import summarize_research
+        from agents_delegation.research_agent import summarize_research
         
         mock_ctx = MagicMock()
         
@@ -197,11 +190,10 @@ class TestResearchAgentTools:
         assert result["key_points"] == []
         assert result["sources"] == []
     
-    @pytest.mark.asyncio
-    @patch('agents.research_agent.email_agent')
+    @patch('agents_delegation.research_agent.email_agent')
     async def test_create_email_draft_success(self, mock_email_agent):
         """Test successful email draft creation via Email Agent."""
-        from agents.research_agent import create_email_draft
+        from agents_delegation.research_agent import create_email_draft
         
         # Mock email agent response
         mock_email_result = MagicMock()
@@ -233,11 +225,10 @@ class TestResearchAgentTools:
         call_args = mock_email_agent.run.call_args
         assert call_args.kwargs["usage"] == mock_ctx.usage
     
-    @pytest.mark.asyncio
-    @patch('agents.research_agent.email_agent')
+    @patch('agents_delegation.research_agent.email_agent')
     async def test_create_email_draft_without_research_summary(self, mock_email_agent):
         """Test email draft creation without research summary."""
-        from agents.research_agent import create_email_draft
+        from agents_delegation.research_agent import create_email_draft
         
         mock_email_result = MagicMock()
         mock_email_result.data = {"draft_id": "draft_456"}
@@ -261,11 +252,10 @@ class TestResearchAgentTools:
         assert result["subject"] == "Simple Email"
         assert result["context"] == "Basic context"
     
-    @pytest.mark.asyncio
-    @patch('agents.research_agent.email_agent')
+    @patch('agents_delegation.research_agent.email_agent')
     async def test_create_email_draft_agent_error(self, mock_email_agent):
         """Test email draft creation with agent error."""
-        from agents.research_agent import create_email_draft
+        from agents_delegation.research_agent import create_email_draft
         
         mock_email_agent.run = AsyncMock(side_effect=Exception("Agent Error"))
         